@@ -0,0 +1,33 @@
+"""Add (created_at, id) index for pattern listing
+
+Revision ID: 012_patt_list_idx
+Revises: 011_patt_link
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_patt_list_idx'
+down_revision: Union[str, None] = '011_patt_link'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the keyset used to paginate GET /patterns (newest first)"""
+
+    op.create_index(
+        'ix_patterns_created_at_id',
+        'patterns',
+        ['created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    """Remove the pattern listing index"""
+
+    op.drop_index('ix_patterns_created_at_id', table_name='patterns')
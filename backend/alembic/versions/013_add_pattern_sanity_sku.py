@@ -0,0 +1,49 @@
+"""Add sanity_product_sku to patterns
+
+Nothing in the database records which SKU a pattern was published under:
+create_product only ever read pattern_data['sanity_product_sku'] and never
+wrote it. The SKU (and the pattern ID) live on the Sanity product document,
+so existing rows are left NULL here and are filled from Sanity with
+scripts/backfill_pattern_skus.py. Until that has run, products created
+before this migration are not covered by the unique index.
+
+Revision ID: 013_patt_sku
+Revises: 012_patt_list_idx
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_patt_sku'
+down_revision: Union[str, None] = '012_patt_list_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add an indexed SKU column so duplicate products are found without a table scan"""
+
+    op.add_column('patterns',
+        sa.Column('sanity_product_sku', sa.String(), nullable=True)
+    )
+
+    # No backfill: existing SKUs are only known to Sanity (see module docstring)
+
+    op.create_index(
+        'ix_patterns_sanity_product_sku',
+        'patterns',
+        ['sanity_product_sku'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Remove sanity_product_sku column"""
+
+    op.drop_index('ix_patterns_sanity_product_sku', table_name='patterns')
+    op.drop_column('patterns', 'sanity_product_sku')
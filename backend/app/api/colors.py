@@ -7,7 +7,8 @@ from typing import List
 
 from app.core.dependencies import get_current_admin
 from app.models.admin_user import AdminUser
-from app.services.color_service import clear_color_cache
+from app.services.color_service import clear_color_cache, get_perle_colors
+from app.services.pdf_cache import purge_stale_palette_pdfs
 from app.schemas.color import ColorCreate, ColorUpdate, ColorResponse
 
 router = APIRouter()
@@ -42,6 +43,7 @@ def write_colors_atomically(colors: List[dict]) -> None:
     """
     Atomically write colors to file to prevent corruption.
     Uses temp file + atomic rename pattern.
+    Rebuilds the color cache and lookup table so the next request doesn't pay for it.
     """
     # Create temp file in same directory as target file
     temp_fd, temp_path = tempfile.mkstemp(
@@ -73,6 +75,12 @@ def write_colors_atomically(colors: List[dict]) -> None:
             detail=f"Failed to save colors: {str(e)}"
         )
 
+    # Rebuild lookup maps and the RGB lookup table for the new palette
+    get_perle_colors(force_reload=True)
+
+    # PDFs drawn with the old palette can never be served again
+    purge_stale_palette_pdfs()
+
 
 @router.post("/admin/colors", response_model=ColorResponse, status_code=status.HTTP_201_CREATED)
 async def create_color(
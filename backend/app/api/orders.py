@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.orm.attributes import flag_modified
 from app.core.database import get_db
@@ -23,6 +23,7 @@ from app.schemas.order import (
 )
 from sqlalchemy import func
 from app.services.email_service import email_service
+from app.services.pdf_cache import pregenerate_order_pdfs
 
 router = APIRouter()
 
@@ -170,6 +171,7 @@ def get_order(
 def update_order(
     order_id: int,
     order_update: OrderUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
 ):
@@ -188,6 +190,9 @@ def update_order(
         order.shipping_tracking_url = order_update.shipping_tracking_url
 
     if order_update.status is not None:
+        if order_update.status == "paid" and order.status != "paid":
+            # Generate the order's pattern PDFs after the response so downloads hit the PDF cache
+            background_tasks.add_task(pregenerate_order_pdfs, order.id)
         order.status = order_update.status
 
     db.commit()
@@ -1,7 +1,7 @@
 import math
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -13,14 +13,37 @@ from app.schemas.pattern import PatternResponse
 from app.services.image_processing import (
     convert_image_to_pattern_in_memory,
     image_to_base64,
-    suggest_board_dimensions_from_file,
+    probe_image_size,
+    load_image_for_pattern,
+    decode_image_for_pattern,
+    suggest_board_dimensions_for_size,
+    BOARD_SIZE,
 )
 from app.services.ai_generation import AIGenerationService
-from app.services.pdf_generator import generate_pattern_pdf
-from app.services.pattern_generator import render_grid_to_base64, render_grid_to_image
+from app.services.pdf_generator import iter_pdf_chunks
+from app.services.pdf_cache import open_pattern_pdf, invalidate_pattern_pdfs, purge_stale_palette_pdfs
+from app.services.pattern_generator import render_grid_to_image, pack_code_grid
+from app.services.grid_storage import compress_pattern_data, expand_pattern_data, get_grid_shape
+from app.services.image_encoding import encode_pattern_image, PATTERN_IMAGE_FORMATS, PATTERN_IMAGE_MEDIA_TYPES
+from app.services.pattern_service import list_pattern_summaries, PATTERN_LIST_MAX_LIMIT
+from app.services.render_cache import (
+    compute_grid_digest,
+    make_render_key,
+    get_or_render,
+    etag_matches,
+    invalidate_pattern_images,
+)
 from app.services.room_template_service import RoomTemplateService
 from app.services.mockup_generator import MockupGenerator
-from app.services.color_service import clear_color_cache, code_to_hex
+from app.services.color_service import clear_color_cache, code_to_hex, COLOR_METRICS
+from app.services.cpu_pool import generate_patterns_in_cpu_pool
+from app.services.pattern_cache import (
+    PATTERN_RESULT_CACHE,
+    compute_image_digest,
+    make_pattern_cache_key,
+    convert_image_to_pattern_cached,
+    get_pattern_cache_stats,
+)
 from app.core.config import settings
 from pathlib import Path
 from PIL import Image
@@ -28,7 +51,6 @@ import uuid
 import io
 import json
 import tempfile
-import asyncio
 import base64
 import logging
 from datetime import datetime
@@ -41,6 +63,7 @@ router = APIRouter()
 class GenerateThreeSizesRequest(BaseModel):
     image: str  # base64 encoded image
     style: str  # "realistic" or "ai-style"
+    colorMetric: str = "rgb"  # "rgb", "cie76", "cie94" or "ciede2000"
 
 class PatternSizeResult(BaseModel):
     size: str
@@ -63,51 +86,91 @@ class GenerateMockupRequest(BaseModel):
 class GenerateMockupResponse(BaseModel):
     mockupBase64: str
 
-@router.post("/patterns/generate-three-sizes", response_model=GenerateThreeSizesResponse)
-async def generate_three_sizes(request: GenerateThreeSizesRequest):
+async def generate_three_size_results(image_data: bytes, style: str, color_metric: str) -> List[PatternSizeResult]:
     """
-    Generate patterns in three sizes (small, medium, large).
-    Runs generation in parallel for faster response.
-    Mockups can be generated separately using /patterns/generate-mockup endpoint.
+    Generate patterns in two sizes (small, large) from encoded image bytes.
+    Preprocesses once and derives all sizes from the shared result, one CPU
+    worker pool task per size so the sizes run concurrently and the event loop
+    stays free.
 
     Args:
-        request: Contains base64 image and style ("realistic" or "ai-style")
+        image_data: Encoded image bytes (JPEG, PNG, ...)
+        style: "realistic" or "ai-style"
+        color_metric: Color distance metric
 
     Returns:
-        Three patterns in different sizes (without mockups for faster response)
+        One PatternSizeResult per size
     """
-    try:
-        # Decode base64 image
-        image_data = base64.b64decode(request.image.split(',')[1] if ',' in request.image else request.image)
-        image = Image.open(io.BytesIO(image_data))
-
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        # Define max boards per side - pattern generator will maintain aspect ratio
-        # So a 2x2 board area (58x58 beads max) will scale down to match image aspect ratio
-        # e.g. landscape image might become 58x33 beads, portrait might become 33x58 beads
-        aspect_ratio = image.width / image.height
-        logger.info(f"Image aspect ratio: {aspect_ratio:.2f} ({image.width}x{image.height})")
-
-        sizes = [
-            {"name": "small", "boards": 2},   # Max 58x58 beads area
-            {"name": "large", "boards": 4},  # Max 116x116 beads area
-        ]
-
-        # Use same boards for both dimensions - pattern generator maintains aspect ratio internally
-        sizes = [
-            {
-                "name": size["name"],
-                "boards_w": math.ceil(size["boards"] if aspect_ratio >= 1 else size["boards"] * aspect_ratio),
-                "boards_h": math.ceil(size["boards"] / aspect_ratio if aspect_ratio >= 1 else size["boards"])
-            }
-            for size in sizes
-        ]
+    image = Image.open(io.BytesIO(image_data))  # Header only - pixels are decoded below
+
+    # Define max boards per side - pattern generator will maintain aspect ratio
+    # So a 2x2 board area (58x58 beads max) will scale down to match image aspect ratio
+    # e.g. landscape image might become 58x33 beads, portrait might become 33x58 beads
+    aspect_ratio = image.width / image.height
+    logger.info(f"Image aspect ratio: {aspect_ratio:.2f} ({image.width}x{image.height})")
+
+    sizes = [
+        {"name": "small", "boards": 2},   # Max 58x58 beads area
+        {"name": "large", "boards": 4},  # Max 116x116 beads area
+    ]
+
+    # Use same boards for both dimensions - pattern generator maintains aspect ratio internally
+    sizes = [
+        {
+            "name": size["name"],
+            "boards_w": math.ceil(size["boards"] if aspect_ratio >= 1 else size["boards"] * aspect_ratio),
+            "boards_h": math.ceil(size["boards"] / aspect_ratio if aspect_ratio >= 1 else size["boards"])
+        }
+        for size in sizes
+    ]
+    board_sizes = [(size["boards_w"], size["boards_h"]) for size in sizes]
+    max_beads = (
+        max(w for w, _ in board_sizes) * BOARD_SIZE,
+        max(h for _, h in board_sizes) * BOARD_SIZE
+    )
 
+    if style == "ai-style":
+        # The AI model gets the full-resolution photo
+        image = image.convert('RGB')
+    else:
+        # Decode only as many pixels as the largest size needs (JPEG DCT scaling)
+        image = load_image_for_pattern(image, max_beads)
+
+    generation_options = {
+        "use_dithering": False,
+        "use_advanced_preprocessing": False,  # Don't double-process if already AI-transformed
+        "remove_bg": False,
+        "enhance_colors": False,
+        "color_boost": 1.0,
+        "contrast_boost": 1.0,
+        "brightness_boost": 1.0,
+        "simplify_details": False,
+        "simplification_method": "none",
+        "simplification_strength": "none",
+        "use_nearest_neighbor": True,
+        "color_metric": color_metric,
+    }
+
+    # An identical image, style, options and palette is served from the result cache
+    image_digest = compute_image_digest(image)
+    cache_keys = [
+        make_pattern_cache_key(image_digest, {
+            "endpoint": "generate-three-sizes",
+            "style": style,
+            "board_sizes": board_sizes,
+            "size_index": index,
+            "options": generation_options,
+        })
+        for index in range(len(board_sizes))
+    ]
+    generated = [PATTERN_RESULT_CACHE.get(key) for key in cache_keys]
+
+    if all(result is not None for result in generated):
+        logger.info("Serving all pattern sizes from the pattern cache")
+    else:
         # AI transformation once for all sizes (if ai-style selected)
         base_image = image
-        if request.style == "ai-style":
+        if style == "ai-style":
             temp_original = None
             temp_styled = None
             try:
@@ -138,7 +201,7 @@ async def generate_three_sizes(request: GenerateThreeSizesRequest):
 
                     # Load transformed image (load into memory to release file lock on Windows)
                     with Image.open(temp_styled.name) as img:
-                        base_image = img.convert('RGB').copy()  # Load into memory and close file
+                        base_image = load_image_for_pattern(img, max_beads).copy()  # Load into memory and close file
                     logger.info(f"AI transformation complete, using for all sizes")
 
             except Exception as e:
@@ -152,58 +215,167 @@ async def generate_three_sizes(request: GenerateThreeSizesRequest):
                 if temp_styled and Path(temp_styled.name).exists():
                     Path(temp_styled.name).unlink()
 
-        # Generate all patterns in parallel (using base_image which is either original or AI-transformed)
-        async def generate_single_size(size_config: Dict) -> PatternSizeResult:
-            boards_w = size_config["boards_w"]
-            boards_h = size_config["boards_h"]
-
-            logger.info(f"Generating {size_config['name']} pattern ({boards_w}x{boards_h})...")
-
-            # Generate pattern from image (original or AI-transformed)
-            pattern_base64, colors_used, pattern_data = convert_image_to_pattern_in_memory(
-                base_image,
-                boards_width=boards_w,
-                boards_height=boards_h,
-                use_perle_colors=True,
-                use_dithering=False,
-                use_advanced_preprocessing=False,  # Don't double-process if already AI-transformed
-                remove_bg=False,
-                enhance_colors=False,
-                color_boost=1.0,
-                contrast_boost=1.0,
-                brightness_boost=1.0,
-                simplify_details=False,
-                simplification_method="none",
-                simplification_strength="none",
-                use_nearest_neighbor=True
-            )
+        logger.info(f"Generating {len(sizes)} pattern sizes {board_sizes}...")
 
-            # Mockup generation moved to separate endpoint for better UX
-            # Frontend can load mockups progressively via /patterns/generate-mockup
-
-            # Calculate total bead count from pattern dimensions
-            bead_count = pattern_data.get("width", 0) * pattern_data.get("height", 0)
-
-            return PatternSizeResult(
-                size=size_config["name"],
-                boardsWidth=pattern_data.get("boards_width", 0),
-                boardsHeight=pattern_data.get("boards_height", 0),
-                patternBase64=pattern_base64,
-                mockupBase64=None,  # Load separately via /patterns/generate-mockup
-                colorsUsed=colors_used,
-                patternData=pattern_data,
-                beadCount=bead_count
-            )
+        # Preprocess once, then build every size from the shared pyramid in its own CPU
+        # worker (using base_image which is either original or AI-transformed)
+        generated = await generate_patterns_in_cpu_pool(base_image, board_sizes, generation_options)
+
+        # A failed AI transformation falls back to the original image - don't cache that as ai-style
+        if style != "ai-style" or base_image is not image:
+            for key, result in zip(cache_keys, generated):
+                PATTERN_RESULT_CACHE.put(key, result)
+
+    results = []
+    for size_config, (pattern_base64, colors_used, pattern_data) in zip(sizes, generated):
+        # Mockup generation moved to separate endpoint for better UX
+        # Frontend can load mockups progressively via /patterns/generate-mockup
+
+        # Calculate total bead count from pattern dimensions
+        bead_count = pattern_data.get("width", 0) * pattern_data.get("height", 0)
+
+        results.append(PatternSizeResult(
+            size=size_config["name"],
+            boardsWidth=pattern_data.get("boards_width", 0),
+            boardsHeight=pattern_data.get("boards_height", 0),
+            patternBase64=pattern_base64,
+            mockupBase64=None,  # Load separately via /patterns/generate-mockup
+            colorsUsed=colors_used,
+            patternData=pattern_data,
+            beadCount=bead_count
+        ))
+
+    return results
+
+
+@router.post("/patterns/generate-three-sizes", response_model=GenerateThreeSizesResponse)
+async def generate_three_sizes(request: GenerateThreeSizesRequest):
+    """
+    Generate patterns in three sizes (small, medium, large).
+    Mockups can be generated separately using /patterns/generate-mockup endpoint.
+    /patterns/generate-three-sizes/upload is the same endpoint without base64.
 
-        # Run all generations in parallel
-        results = await asyncio.gather(*[generate_single_size(size) for size in sizes])
+    Args:
+        request: Contains base64 image, style ("realistic" or "ai-style") and color metric
 
+    Returns:
+        Three patterns in different sizes (without mockups for faster response)
+    """
+    validate_color_metric(request.colorMetric)
+
+    try:
+        # Decode base64 image
+        image_data = base64.b64decode(request.image.split(',')[1] if ',' in request.image else request.image)
+        results = await generate_three_size_results(image_data, request.style, request.colorMetric)
         return GenerateThreeSizesResponse(patterns=results)
 
     except Exception as e:
         logger.error(f"Error in generate_three_sizes: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating patterns: {str(e)}")
 
+
+THREE_SIZES_RESPONSE_FORMATS = ("json", "multipart")
+
+
+def build_three_sizes_multipart(results: List[PatternSizeResult]) -> Response:
+    """
+    Encode pattern results as a multipart/mixed body without base64 or nested lists.
+
+    The first part is a JSON manifest with everything except the images and grids.
+    Each pattern then has two parts, referenced from the manifest by Content-ID:
+    the raw PNG and the grid packed as row-major indices into "codes"
+    (uint8, or uint16 if "dtype" says so).
+
+    Args:
+        results: Patterns as returned by generate_three_size_results
+
+    Returns:
+        multipart/mixed Response
+    """
+    manifest = []
+    binary_parts = []
+    for result in results:
+        pattern_data = dict(result.patternData)
+        codes, index_grid = pack_code_grid(pattern_data.pop("grid"))
+        pattern_data["grid_encoding"] = {
+            "codes": codes,
+            "dtype": index_grid.dtype.name,
+            "shape": list(index_grid.shape),
+        }
+
+        image_id = f"{result.size}-image"
+        grid_id = f"{result.size}-grid"
+        manifest.append({
+            "size": result.size,
+            "boardsWidth": result.boardsWidth,
+            "boardsHeight": result.boardsHeight,
+            "colorsUsed": result.colorsUsed,
+            "patternData": pattern_data,
+            "beadCount": result.beadCount,
+            "image": image_id,
+            "grid": grid_id,
+        })
+        binary_parts.append((image_id, "image/png", base64.b64decode(result.patternBase64.split(',', 1)[-1])))
+        binary_parts.append((grid_id, "application/octet-stream", index_grid.astype(f"<{index_grid.dtype.char}").tobytes()))
+
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    parts = [("manifest", "application/json", json.dumps({"patterns": manifest}).encode("utf-8"))] + binary_parts
+    for content_id, content_type, payload in parts:
+        body.write(
+            f"--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-ID: <{content_id}>\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii")
+        )
+        body.write(payload)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode("ascii"))
+
+    return Response(content=body.getvalue(), media_type=f'multipart/mixed; boundary="{boundary}"')
+
+
+@router.post("/patterns/generate-three-sizes/upload")
+async def generate_three_sizes_upload(
+    file: UploadFile = File(...),
+    style: str = Form(...),
+    colorMetric: str = Form("rgb"),
+    response_format: str = "json"
+):
+    """
+    Same as /patterns/generate-three-sizes, with the image sent as multipart/form-data.
+
+    Args:
+        file: The image file
+        style: "realistic" or "ai-style"
+        colorMetric: Color distance metric
+        response_format: "json" (same response as the base64 endpoint) or "multipart"
+            (see build_three_sizes_multipart)
+
+    Returns:
+        GenerateThreeSizesResponse, or a multipart/mixed body
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    if response_format not in THREE_SIZES_RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid response_format '{response_format}'. Must be one of: {', '.join(THREE_SIZES_RESPONSE_FORMATS)}"
+        )
+    validate_color_metric(colorMetric)
+
+    try:
+        content = await file.read()
+        results = await generate_three_size_results(content, style, colorMetric)
+    except Exception as e:
+        logger.error(f"Error in generate_three_sizes_upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error generating patterns: {str(e)}")
+
+    if response_format == "multipart":
+        return build_three_sizes_multipart(results)
+    return GenerateThreeSizesResponse(patterns=results)
+
+
 @router.post("/patterns/generate-mockup", response_model=GenerateMockupResponse)
 async def generate_mockup(request: GenerateMockupRequest):
     """
@@ -262,6 +434,34 @@ async def generate_mockup(request: GenerateMockupRequest):
     except Exception as e:
         logger.error(f"Error generating mockup: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating mockup: {str(e)}")
+
+
+def validate_color_metric(color_metric: str) -> None:
+    """Raises a 400 error if the color metric is not supported."""
+    if color_metric not in COLOR_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid color metric '{color_metric}'. Must be one of: {', '.join(COLOR_METRICS)}"
+        )
+
+
+def validate_pattern_image_format(format: str) -> None:
+    """Raises a 400 error if the pattern image format is not supported."""
+    if format not in PATTERN_IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image format '{format}'. Must be one of: {', '.join(PATTERN_IMAGE_FORMATS)}"
+        )
+
+
+def pattern_image_cache_headers(render_key: str) -> Dict[str, str]:
+    """ETag and Cache-Control headers for a rendered pattern image."""
+    return {
+        "ETag": f'"{render_key}"',
+        "Cache-Control": f"public, max-age={settings.PATTERN_IMAGE_MAX_AGE}"
+    }
+
+
 def ensure_colors_have_hex(colors_used: List[Dict]) -> List[Dict]:
     """
     Ensures all colors in colors_used have hex values populated.
@@ -300,24 +500,14 @@ async def suggest_boards(file: UploadFile = File(...)):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    temp_file = None
     try:
-        # Create temporary file for analysis
-        suffix = Path(file.filename).suffix if file.filename else '.png'
-        temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        # Only the dimensions are needed, so read them from the header without decoding
         content = await file.read()
-        temp_file.write(content)
-        temp_file.close()
+        width, height = probe_image_size(content)
 
-        suggestion = suggest_board_dimensions_from_file(temp_file.name)
-
-        return suggestion
+        return suggest_board_dimensions_for_size(width, height)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing image: {str(e)}")
-    finally:
-        # Clean up temp file
-        if temp_file and Path(temp_file.name).exists():
-            Path(temp_file.name).unlink()
 
 @router.post("/patterns/upload", response_model=PatternResponse)
 async def upload_image(
@@ -333,23 +523,25 @@ async def upload_image(
     simplify_details: bool = True,
     simplification_method: str = "bilateral",
     simplification_strength: str = "strong",
+    color_metric: str = "rgb",
     db: Session = Depends(get_db)
 ):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
+    validate_color_metric(color_metric)
+
     file_uuid = str(uuid.uuid4())
 
-    # Read file content and process in memory
+    # Read file content and decode at the smallest scale the pattern needs (RGB)
     content = await file.read()
-    image = Image.open(io.BytesIO(content))
-
-    # Ensure RGB mode
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
+    try:
+        image = decode_image_for_pattern(content, (boards_width * BOARD_SIZE, boards_height * BOARD_SIZE))
+    except (OSError, Image.DecompressionBombError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read image: {str(e)}")
 
     try:
-        pattern_image_base64, colors_used, pattern_data = convert_image_to_pattern_in_memory(
+        pattern_image_base64, colors_used, pattern_data = convert_image_to_pattern_cached(
             image,
             boards_width=boards_width,
             boards_height=boards_height,
@@ -364,7 +556,8 @@ async def upload_image(
             simplify_details=simplify_details,
             simplification_method=simplification_method,
             simplification_strength=simplification_strength,
-            use_nearest_neighbor=True  # Preserve sharp edges and avoid color blending at boundaries
+            use_nearest_neighbor=True,  # Preserve sharp edges and avoid color blending at boundaries
+            color_metric=color_metric
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
@@ -388,27 +581,62 @@ async def upload_image(
         styled_image_base64=None
     )
 
-@router.get("/patterns")
+@router.get("/patterns", response_model=List[PatternResponse])
 def get_all_patterns(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PATTERN_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    boards_width: Optional[int] = None,
+    boards_height: Optional[int] = None,
+    styled: Optional[bool] = None,
+    sanity_product_id: Optional[str] = None,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
 ):
-    """Get all patterns from the database"""
-    patterns = db.query(Pattern).order_by(Pattern.created_at.desc()).all()
+    """
+    List patterns newest first, without their grids.
+
+    pattern_data contains everything except "grid"; use GET /patterns/{id} for
+    the full pattern. With limit set, the X-Next-Cursor response header holds
+    the cursor for the next page (absent on the last page).
+
+    Args:
+        limit: Page size (default: all patterns)
+        cursor: X-Next-Cursor from the previous page
+        boards_width: Only patterns with this many boards in width
+        boards_height: Only patterns with this many boards in height
+        styled: Only AI-styled (true) or non-styled (false) patterns
+        sanity_product_id: Only the pattern linked to this Sanity product
+    """
+    try:
+        rows, next_cursor = list_pattern_summaries(
+            db,
+            limit=limit,
+            cursor=cursor,
+            boards_width=boards_width,
+            boards_height=boards_height,
+            styled=styled,
+            sanity_product_id=sanity_product_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         PatternResponse(
             id=pattern.id,
             uuid=pattern.uuid,
-            pattern_image_url=pattern.pattern_data.get("sanity_pattern_image_url", "") if pattern.pattern_data else "",
+            pattern_image_url=pattern_meta.get("sanity_pattern_image_url", "") if pattern_meta else "",
             grid_size=pattern.grid_size,
             colors_used=ensure_colors_have_hex(pattern.colors_used or []),
             created_at=pattern.created_at,
-            boards_width=pattern.pattern_data.get("boards_width") if pattern.pattern_data else None,
-            boards_height=pattern.pattern_data.get("boards_height") if pattern.pattern_data else None,
-            pattern_data=pattern.pattern_data
+            boards_width=pattern_meta.get("boards_width") if pattern_meta else None,
+            boards_height=pattern_meta.get("boards_height") if pattern_meta else None,
+            pattern_data=pattern_meta
         )
-        for pattern in patterns
+        for pattern, pattern_meta in rows
     ]
 
 @router.get("/patterns/{pattern_id}", response_model=PatternResponse)
@@ -430,7 +658,7 @@ def get_pattern(pattern_id: str, db: Session = Depends(get_db)):
         created_at=pattern.created_at,
         boards_width=pattern.pattern_data.get("boards_width") if pattern.pattern_data else None,
         boards_height=pattern.pattern_data.get("boards_height") if pattern.pattern_data else None,
-        pattern_data=pattern.pattern_data
+        pattern_data=expand_pattern_data(pattern.pattern_data)
     )
 
 
@@ -582,6 +810,10 @@ def download_pattern_pdf(
     Page 2: Board layout and assembly instructions
     Page 3+: Individual board pages with beads shown as colored circles
 
+    PDFs are served from the on-disk PDF cache when the pattern, palette and
+    template are unchanged; otherwise the PDF is generated, cached and
+    streamed out in chunks.
+
     Query Parameters:
         product_title: Optional product title to display on the title page
     """
@@ -594,17 +826,21 @@ def download_pattern_pdf(
         raise HTTPException(status_code=400, detail="Pattern data not available for PDF generation")
 
     try:
-        pdf_bytes = generate_pattern_pdf(
+        pdf_file = open_pattern_pdf(
+            pattern_id=str(pattern.id),
             pattern_data=pattern.pattern_data,
             colors_used=pattern.colors_used,
             product_title=product_title
         )
+        pdf_size = pdf_file.seek(0, io.SEEK_END)
+        pdf_file.seek(0)
 
-        return Response(
-            content=pdf_bytes,
+        return StreamingResponse(
+            iter_pdf_chunks(pdf_file),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=perlemønster_{pattern_id}.pdf"
+                "Content-Disposition": f"attachment; filename=perlemønster_{pattern_id}.pdf",
+                "Content-Length": str(pdf_size)
             }
         )
 
@@ -612,21 +848,54 @@ def download_pattern_pdf(
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
 @router.get("/patterns/{pattern_id}/image")
-def get_pattern_image(pattern_id: str, db: Session = Depends(get_db)):
+def get_pattern_image(
+    pattern_id: str,
+    grid_lines: bool = False,
+    board_lines: bool = False,
+    format: str = "png",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Serve the pattern image rendered from grid data.
     For database patterns, renders the image on-demand from the stored grid.
+    Optional grid_lines / board_lines overlay bead and board separators.
+    format is "png" (palette PNG) or "webp" (lossless WebP, smaller previews).
+
+    Rendered images are cached and sent with a strong ETag; a request whose
+    If-None-Match matches gets 304 without rendering.
     """
+    validate_pattern_image_format(format)
+
     # Try to get pattern from database
     pattern = db.query(Pattern).filter(Pattern.id == pattern_id).first()
 
     if pattern and pattern.pattern_data and "grid" in pattern.pattern_data:
+        grid = pattern.pattern_data["grid"]
+        storage_version = pattern.pattern_data.get("storage_version", 1)
+        key = make_render_key(pattern_id, compute_grid_digest(grid, storage_version), {
+            "bead_size": 20,
+            "grid_lines": grid_lines,
+            "board_lines": board_lines,
+            "format": format
+        })
+        headers = pattern_image_cache_headers(key)
+
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
         # Render from grid data
-        image = render_grid_to_image(pattern.pattern_data["grid"], bead_size=20)
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-        buffer.seek(0)
-        return Response(content=buffer.getvalue(), media_type="image/png")
+        content = get_or_render(pattern_id, key, lambda: encode_pattern_image(
+            render_grid_to_image(
+                grid,
+                bead_size=20,
+                storage_version=storage_version,
+                grid_lines=grid_lines,
+                board_lines=board_lines
+            ),
+            format
+        ))
+        return Response(content=content, media_type=PATTERN_IMAGE_MEDIA_TYPES[format], headers=headers)
 
     raise HTTPException(status_code=404, detail="Pattern image not found")
 
@@ -666,6 +935,8 @@ def delete_pattern(
     # Delete pattern from database
     db.delete(pattern)
     db.commit()
+    invalidate_pattern_images(pattern_id)
+    invalidate_pattern_pdfs(pattern_id)
 
     return {
         "success": True,
@@ -707,9 +978,12 @@ def update_pattern_grid(
     sample_value = update_request.grid[0][0] if update_request.grid and update_request.grid[0] else ""
     storage_version = 1 if sample_value.startswith("#") else 2
 
-    # Update the grid in pattern_data
-    pattern.pattern_data["grid"] = update_request.grid
-    pattern.pattern_data["storage_version"] = storage_version
+    # Update the grid in pattern_data (code grids are stored compressed as v3)
+    pattern.pattern_data = compress_pattern_data({
+        **pattern.pattern_data,
+        "grid": update_request.grid,
+        "storage_version": storage_version
+    })
 
     # Update colors_used if provided
     if update_request.colors_used is not None:
@@ -722,24 +996,42 @@ def update_pattern_grid(
     db.commit()
     db.refresh(pattern)
 
+    # Cached renderings and PDFs of the old grid must not be served again
+    invalidate_pattern_images(pattern_id)
+    invalidate_pattern_pdfs(pattern_id)
+
     return {
         "success": True,
         "message": "Pattern grid updated successfully"
     }
 
 @router.get("/patterns/{pattern_id}/render-grid")
-def render_pattern_grid(pattern_id: str, bead_size: int = 10, db: Session = Depends(get_db)):
+def render_pattern_grid(
+    pattern_id: str,
+    bead_size: int = 10,
+    grid_lines: bool = False,
+    board_lines: bool = False,
+    format: str = "png",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Renders the pattern grid to a base64 PNG image.
     Useful for generating up-to-date pattern images after grid modifications.
+    Rendered images are cached; a matching If-None-Match gets 304.
 
     Args:
         pattern_id: The pattern ID
         bead_size: Size of each bead in pixels (default: 10)
+        grid_lines: Draw lines between beads
+        board_lines: Draw separators between 29x29 boards
+        format: "png" (palette PNG) or "webp" (lossless WebP)
 
     Returns:
-        JSON with base64 encoded PNG image
+        JSON with base64 encoded image
     """
+    validate_pattern_image_format(format)
+
     pattern = db.query(Pattern).filter(Pattern.id == pattern_id).first()
 
     if not pattern:
@@ -751,20 +1043,39 @@ def render_pattern_grid(pattern_id: str, bead_size: int = 10, db: Session = Depe
     try:
         grid = pattern.pattern_data["grid"]
         storage_version = pattern.pattern_data.get("storage_version", 1)
-
-        base64_image = render_grid_to_base64(
-            grid,
-            bead_size=bead_size,
-            storage_version=storage_version
-        )
-
-        return {
+        key = make_render_key(pattern_id, compute_grid_digest(grid, storage_version), {
+            "bead_size": bead_size,
+            "grid_lines": grid_lines,
+            "board_lines": board_lines,
+            "format": format
+        })
+        headers = pattern_image_cache_headers(key)
+
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        # Same key as /image with these options, so both endpoints share cached bytes
+        content = get_or_render(pattern_id, key, lambda: encode_pattern_image(
+            render_grid_to_image(
+                grid,
+                bead_size=bead_size,
+                storage_version=storage_version,
+                grid_lines=grid_lines,
+                board_lines=board_lines
+            ),
+            format
+        ))
+        base64_image = f"data:{PATTERN_IMAGE_MEDIA_TYPES[format]};base64,{base64.b64encode(content).decode('utf-8')}"
+
+        height, width = get_grid_shape(grid, storage_version) if grid else (0, 0)
+
+        return JSONResponse(content={
             "pattern_image_base64": base64_image,
-            "width": len(grid[0]) if grid else 0,
-            "height": len(grid),
+            "width": width,
+            "height": height,
             "bead_size": bead_size,
             "storage_version": storage_version
-        }
+        }, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error rendering grid: {str(e)}")
 
@@ -796,6 +1107,7 @@ def refresh_color_cache(admin: AdminUser = Depends(get_current_admin)):
         clear_color_cache()
         from app.services.color_service import get_perle_colors as load_colors
         colors = load_colors(force_reload=True)
+        purge_stale_palette_pdfs()
         return {
             "success": True,
             "message": "Color cache refreshed successfully",
@@ -803,3 +1115,11 @@ def refresh_color_cache(admin: AdminUser = Depends(get_current_admin)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refreshing color cache: {str(e)}")
+
+
+@router.get("/admin/pattern-cache-stats")
+def pattern_cache_stats(admin: AdminUser = Depends(get_current_admin)):
+    """
+    Admin endpoint returning hit/miss counters of the generated pattern cache.
+    """
+    return get_pattern_cache_stats()
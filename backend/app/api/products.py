@@ -1,5 +1,6 @@
 from math import ceil
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin
@@ -11,7 +12,11 @@ from app.services.sanity_service import SanityService
 from app.services.room_template_service import RoomTemplateService
 from app.services.mockup_generator import MockupGenerator
 from app.services.color_service import code_to_hex
+from app.services.grid_storage import compress_pattern_data, expand_pattern_data
+from app.services.image_encoding import encode_pattern_image
+from PIL import Image
 import base64
+import io
 import logging
 import uuid as uuid_lib
 
@@ -148,14 +153,9 @@ async def create_product_from_pattern_data(
     except ValueError as e:
         raise HTTPException(status_code=500, detail=f"Sanity configuration error: {str(e)}")
 
-    # Check if pattern already exists with this SKU
-    # Query all patterns and check in Python since JSONB querying can be tricky
-    existing_patterns = db.query(Pattern).all()
-    for pattern in existing_patterns:
-        if (pattern.pattern_data and
-            isinstance(pattern.pattern_data, dict) and
-            pattern.pattern_data.get("sanity_product_sku") == product_data.sku):
-            raise HTTPException(status_code=400, detail="Pattern with this SKU already exists")
+    # Check if pattern already exists with this SKU (unique index lookup)
+    if db.query(Pattern.id).filter(Pattern.sanity_product_sku == product_data.sku).first():
+        raise HTTPException(status_code=400, detail="Pattern with this SKU already exists")
 
     # Upload images to Sanity
     try:
@@ -164,7 +164,8 @@ async def create_product_from_pattern_data(
         if ',' in pattern_base64:
             pattern_base64 = pattern_base64.split(',', 1)[1]
 
-        pattern_image_bytes = base64.b64decode(pattern_base64)
+        # Re-encode as a palette PNG so Sanity stores (and serves) the compact version
+        pattern_image_bytes = encode_pattern_image(Image.open(io.BytesIO(base64.b64decode(pattern_base64))))
         pattern_filename = f"{product_data.slug}-pattern.png"
         pattern_upload_result = await sanity_service.upload_image_from_bytes(
             pattern_image_bytes,
@@ -246,12 +247,18 @@ async def create_product_from_pattern_data(
 
     db_pattern = Pattern(
         uuid=pattern_uuid,
-        pattern_data=product_data.pattern_data,
+        pattern_data=compress_pattern_data(product_data.pattern_data),
         grid_size=grid_size,
         colors_used=product_data.colors_used,
+        sanity_product_sku=product_data.sku,
     )
     db.add(db_pattern)
-    db.flush()  # Get the pattern ID
+    try:
+        db.flush()  # Get the pattern ID
+    except IntegrityError:
+        # Another request created a pattern with this SKU since the check above
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Pattern with this SKU already exists")
 
     # Create product document in Sanity
     try:
@@ -309,7 +316,9 @@ async def create_product_from_pattern_data(
 
         logger.info(f"Successfully created product in Sanity: {sanity_product_result}")
     except Exception as e:
-        # Pattern is created, but Sanity product creation failed
+        # Pattern is created, but Sanity product creation failed. Release the SKU
+        # (it only claimed it against concurrent requests) so the admin can retry
+        db_pattern.sanity_product_sku = None
         db.commit()  # Commit pattern anyway
         logger.warning(f"Failed to create product in Sanity, but pattern saved in database: {str(e)}")
         raise HTTPException(
@@ -334,5 +343,5 @@ async def create_product_from_pattern_data(
         created_at=db_pattern.created_at,
         boards_width=boards_w,
         boards_height=boards_h,
-        pattern_data=db_pattern.pattern_data
+        pattern_data=expand_pattern_data(db_pattern.pattern_data)
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Header, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Request, Header, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
 import logging
@@ -14,6 +14,7 @@ from app.models.address import Address
 from app.models.customer import Customer
 from app.services.email_service import email_service
 from app.services.discord_service import discord_service
+from app.services.pdf_cache import pregenerate_order_pdfs
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,7 @@ def verify_sanity_webhook(body: bytes, signature: Optional[str], secret: str) ->
 @router.post("/webhooks/vipps")
 async def vipps_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
@@ -195,6 +197,9 @@ async def vipps_webhook(
             )
             logger.info(f"Queued Discord notification for order {order.order_number}")
 
+            # Generate the order's pattern PDFs after the response so downloads hit the PDF cache
+            background_tasks.add_task(pregenerate_order_pdfs, order.id)
+
             # Return immediately - emails and notifications will be sent in background
             return {"status": "ok"}
 
@@ -30,6 +30,30 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""
     RESEND_FROM_EMAIL: str = "hei@kontakt.feelpearly.no"
 
+    # Pattern generation worker processes (0 = one per available core, respecting the container CPU quota)
+    CPU_WORKERS: int = 0
+
+    # Background removal (rembg): "u2net", "u2netp" (fast) or "isnet-general-use" (quality)
+    REMBG_MODEL: str = "u2net"
+    REMBG_INTRA_OP_THREADS: int = 0  # 0 = onnxruntime default
+    REMBG_MAX_CONCURRENCY: int = 2
+    REMBG_PRELOAD: bool = True  # Load and warm up the model in a background thread at startup
+
+    # Generated pattern cache (in-memory LRU byte budget, optional on-disk directory with its own budget)
+    PATTERN_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PATTERN_CACHE_DIR: str = ""
+    PATTERN_CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Rendered pattern image cache (in-memory LRU byte budget) and browser cache lifetime
+    RENDER_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PATTERN_IMAGE_MAX_AGE: int = 60  # Seconds before browsers revalidate with If-None-Match
+
+    # Generated PDF cache on disk (off unless a directory is set) and its size limit
+    PDF_CACHE_DIR: str = ""
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PDF_BOARD_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # In-memory per-board page content for fast rebuilds
+    PDF_BOARD_WORKERS: int = 0  # Processes that build PDF board pages in parallel (0 = in-process)
+
     # Discord notifications
     DISCORD_WEBHOOK_URL: str = ""  # Discord webhook URL for order notifications
 
@@ -3,9 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api import patterns, products, auth, orders, checkout, webhooks, colors
+from app.services.cpu_pool import shutdown_cpu_executor
 import logging
 
 # Configure logging
@@ -155,6 +157,18 @@ def run_pattern_migration():
         logger.warning("Continuing without pattern migration...")
 
 
+def preload_background_removal():
+    """Create and warm up the rembg session so uploads only pay for inference"""
+    try:
+        from app.services.background_removal import init_background_removal
+
+        init_background_removal(warm_up=True)
+        logger.info(f"✅ Background removal model '{settings.REMBG_MODEL}' ready")
+    except Exception as e:
+        logger.error(f"Failed to preload background removal model: {e}")
+        logger.warning("Continuing - the model will be loaded on first use...")
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
@@ -167,10 +181,20 @@ async def lifespan(_: FastAPI):
     # Run pattern storage migration (v1 → v2)
     run_pattern_migration()
 
+    # Load the background removal model once instead of per request. Runs in a
+    # thread so the worker starts serving immediately; a request that needs the
+    # model meanwhile waits for the session lock instead of loading it twice
+    preload_task = None
+    if settings.REMBG_PRELOAD:
+        preload_task = asyncio.create_task(asyncio.to_thread(preload_background_removal))
+
     yield
 
     # Shutdown (cleanup code goes here if needed)
     logger.info("Shutting down application...")
+    if preload_task is not None and not preload_task.done():
+        preload_task.cancel()
+    shutdown_cpu_executor()
 
 
 app = FastAPI(
@@ -186,6 +210,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor for GET /api/patterns
 )
 
 # Global exception handlers to ensure CORS headers are always present
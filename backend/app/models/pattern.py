@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,3 +13,9 @@ class Pattern(Base):
     grid_size = Column(Integer)
     colors_used = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sanity_product_sku = Column(String, unique=True, index=True, nullable=True)  # SKU of the product created from this pattern
+
+    __table_args__ = (
+        # Keyset pagination of the admin pattern list (newest first)
+        Index("ix_patterns_created_at_id", "created_at", "id"),
+    )
@@ -4,7 +4,6 @@ Separate from image_processing.py to keep AI generation logic isolated.
 """
 
 from typing import Optional, Dict
-import replicate
 from PIL import Image
 import requests
 from io import BytesIO
@@ -57,6 +56,9 @@ class AIGenerationService:
         Args:
             api_token: Replicate API token. If None, will use REPLICATE_API_TOKEN env var.
         """
+        # replicate is imported here rather than at module level to keep app startup fast
+        import replicate
+
         self.api_token = api_token
         if api_token:
             self.client = replicate.Client(api_token=api_token)
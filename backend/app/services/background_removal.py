@@ -0,0 +1,128 @@
+"""
+Background removal model sessions.
+
+rembg.remove() without a session builds a new ONNX inference session on every
+call. This module keeps one session per process, created at startup (see
+main.lifespan) with configurable onnxruntime threading, warmed up with a tiny
+inference, and guarded by a semaphore that bounds concurrent inferences.
+The session and its semaphore are read and replaced together under one lock,
+so a reset never pulls the semaphore out from under an in-flight call.
+
+Model choice (REMBG_MODEL): "u2net" (default, pre-downloaded in the Docker
+image), "u2netp" for speed or "isnet-general-use" for quality.
+"""
+
+import logging
+import os
+import threading
+from typing import Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# rembg pulls in pymatting/numba. With numba's TBB threading layer, importing it
+# from a non-main thread (e.g. a threadpool request or the TestClient lifespan)
+# makes interpreter shutdown hang, so default to the workqueue layer.
+os.environ.setdefault("NUMBA_THREADING_LAYER", "workqueue")
+
+# Global session state (created lazily or by init_background_removal)
+REMBG_SESSION = None
+REMBG_SEMAPHORE = threading.BoundedSemaphore(max(1, settings.REMBG_MAX_CONCURRENCY))
+_SESSION_LOCK = threading.Lock()
+
+
+def _create_session(model_name: str, intra_op_threads: int):
+    """Create a rembg session with the configured onnxruntime threading."""
+    # rembg/onnxruntime take about a second to import, so load them on first use
+    import onnxruntime as ort
+    from rembg import new_session
+
+    sess_opts = ort.SessionOptions()
+    if intra_op_threads > 0:
+        sess_opts.intra_op_num_threads = intra_op_threads
+    sess_opts.inter_op_num_threads = 1
+
+    return new_session(model_name, sess_opts=sess_opts)
+
+
+def _remove(image: Image.Image, session) -> Image.Image:
+    """Run rembg inference with the given session."""
+    from rembg import remove as rembg_remove
+
+    return rembg_remove(image, session=session)
+
+
+def _get_session_and_semaphore() -> Tuple[object, threading.BoundedSemaphore]:
+    """Get the session and the semaphore guarding it, creating both on first use."""
+    global REMBG_SESSION, REMBG_SEMAPHORE
+
+    with _SESSION_LOCK:
+        if REMBG_SESSION is None:
+            logger.info(
+                f"Loading background removal model '{settings.REMBG_MODEL}' "
+                f"(intra-op threads: {settings.REMBG_INTRA_OP_THREADS or 'default'})"
+            )
+            REMBG_SEMAPHORE = threading.BoundedSemaphore(max(1, settings.REMBG_MAX_CONCURRENCY))
+            REMBG_SESSION = _create_session(settings.REMBG_MODEL, settings.REMBG_INTRA_OP_THREADS)
+        return REMBG_SESSION, REMBG_SEMAPHORE
+
+
+def get_rembg_session():
+    """
+    Get the process-wide rembg session, creating it on first use.
+
+    Returns:
+        rembg BaseSession for settings.REMBG_MODEL
+    """
+    return _get_session_and_semaphore()[0]
+
+
+def init_background_removal(warm_up: bool = True) -> None:
+    """
+    Create the session at startup and run one small inference.
+
+    The first inference allocates onnxruntime buffers, so warming up keeps that
+    cost out of the first customer request.
+
+    Args:
+        warm_up: Run a warm-up inference after loading the model
+    """
+    get_rembg_session()
+
+    if warm_up:
+        run_background_removal(Image.new('RGB', (64, 64), (255, 255, 255)))
+        logger.info("Background removal model warmed up")
+
+
+def run_background_removal(image: Image.Image) -> Image.Image:
+    """
+    Remove the background from an image using the shared session.
+
+    At most REMBG_MAX_CONCURRENCY inferences run at once; further callers wait.
+
+    Args:
+        image: Input PIL Image
+
+    Returns:
+        RGBA PIL Image with a transparent background
+    """
+    session, semaphore = _get_session_and_semaphore()
+    with semaphore:
+        return _remove(image, session)
+
+
+def reset_background_removal() -> None:
+    """
+    Drop the session so the next call loads the model again.
+
+    In-flight calls keep the session and semaphore they started with; new calls
+    get a fresh pair.
+    """
+    global REMBG_SESSION, REMBG_SEMAPHORE
+
+    with _SESSION_LOCK:
+        REMBG_SESSION = None
+        REMBG_SEMAPHORE = threading.BoundedSemaphore(max(1, settings.REMBG_MAX_CONCURRENCY))
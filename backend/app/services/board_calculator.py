@@ -43,7 +43,7 @@ def calculate_dimensions_maintaining_aspect_ratio(
     return new_width, new_height
 
 
-def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -> Dict:
+def suggest_board_dimensions_for_size(width: int, height: int, min_boards_per_side: int = 2) -> Dict:
     """
     Analyzes image and suggests three size options: small, medium, and large.
     Small: max 58x58 beads (2x2 boards)
@@ -51,11 +51,15 @@ def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -
     Large: max 174x174 beads (6x6 boards)
     Each size maintains the aspect ratio of the original image.
 
+    Only the pixel dimensions are needed, so callers can read them from the
+    image header without decoding the image.
+
     Args:
-        image: PIL Image to analyze
+        width: Image width in pixels
+        height: Image height in pixels
         min_boards_per_side: Minimum number of boards for the shortest side (default: 2)
     """
-    aspect_ratio = image.width / image.height
+    aspect_ratio = width / height
 
     sizes = {
         "small": {"max_boards": 2},
@@ -67,7 +71,7 @@ def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -
     for size_name, size_config in sizes.items():
         max_boards = size_config["max_boards"]
 
-        if image.width >= image.height:
+        if width >= height:
             boards_width = max_boards
             boards_height = max(min_boards_per_side, round(max_boards / aspect_ratio))
         else:
@@ -85,7 +89,7 @@ def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -
             "beads_height": actual_beads_height
         }
 
-    total_pixels = image.width * image.height
+    total_pixels = width * height
     megapixels = total_pixels / 1_000_000
 
     if megapixels < 0.5:
@@ -99,10 +103,21 @@ def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -
         "sizes": size_options,
         "suggested_size": suggested_size,
         "aspect_ratio": aspect_ratio,
-        "image_dimensions": {"width": image.width, "height": image.height}
+        "image_dimensions": {"width": width, "height": height}
     }
 
 
+def suggest_board_dimensions(image: Image.Image, min_boards_per_side: int = 2) -> Dict:
+    """
+    Suggests board dimensions for a PIL Image (see suggest_board_dimensions_for_size).
+
+    Args:
+        image: PIL Image to analyze
+        min_boards_per_side: Minimum number of boards for the shortest side (default: 2)
+    """
+    return suggest_board_dimensions_for_size(image.width, image.height, min_boards_per_side=min_boards_per_side)
+
+
 def suggest_board_dimensions_from_file(image_path: str, min_boards_per_side: int = 2) -> Dict:
     """
     Wrapper function that accepts a file path instead of an Image object.
@@ -112,5 +127,6 @@ def suggest_board_dimensions_from_file(image_path: str, min_boards_per_side: int
         image_path: Path to the image file
         min_boards_per_side: Minimum number of boards for the shortest side (default: 2)
     """
-    img = Image.open(image_path)
-    return suggest_board_dimensions(img, min_boards_per_side=min_boards_per_side)
+    # Image.open only parses the header, which is all that is needed here
+    with Image.open(image_path) as img:
+        return suggest_board_dimensions(img, min_boards_per_side=min_boards_per_side)
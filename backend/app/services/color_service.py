@@ -8,9 +8,12 @@ for Perle bead colors.
 from fastapi import HTTPException
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
+import hashlib
 import json
 import math
 
+import numpy as np
+
 _CURRENT_DIR = Path(__file__).parent.parent
 PERLE_COLORS_FILEPATH = _CURRENT_DIR / "data" / "perle-colors.json"
 PERLE_COLORS_CACHE: Optional[List[Dict]] = None
@@ -19,6 +22,39 @@ PERLE_COLORS_CACHE: Optional[List[Dict]] = None
 CODE_TO_COLOR_MAP: Optional[Dict[str, Dict]] = None  # "01" -> {name, hex, code, rgb}
 HEX_TO_COLOR_MAP: Optional[Dict[str, Dict]] = None   # "#FDFCF5" -> {name, hex, code, rgb}
 
+# (N, 3) int32 array of palette RGB values, in the same order as PERLE_COLORS_CACHE
+PERLE_PALETTE_RGB: Optional[np.ndarray] = None
+# (N, 3) float64 array of palette CIELAB values, in the same order as PERLE_COLORS_CACHE
+PERLE_PALETTE_LAB: Optional[np.ndarray] = None
+
+# Supported distance metrics for color matching
+COLOR_METRICS = ("rgb", "cie76", "cie94", "ciede2000")
+
+# Number of unique colors matched per vectorized batch
+MATCH_CHUNK_SIZE = 16384
+
+# Palette-to-palette distance matrices per metric, built on first use
+PALETTE_DISTANCE_CACHE: Dict[str, np.ndarray] = {}
+
+# sRGB (D65) -> XYZ conversion constants
+_SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+_LAB_EPSILON = (6 / 29) ** 3
+
+# Precomputed RGB -> palette index cube, quantized to LUT_BITS per channel.
+# Cells whose RGB range spans more than one nearest color hold LUT_AMBIGUOUS
+# and are resolved with the exact matcher.
+LUT_BITS = 6
+LUT_AMBIGUOUS = np.iinfo(np.uint16).max
+PERLE_COLOR_LUT: Optional[np.ndarray] = None
+
+# Short hash of the loaded palette, changes whenever perle-colors.json changes
+PERLE_PALETTE_VERSION: Optional[str] = None
+
 
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Converts a HEX color string to an RGB tuple."""
@@ -60,6 +96,124 @@ def build_color_lookup_maps(colors: List[Dict]) -> Tuple[Dict[str, Dict], Dict[s
     return code_map, hex_map
 
 
+def build_palette_array(colors: List[Dict]) -> np.ndarray:
+    """
+    Build an (N, 3) int32 array of palette RGB values for vectorized matching.
+
+    Args:
+        colors: List of color dictionaries with an rgb field
+
+    Returns:
+        Array where row i holds the RGB value of colors[i]
+    """
+    return np.array([color["rgb"] for color in colors], dtype=np.int32).reshape(-1, 3)
+
+
+def get_palette_array() -> np.ndarray:
+    """
+    Get the cached palette RGB array, loading the palette if needed.
+
+    Returns:
+        (N, 3) int32 array aligned with get_perle_colors()
+    """
+    global PERLE_PALETTE_RGB
+    if PERLE_PALETTE_RGB is None:
+        get_perle_colors()  # Initialize palette array
+
+    return PERLE_PALETTE_RGB
+
+
+def get_palette_lab() -> np.ndarray:
+    """
+    Get the cached palette CIELAB array, loading the palette if needed.
+
+    Returns:
+        (N, 3) float64 array aligned with get_perle_colors()
+    """
+    global PERLE_PALETTE_LAB
+    if PERLE_PALETTE_LAB is None:
+        get_perle_colors()  # Initialize palette arrays
+
+    return PERLE_PALETTE_LAB
+
+
+def build_color_lookup_table(palette: np.ndarray, bits: int = LUT_BITS) -> np.ndarray:
+    """
+    Precompute the nearest palette index for every quantized RGB cell.
+
+    Each channel is split into 2**bits cells. Nearest-color regions are convex,
+    so when all eight corners of a cell share the same nearest color, every RGB
+    value inside the cell does too. Other cells are marked LUT_AMBIGUOUS.
+
+    Args:
+        palette: (N, 3) palette RGB array
+        bits: Bits per channel kept in the table (6 gives a 64x64x64 cube)
+
+    Returns:
+        (2**bits, 2**bits, 2**bits) uint16 array of palette indices
+    """
+    size = 1 << bits
+    step = 1 << (8 - bits)
+
+    # Lowest and highest channel value of each cell, interleaved
+    lows = np.arange(size, dtype=np.int32) * step
+    corner_values = np.stack([lows, lows + step - 1], axis=1).reshape(-1)
+
+    channel_dist = (corner_values[:, None, None] - palette[None, :, :].astype(np.int32)) ** 2
+    dist_r, dist_g, dist_b = channel_dist[..., 0], channel_dist[..., 1], channel_dist[..., 2]
+    dist_gb = dist_g[:, None, :] + dist_b[None, :, :]
+
+    nearest = np.empty((2 * size,) * 3, dtype=np.uint16)
+    for i in range(2 * size):
+        nearest[i] = np.argmin(dist_gb + dist_r[i], axis=-1)
+
+    corners = (
+        nearest.reshape(size, 2, size, 2, size, 2)
+        .transpose(0, 2, 4, 1, 3, 5)
+        .reshape(size, size, size, 8)
+    )
+    first_corner = corners[..., 0]
+    unambiguous = (corners == first_corner[..., None]).all(axis=-1)
+
+    return np.where(unambiguous, first_corner, LUT_AMBIGUOUS).astype(np.uint16)
+
+
+def compute_palette_version(colors: List[Dict]) -> str:
+    """
+    Compute a short, stable hash identifying the palette contents and order.
+
+    Args:
+        colors: List of color dictionaries with code and rgb fields
+
+    Returns:
+        12-character hex digest
+    """
+    payload = json.dumps([[c.get("code"), list(c["rgb"])] for c in colors])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def get_color_lookup_table() -> np.ndarray:
+    """
+    Get the cached RGB -> palette index lookup table, loading the palette if needed.
+    """
+    global PERLE_COLOR_LUT
+    if PERLE_COLOR_LUT is None:
+        get_perle_colors()  # Initialize lookup table
+
+    return PERLE_COLOR_LUT
+
+
+def get_palette_version() -> str:
+    """
+    Get the version hash of the loaded palette, loading the palette if needed.
+    """
+    global PERLE_PALETTE_VERSION
+    if PERLE_PALETTE_VERSION is None:
+        get_perle_colors()  # Initialize palette version
+
+    return PERLE_PALETTE_VERSION
+
+
 def code_to_hex(code: str) -> Optional[str]:
     """
     Convert color code to hex (e.g., "01" -> "#FDFCF5").
@@ -120,10 +274,16 @@ def clear_color_cache() -> None:
     Clear the color cache to force reload from file.
     Useful when perle-colors.json has been updated.
     """
-    global PERLE_COLORS_CACHE, CODE_TO_COLOR_MAP, HEX_TO_COLOR_MAP
+    global PERLE_COLORS_CACHE, CODE_TO_COLOR_MAP, HEX_TO_COLOR_MAP, PERLE_PALETTE_RGB
+    global PERLE_PALETTE_LAB, PERLE_COLOR_LUT, PERLE_PALETTE_VERSION, PALETTE_DISTANCE_CACHE
     PERLE_COLORS_CACHE = None
     CODE_TO_COLOR_MAP = None
     HEX_TO_COLOR_MAP = None
+    PERLE_PALETTE_RGB = None
+    PERLE_PALETTE_LAB = None
+    PERLE_COLOR_LUT = None
+    PERLE_PALETTE_VERSION = None
+    PALETTE_DISTANCE_CACHE = {}
     print("Color cache cleared - will reload from perle-colors.json on next request")
 
 
@@ -205,7 +365,8 @@ def get_perle_colors(force_reload: bool = False) -> List[Dict]:
     Args:
         force_reload: If True, bypass cache and reload from file
     """
-    global PERLE_COLORS_CACHE, CODE_TO_COLOR_MAP, HEX_TO_COLOR_MAP
+    global PERLE_COLORS_CACHE, CODE_TO_COLOR_MAP, HEX_TO_COLOR_MAP, PERLE_PALETTE_RGB
+    global PERLE_PALETTE_LAB, PERLE_COLOR_LUT, PERLE_PALETTE_VERSION, PALETTE_DISTANCE_CACHE
     if PERLE_COLORS_CACHE is not None and not force_reload:
         return PERLE_COLORS_CACHE
 
@@ -234,8 +395,14 @@ def get_perle_colors(force_reload: bool = False) -> List[Dict]:
 
         # Build bidirectional lookup maps
         CODE_TO_COLOR_MAP, HEX_TO_COLOR_MAP = build_color_lookup_maps(PERLE_COLORS_CACHE)
+        PERLE_PALETTE_RGB = build_palette_array(PERLE_COLORS_CACHE)
+        PERLE_PALETTE_LAB = rgb_to_lab(PERLE_PALETTE_RGB)
+        PERLE_COLOR_LUT = build_color_lookup_table(PERLE_PALETTE_RGB)
+        PERLE_PALETTE_VERSION = compute_palette_version(PERLE_COLORS_CACHE)
+        PALETTE_DISTANCE_CACHE = {}
         print(f"Successfully loaded and processed {len(PERLE_COLORS_CACHE)} Perle colors with RGB values.")
         print(f"Built lookup maps: {len(CODE_TO_COLOR_MAP)} codes, {len(HEX_TO_COLOR_MAP)} hex values.")
+        print(f"Built {PERLE_COLOR_LUT.shape[0]}^3 color lookup table for palette version {PERLE_PALETTE_VERSION}.")
 
         return PERLE_COLORS_CACHE
     except FileNotFoundError as e:
@@ -246,16 +413,220 @@ def get_perle_colors(force_reload: bool = False) -> List[Dict]:
         raise HTTPException(status_code=500, detail=f"Could not load or process Perle colors: {e}")
 
 
-def calculate_color_difference(rgb1: Tuple[int, int, int], rgb2: Tuple[int, int, int]) -> float:
-    """Calculates the Euclidean distance between two RGB colors."""
-    return math.sqrt(sum([(c1 - c2) ** 2 for c1, c2 in zip(rgb1, rgb2)]))
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Converts sRGB values (0-255) to CIELAB (D65 white point).
+
+    Args:
+        rgb: Array of shape (..., 3) with RGB values
+
+    Returns:
+        float64 array of shape (..., 3) with L*, a*, b* values
+    """
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+
+    xyz = linear @ _SRGB_TO_XYZ.T / _D65_WHITE
+    f = np.where(xyz > _LAB_EPSILON, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def delta_e_cie76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIE76 color difference (Euclidean distance in Lab). Broadcasts over leading axes."""
+    diff = np.asarray(lab1) - np.asarray(lab2)
+    return np.sqrt(np.sum(diff ** 2, axis=-1))
+
+
+def delta_e_cie94(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """
+    CIE94 color difference (graphic arts weights). Broadcasts over leading axes.
+    lab1 is the reference color whose chroma sets the weighting.
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    dL = L1 - L2
+    dC = C1 - C2
+    dH_sq = np.maximum((a1 - a2) ** 2 + (b1 - b2) ** 2 - dC ** 2, 0)
+
+    SC = 1 + 0.045 * C1
+    SH = 1 + 0.015 * C1
+    return np.sqrt(dL ** 2 + (dC / SC) ** 2 + dH_sq / SH ** 2)
+
+
+def delta_e_ciede2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIEDE2000 color difference (kL = kC = kH = 1). Broadcasts over leading axes."""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    C_bar7 = C_bar ** 7
+    G = 0.5 * (1 - np.sqrt(C_bar7 / (C_bar7 + 25 ** 7)))
+
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    chroma_product = C1p * C2p
+    zero_chroma = chroma_product == 0
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dhp = np.where(zero_chroma, 0, dhp)
+    dHp = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dhp) / 2)
+
+    L_barp = (L1 + L2) / 2
+    C_barp = (C1p + C2p) / 2
+
+    h_sum = h1p + h2p
+    h_barp = np.where(
+        np.abs(h1p - h2p) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2)
+    )
+    h_barp = np.where(zero_chroma, h_sum, h_barp)
+
+    T = (
+        1
+        - 0.17 * np.cos(np.radians(h_barp - 30))
+        + 0.24 * np.cos(np.radians(2 * h_barp))
+        + 0.32 * np.cos(np.radians(3 * h_barp + 6))
+        - 0.20 * np.cos(np.radians(4 * h_barp - 63))
+    )
+    d_theta = 30 * np.exp(-(((h_barp - 275) / 25) ** 2))
+    C_barp7 = C_barp ** 7
+    RC = 2 * np.sqrt(C_barp7 / (C_barp7 + 25 ** 7))
+    L_offset = (L_barp - 50) ** 2
+    SL = 1 + 0.015 * L_offset / np.sqrt(20 + L_offset)
+    SC = 1 + 0.045 * C_barp
+    SH = 1 + 0.015 * C_barp * T
+    RT = -np.sin(np.radians(2 * d_theta)) * RC
+
+    dL_term = dLp / SL
+    dC_term = dCp / SC
+    dH_term = dHp / SH
+    return np.sqrt(dL_term ** 2 + dC_term ** 2 + dH_term ** 2 + RT * dC_term * dH_term)
+
+
+def _validate_color_metric(metric: str) -> None:
+    if metric not in COLOR_METRICS:
+        raise ValueError(f"Unknown color metric '{metric}'. Expected one of: {', '.join(COLOR_METRICS)}")
+
+
+def _color_distances(
+    rgb: np.ndarray,
+    palette: np.ndarray,
+    palette_lab: Optional[np.ndarray],
+    metric: str
+) -> np.ndarray:
+    """
+    Computes an (N, P) distance matrix between N colors and P palette colors.
+    Only the ordering along the palette axis is meaningful for "rgb" and "cie76",
+    which skip the square root.
+    """
+    if metric == "rgb":
+        diff = rgb[:, None, :].astype(np.int32) - palette[None, :, :].astype(np.int32)
+        return np.einsum('npc,npc->np', diff, diff)
+
+    lab = rgb_to_lab(rgb)[:, None, :]
+    if metric == "cie76":
+        diff = lab - palette_lab[None, :, :]
+        return np.einsum('npc,npc->np', diff, diff)
+    if metric == "cie94":
+        return delta_e_cie94(lab, palette_lab[None, :, :])
+    return delta_e_ciede2000(lab, palette_lab[None, :, :])
 
 
-def find_closest_color(pixel_rgb: Tuple[int, int, int], bead_colors: List[Dict]) -> Dict:
+def compute_palette_distance_matrix(palette: np.ndarray, metric: str = "rgb") -> np.ndarray:
+    """
+    Computes a (P, P) matrix where entry [i, j] is the distance from palette
+    color i (the reference for "cie94") to palette color j.
+    For "rgb" and "cie76" the values are squared distances.
+    """
+    _validate_color_metric(metric)
+    palette_lab = rgb_to_lab(palette) if metric != "rgb" else None
+    return _color_distances(palette, palette, palette_lab, metric)
+
+
+def get_palette_distance_matrix(metric: str = "rgb") -> np.ndarray:
+    """
+    Get the cached palette-to-palette distance matrix for a metric.
+
+    Returns:
+        (N, N) array aligned with get_perle_colors()
+    """
+    _validate_color_metric(metric)
+    palette = get_palette_array()
+
+    if metric not in PALETTE_DISTANCE_CACHE:
+        PALETTE_DISTANCE_CACHE[metric] = compute_palette_distance_matrix(palette, metric)
+
+    return PALETTE_DISTANCE_CACHE[metric]
+
+
+def calculate_color_difference(
+    rgb1: Tuple[int, int, int],
+    rgb2: Tuple[int, int, int],
+    metric: str = "rgb"
+) -> float:
+    """
+    Calculates the difference between two RGB colors.
+
+    Args:
+        rgb1: First RGB color (the reference for "cie94")
+        rgb2: Second RGB color
+        metric: "rgb" (Euclidean RGB distance), "cie76", "cie94" or "ciede2000"
+    """
+    if metric == "rgb":
+        return math.sqrt(sum([(c1 - c2) ** 2 for c1, c2 in zip(rgb1, rgb2)]))
+
+    _validate_color_metric(metric)
+    lab1, lab2 = rgb_to_lab(np.array([rgb1, rgb2]))
+    if metric == "cie76":
+        return float(delta_e_cie76(lab1, lab2))
+    if metric == "cie94":
+        return float(delta_e_cie94(lab1, lab2))
+    return float(delta_e_ciede2000(lab1, lab2))
+
+
+def find_closest_color(
+    pixel_rgb: Tuple[int, int, int],
+    bead_colors: List[Dict],
+    metric: str = "rgb"
+) -> Dict:
     """Finds the closest bead color to a given pixel's RGB value."""
     if not bead_colors:
         raise ValueError("Bead color list is empty, cannot find closest color.")
 
+    if metric != "rgb":
+        # Perceptual metrics are costly per pair, so evaluate all candidates at once
+        candidates = [bc for bc in bead_colors if bc.get("rgb")]
+        if not candidates:
+            return bead_colors[0]
+        palette = np.array([bc["rgb"] for bc in candidates], dtype=np.int32)
+        index = match_colors_to_palette(np.array([pixel_rgb]), palette, metric)[0]
+        return candidates[index]
+
     min_difference = float('inf')
     closest_color_info = bead_colors[0]
 
@@ -263,8 +634,102 @@ def find_closest_color(pixel_rgb: Tuple[int, int, int], bead_colors: List[Dict])
         bead_rgb = bead_color.get("rgb")
         if not bead_rgb:
             continue
-        difference = calculate_color_difference(pixel_rgb, bead_rgb)
+        difference = calculate_color_difference(pixel_rgb, bead_rgb, metric)
         if difference < min_difference:
             min_difference = difference
             closest_color_info = bead_color
     return closest_color_info
+
+
+def match_colors_to_palette(
+    pixels: np.ndarray,
+    palette: Optional[np.ndarray] = None,
+    metric: str = "rgb"
+) -> np.ndarray:
+    """
+    Finds the closest palette color for every pixel in one vectorized pass.
+
+    Distances are only computed for the unique colors in the image, which is
+    usually a small fraction of the pixel count, in chunks to bound memory.
+    Ties resolve to the lowest palette index, matching find_closest_color.
+
+    Args:
+        pixels: (H, W, 3) or (N, 3) array of RGB values
+        palette: Optional (P, 3) palette array (defaults to the cached Perle palette)
+        metric: "rgb", "cie76", "cie94" or "ciede2000"
+
+    Returns:
+        Array of palette indices with the same leading shape as pixels
+    """
+    _validate_color_metric(metric)
+
+    palette_lab = None
+    if palette is None:
+        palette = get_palette_array()
+        if metric != "rgb":
+            palette_lab = get_palette_lab()
+    elif metric != "rgb":
+        palette_lab = rgb_to_lab(palette)
+
+    if len(palette) == 0:
+        raise ValueError("Bead color palette is empty, cannot match colors.")
+
+    pixels = np.asarray(pixels)
+    if pixels.shape[-1] != 3:
+        raise ValueError(f"Expected RGB pixels with 3 channels, got shape {pixels.shape}")
+
+    flat = pixels.reshape(-1, 3).astype(np.int32)
+    packed = (flat[:, 0] << 16) | (flat[:, 1] << 8) | flat[:, 2]
+    unique_packed, inverse = np.unique(packed, return_inverse=True)
+
+    unique_rgb = np.stack(
+        [(unique_packed >> 16) & 0xFF, (unique_packed >> 8) & 0xFF, unique_packed & 0xFF],
+        axis=1
+    )
+
+    nearest = np.empty(len(unique_rgb), dtype=np.intp)
+    for start in range(0, len(unique_rgb), MATCH_CHUNK_SIZE):
+        chunk = unique_rgb[start:start + MATCH_CHUNK_SIZE]
+        distances = _color_distances(chunk, palette, palette_lab, metric)
+        nearest[start:start + len(chunk)] = np.argmin(distances, axis=1)
+
+    index_dtype = np.uint8 if len(palette) <= 256 else np.uint16
+    return nearest[inverse.reshape(-1)].astype(index_dtype).reshape(pixels.shape[:-1])
+
+
+def lookup_palette_indices(pixels: np.ndarray, metric: str = "rgb") -> np.ndarray:
+    """
+    Maps pixels to their closest Perle palette index using the precomputed lookup table.
+
+    Gives the same result as match_colors_to_palette against the cached palette,
+    but most pixels are resolved with a single table lookup. Pixels in ambiguous
+    table cells fall back to the exact matcher. The table only covers the "rgb"
+    metric; perceptual metrics go straight to match_colors_to_palette.
+
+    Args:
+        pixels: (H, W, 3) or (N, 3) array of RGB values (0-255)
+        metric: "rgb", "cie76", "cie94" or "ciede2000"
+
+    Returns:
+        Array of palette indices with the same leading shape as pixels
+    """
+    if metric != "rgb":
+        return match_colors_to_palette(pixels, metric=metric)
+
+    lut = get_color_lookup_table()
+    palette = get_palette_array()
+
+    pixels = np.asarray(pixels)
+    if pixels.shape[-1] != 3:
+        raise ValueError(f"Expected RGB pixels with 3 channels, got shape {pixels.shape}")
+
+    flat = pixels.reshape(-1, 3).astype(np.uint8)
+    cells = flat >> (8 - LUT_BITS)
+    indices = lut[cells[:, 0], cells[:, 1], cells[:, 2]]
+
+    ambiguous = indices == LUT_AMBIGUOUS
+    if ambiguous.any():
+        indices[ambiguous] = match_colors_to_palette(flat[ambiguous], palette)
+
+    index_dtype = np.uint8 if len(palette) <= 256 else np.uint16
+    return indices.astype(index_dtype).reshape(pixels.shape[:-1])
@@ -0,0 +1,352 @@
+"""
+CPU worker pool for pattern generation.
+
+Pattern generation is CPU-bound numpy/PIL work. Running it directly inside an
+async endpoint blocks the event loop, and asyncio.gather over synchronous calls
+runs them one after another. This module owns a process pool that such work is
+dispatched to, plus helpers for handing a decoded image to the workers through
+shared memory instead of pickling a copy per task.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Global process pools (created lazily, shut down in the app lifespan)
+CPU_EXECUTOR: Optional[ProcessPoolExecutor] = None
+PDF_EXECUTOR: Optional[ProcessPoolExecutor] = None
+# get_pdf_executor is called from threadpool threads, so creation must not race
+_POOL_LOCK = threading.Lock()
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """CPU quota of the container (cgroup v2 or v1), rounded up, or None if unlimited."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0 and period > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def get_available_cpu_count() -> int:
+    """
+    Cores this process may actually use.
+
+    os.cpu_count() reports the host's cores; inside a container the usable
+    share is the CPU affinity mask, further limited by the cgroup CPU quota.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        count = os.cpu_count() or 1
+
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        count = min(count, limit)
+    return max(count, 1)
+
+
+def get_cpu_worker_count() -> int:
+    """Number of worker processes - CPU_WORKERS if set, otherwise one per available core."""
+    if settings.CPU_WORKERS > 0:
+        return settings.CPU_WORKERS
+    return get_available_cpu_count()
+
+
+def _init_worker() -> None:
+    """Load the color palette once per worker process."""
+    from .color_service import get_perle_colors
+    get_perle_colors()
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool, creating it on first use.
+
+    Workers are started with the "spawn" method so they never inherit locks or
+    threads from the server process.
+
+    Returns:
+        ProcessPoolExecutor sized by get_cpu_worker_count()
+    """
+    global CPU_EXECUTOR
+
+    with _POOL_LOCK:
+        if CPU_EXECUTOR is None:
+            workers = get_cpu_worker_count()
+            CPU_EXECUTOR = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+            logger.info(f"Started CPU worker pool with {workers} process(es)")
+
+        return CPU_EXECUTOR
+
+
+def _discard_cpu_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken pool so the next get_cpu_executor() starts a fresh one.
+
+    Only clears the global if it is still this pool, so concurrent callers that
+    hit the same breakage do not throw away a replacement another one started.
+    """
+    global CPU_EXECUTOR
+
+    executor.shutdown(wait=False, cancel_futures=True)
+    with _POOL_LOCK:
+        if CPU_EXECUTOR is executor:
+            CPU_EXECUTOR = None
+
+
+def get_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process pool for PDF board pages, creating it on first use.
+
+    Kept separate from the pattern generation pool so a large PDF does not
+    queue behind (or hold up) customer pattern requests.
+
+    Returns:
+        ProcessPoolExecutor with PDF_BOARD_WORKERS processes, or None if
+        PDF_BOARD_WORKERS is 0 (board pages are drawn in-process)
+    """
+    global PDF_EXECUTOR
+
+    if settings.PDF_BOARD_WORKERS <= 0:
+        return None
+
+    with _POOL_LOCK:
+        if PDF_EXECUTOR is None:
+            PDF_EXECUTOR = ProcessPoolExecutor(
+                max_workers=settings.PDF_BOARD_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started PDF worker pool with {settings.PDF_BOARD_WORKERS} process(es)")
+
+        return PDF_EXECUTOR
+
+
+def discard_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken PDF pool so the next get_pdf_executor() starts a fresh one."""
+    global PDF_EXECUTOR
+
+    executor.shutdown(wait=False, cancel_futures=True)
+    with _POOL_LOCK:
+        if PDF_EXECUTOR is executor:
+            PDF_EXECUTOR = None
+
+
+def shutdown_cpu_executor() -> None:
+    """Shut down the process pools if they were started."""
+    global CPU_EXECUTOR, PDF_EXECUTOR
+
+    if CPU_EXECUTOR is not None:
+        CPU_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+        CPU_EXECUTOR = None
+        logger.info("CPU worker pool shut down")
+
+    if PDF_EXECUTOR is not None:
+        PDF_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+        PDF_EXECUTOR = None
+        logger.info("PDF worker pool shut down")
+
+
+async def run_in_cpu_pool(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a picklable top-level function in the process pool without blocking the event loop.
+
+    A pool whose worker died (e.g. killed for running out of memory) is broken
+    for good, so it is replaced and the call retried once on the new pool.
+
+    Args:
+        func: Module-level function to call in a worker
+        *args, **kwargs: Arguments passed to func (must be picklable)
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    executor = get_cpu_executor()
+    try:
+        return await loop.run_in_executor(executor, call)
+    except BrokenProcessPool:
+        logger.warning("CPU worker pool is broken (a worker died); restarting it and retrying once")
+        _discard_cpu_executor(executor)
+        return await loop.run_in_executor(get_cpu_executor(), call)
+
+
+# A shared image is described by (shared memory name, array shape)
+SharedImageRef = Tuple[str, Tuple[int, ...]]
+
+
+@contextmanager
+def share_image(image: Image.Image) -> Iterator[SharedImageRef]:
+    """
+    Copy an image into a shared memory block for the duration of the context.
+
+    Workers receive only the small SharedImageRef and attach to the block with
+    open_shared_image, so the pixel data is written once no matter how many
+    tasks read it. The block is released when the context exits.
+
+    Args:
+        image: PIL Image (any mode numpy can represent as uint8)
+
+    Yields:
+        SharedImageRef to pass to worker functions
+    """
+    array = np.asarray(image, dtype=np.uint8)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=np.uint8, buffer=block.buf)[...] = array
+        yield (block.name, array.shape)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def open_shared_image(ref: SharedImageRef) -> Image.Image:
+    """
+    Rebuild a PIL Image from a SharedImageRef inside a worker.
+
+    Args:
+        ref: Reference produced by share_image
+
+    Returns:
+        PIL Image holding its own copy of the pixels
+    """
+    name, shape = ref
+    # Spawned workers share the parent's resource tracker, so attaching here does
+    # not register a second owner; the parent unlinks the block in share_image
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        image = Image.fromarray(array.copy())
+        del array
+        return image
+    finally:
+        block.close()
+
+
+def preprocess_shared_image(
+    ref: SharedImageRef,
+    board_sizes: List[Tuple[int, int]],
+    preprocess_options: Dict[str, Any]
+) -> Tuple[List[Tuple[int, int]], List[Image.Image]]:
+    """
+    Worker entry point: preprocess a shared image once for several board sizes.
+
+    The dispatcher shares the returned pyramid levels again (share_image) and
+    submits one generate_pattern_from_shared_level task per size, so the sizes
+    are quantized concurrently from the same preprocessed pixels.
+
+    Args:
+        ref: Reference produced by share_image
+        board_sizes: List of (boards_width, boards_height)
+        preprocess_options: Preprocessing keyword arguments (see split_pattern_options)
+
+    Returns:
+        (bead dimensions per board size, pyramid levels largest first)
+    """
+    from .pattern_generator import prepare_pattern_pyramid
+
+    return prepare_pattern_pyramid(open_shared_image(ref), board_sizes, **preprocess_options)
+
+
+def generate_pattern_from_shared_level(
+    ref: SharedImageRef,
+    palette_version: str,
+    target: Tuple[int, int],
+    build_options: Dict[str, Any]
+) -> Tuple[str, list, dict]:
+    """
+    Worker entry point: build the pattern of one size from a shared pyramid level.
+
+    The palette is reloaded first if the server's palette_version differs from
+    the one this worker has cached (e.g. after a color was added).
+
+    Args:
+        ref: share_image reference of the level chosen with select_pyramid_level
+        palette_version: get_palette_version() in the dispatching process
+        target: Bead dimensions (width, height)
+        build_options: Per-size keyword arguments (see split_pattern_options)
+
+    Returns:
+        (pattern_base64, colors_used, pattern_data)
+    """
+    from .color_service import get_perle_colors, get_palette_version
+    from .pattern_generator import build_pattern_from_pyramid_level
+
+    bead_colors = get_perle_colors(force_reload=get_palette_version() != palette_version)
+    return build_pattern_from_pyramid_level(open_shared_image(ref), target, bead_colors, **build_options)
+
+
+async def generate_patterns_in_cpu_pool(
+    image: Image.Image,
+    board_sizes: List[Tuple[int, int]],
+    options: Dict[str, Any]
+) -> List[Tuple[str, list, dict]]:
+    """
+    convert_image_to_patterns_in_memory in the worker pool, one task per size.
+
+    Preprocessing runs once; its pyramid is then shared and every size is
+    quantized in its own worker at the same time. Results are identical to a
+    direct convert_image_to_patterns_in_memory call.
+
+    Args:
+        image: PIL Image object
+        board_sizes: List of (boards_width, boards_height)
+        options: Keyword arguments for convert_image_to_patterns_in_memory
+
+    Returns:
+        List of (pattern_base64, colors_used, pattern_data), one per board size
+    """
+    from .color_service import get_palette_version
+    from .pattern_generator import select_pyramid_level, split_pattern_options
+
+    if not board_sizes:
+        return []
+
+    preprocess_options, build_options = split_pattern_options(options)
+    with share_image(image) as shared_image:
+        targets, pyramid = await run_in_cpu_pool(preprocess_shared_image, shared_image, board_sizes, preprocess_options)
+
+    level_sizes = [level.size for level in pyramid]
+    level_indices = [select_pyramid_level(level_sizes, target) for target in targets]
+    palette_version = get_palette_version()
+
+    with ExitStack() as stack:
+        level_refs = {index: stack.enter_context(share_image(pyramid[index])) for index in set(level_indices)}
+        return list(await asyncio.gather(*(
+            run_in_cpu_pool(generate_pattern_from_shared_level, level_refs[index], palette_version, target, build_options)
+            for index, target in zip(level_indices, targets)
+        )))
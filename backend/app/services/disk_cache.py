@@ -0,0 +1,116 @@
+"""
+Size-bounded file caches on disk.
+
+The pattern result cache and the PDF cache both keep one file per entry and
+use the file modification time as recency: a hit bumps the mtime, and once
+the directory exceeds its byte budget the oldest files are deleted first.
+State lives entirely in the filesystem, so it survives restarts and is shared
+by every worker process using the same directory.
+
+Listing the directory stats every file, so writers do not do it per write:
+DiskCacheBudget keeps a running byte total per process, seeded from one scan
+and bumped by each write, and only rescans and evicts once that total is over
+budget. Writes by other workers are picked up at the next rescan.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# (mtime, size, path) of one cached file
+CacheFileEntry = Tuple[float, int, Path]
+
+
+def touch_cache_file(path: Path) -> None:
+    """Mark a cached file as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def list_cache_files(cache_dir: Path, pattern: str) -> List[CacheFileEntry]:
+    """
+    (mtime, size, path) of every file below cache_dir matching a glob pattern.
+
+    Args:
+        cache_dir: Cache root directory
+        pattern: Glob relative to cache_dir, e.g. "*/*.json"
+    """
+    if not cache_dir.exists():
+        return []
+
+    entries = []
+    for path in cache_dir.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # Removed by another process
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def evict_least_recently_used(entries: List[CacheFileEntry], max_bytes: int) -> int:
+    """
+    Delete the least recently used files until the total size fits max_bytes.
+
+    Args:
+        entries: Result of list_cache_files
+        max_bytes: Byte budget for all entries together
+
+    Returns:
+        Number of files removed
+    """
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+class DiskCacheBudget:
+    """
+    Running byte total of a cache directory, evicting once it exceeds max_bytes.
+
+    Overwriting an existing entry counts its size again, which only makes the
+    next rescan happen a little early.
+    """
+
+    def __init__(self, cache_dir: Path, pattern: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.pattern = pattern
+        self.max_bytes = max_bytes
+        self._bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int) -> bool:
+        """
+        Account for a written file.
+
+        Returns:
+            True if the directory is now over budget (call evict())
+        """
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in list_cache_files(self.cache_dir, self.pattern))
+            else:
+                self._bytes += nbytes
+            return self._bytes > self.max_bytes
+
+    def evict(self) -> int:
+        """Rescan the directory and delete least recently used files down to the budget."""
+        with self._lock:
+            entries = sorted(list_cache_files(self.cache_dir, self.pattern))
+            removed = evict_least_recently_used(entries, self.max_bytes)
+            self._bytes = sum(size for _, size, _ in entries[removed:])
+            return removed
+
+    def reset(self) -> None:
+        """Forget the running total (after files were deleted elsewhere); the next add rescans."""
+        with self._lock:
+            self._bytes = None
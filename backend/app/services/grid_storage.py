@@ -0,0 +1,176 @@
+"""
+Pattern grid storage formats.
+
+pattern_data["grid"] has been stored in three formats, selected by
+pattern_data["storage_version"]:
+
+- 1: 2D list of hex colors (legacy, migrated to v2 at startup)
+- 2: 2D list of color codes
+- 3: the v2 grid packed as uint8 indices into a code table, zlib-compressed
+     and base64-encoded:
+     {"encoding": "zlib", "dtype": "uint8", "shape": [h, w], "codes": [...], "data": "..."}
+
+Patterns are saved to the database as v3 (compress_pattern_data). Readers either work on
+the index grid directly (decode_index_grid) or ask for a v2-style list grid
+(decode_grid, expand_pattern_data) so code written for v2 keeps working.
+"""
+
+import base64
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+GRID_STORAGE_VERSION = 3  # Version written for new and updated patterns
+GRID_ENCODING = "zlib"
+
+# A stored grid: 2D list of hex colors / codes (v1/v2) or an encoded dict (v3)
+StoredGrid = Union[List[List[str]], Dict[str, Any]]
+
+
+def pack_code_grid(grid: List[List[str]]) -> Tuple[List[str], np.ndarray]:
+    """
+    Packs a code grid into a list of distinct codes and a compact index array.
+
+    Indices are uint8 when there are at most 256 distinct codes (always the case
+    for the perle palette) and uint16 otherwise. unpack_code_grid reverses this.
+
+    Args:
+        grid: 2D list of color codes
+
+    Returns:
+        Tuple of (codes, index_grid) where grid[y][x] == codes[index_grid[y, x]]
+    """
+    codes, inverse = np.unique(np.array(grid, dtype=str), return_inverse=True)
+    dtype = np.uint8 if len(codes) <= 256 else np.uint16
+    return codes.tolist(), inverse.reshape(len(grid), len(grid[0])).astype(dtype)
+
+
+def unpack_code_grid(codes: List[str], index_grid: np.ndarray) -> List[List[str]]:
+    """
+    Rebuilds a code grid from the output of pack_code_grid.
+
+    Args:
+        codes: Distinct codes
+        index_grid: (H, W) array of indices into codes
+
+    Returns:
+        2D list of color codes
+    """
+    return np.array(codes, dtype=object)[index_grid].tolist()
+
+
+def encode_grid(grid: List[List[str]]) -> Dict[str, Any]:
+    """
+    Encodes a v2 code grid as a v3 grid.
+
+    Args:
+        grid: 2D list of color codes
+
+    Returns:
+        Encoded grid dict (JSON-serializable)
+    """
+    codes, index_grid = pack_code_grid(grid)
+    data = zlib.compress(index_grid.astype(index_grid.dtype.newbyteorder("<")).tobytes(), 9)
+    return {
+        "encoding": GRID_ENCODING,
+        "dtype": index_grid.dtype.name,
+        "shape": list(index_grid.shape),
+        "codes": codes,
+        "data": base64.b64encode(data).decode("ascii"),
+    }
+
+
+def decode_index_grid(encoded: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """
+    Decodes a v3 grid to its code table and index array without building a list grid.
+
+    Args:
+        encoded: Encoded grid dict from encode_grid
+
+    Returns:
+        Tuple of (codes, index_grid)
+
+    Raises:
+        ValueError: If the encoding is not supported
+    """
+    if encoded.get("encoding") != GRID_ENCODING:
+        raise ValueError(f"Unsupported grid encoding: {encoded.get('encoding')}")
+
+    dtype = np.dtype(encoded["dtype"]).newbyteorder("<")
+    raw = zlib.decompress(base64.b64decode(encoded["data"]))
+    index_grid = np.frombuffer(raw, dtype=dtype).reshape(encoded["shape"])
+    return encoded["codes"], index_grid
+
+
+def decode_grid(grid: StoredGrid, storage_version: int) -> Tuple[List[List[str]], int]:
+    """
+    Returns a stored grid as a 2D list, decoding v3 to v2 codes.
+
+    Args:
+        grid: pattern_data["grid"]
+        storage_version: pattern_data["storage_version"]
+
+    Returns:
+        Tuple of (grid, storage_version) where storage_version is 1 or 2
+    """
+    if storage_version == 3:
+        codes, index_grid = decode_index_grid(grid)
+        return unpack_code_grid(codes, index_grid), 2
+    return grid, storage_version
+
+
+def get_grid_shape(grid: StoredGrid, storage_version: int) -> Tuple[int, int]:
+    """
+    Returns (height, width) of a stored grid without decoding it.
+
+    Args:
+        grid: pattern_data["grid"]
+        storage_version: pattern_data["storage_version"]
+
+    Returns:
+        Tuple of (height, width)
+    """
+    if storage_version == 3:
+        height, width = grid["shape"]
+        return height, width
+    return len(grid), len(grid[0]) if grid else 0
+
+
+def compress_pattern_data(pattern_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Returns pattern_data with a v2 grid re-encoded as v3.
+
+    Other versions (and pattern_data without a grid) are returned unchanged;
+    v1 hex grids are converted to v2 by the startup migration first.
+
+    Args:
+        pattern_data: Pattern metadata dict
+
+    Returns:
+        New dict with storage_version 3, or the input
+    """
+    if not pattern_data or not pattern_data.get("grid") or pattern_data.get("storage_version", 1) != 2:
+        return pattern_data
+
+    return {**pattern_data, "grid": encode_grid(pattern_data["grid"]), "storage_version": 3}
+
+
+def expand_pattern_data(pattern_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Returns pattern_data with a v3 grid decoded to a v2 code grid.
+
+    Used where pattern_data leaves the server (API responses), so clients only
+    ever see list grids.
+
+    Args:
+        pattern_data: Pattern metadata dict
+
+    Returns:
+        New dict with storage_version 2, or the input if it is not v3
+    """
+    if not pattern_data or pattern_data.get("storage_version") != 3:
+        return pattern_data
+
+    grid, storage_version = decode_grid(pattern_data["grid"], 3)
+    return {**pattern_data, "grid": grid, "storage_version": storage_version}
@@ -2,6 +2,7 @@
 Image preprocessing and enhancement service.
 
 This module handles all image preprocessing operations including:
+- Decoding uploads at reduced scale
 - Background removal
 - Color enhancement
 - Detail simplification
@@ -9,9 +10,125 @@ This module handles all image preprocessing operations including:
 """
 
 from PIL import Image, ImageEnhance, ImageFilter
+from typing import Optional, Tuple
+import io
 import numpy as np
-import cv2
-from rembg import remove as rembg_remove
+
+from .background_removal import run_background_removal
+from .board_calculator import calculate_dimensions_maintaining_aspect_ratio
+
+
+WORKING_RESOLUTION_OVERSAMPLE = 4  # Working images keep at least this many pixels per bead
+
+
+def downsample_to_working_resolution(
+    image: Image.Image,
+    target_size: Tuple[int, int],
+    oversample: int = WORKING_RESOLUTION_OVERSAMPLE
+) -> Image.Image:
+    """
+    Shrinks an image to a small multiple of the target bead grid before filtering.
+
+    Uses Image.reduce (box/area averaging by an integer factor), so the result
+    never drops below oversample pixels per bead in either direction.
+
+    Args:
+        image: Input PIL Image
+        target_size: (width, height) of the final bead grid
+        oversample: Minimum pixels per bead to keep
+
+    Returns:
+        Reduced PIL Image, or the input if it is already small enough
+    """
+    factor = min(
+        image.width // (target_size[0] * oversample),
+        image.height // (target_size[1] * oversample)
+    )
+    if factor < 2:
+        return image
+
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    reduced = image.reduce(factor)
+    print(f"Downsampled {image.size} to working resolution {reduced.size} (factor {factor})")
+    return reduced
+
+
+def probe_image_size(data: bytes) -> Tuple[int, int]:
+    """
+    Reads the pixel dimensions of an encoded image from its header only.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Tuple of (width, height)
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        return img.size
+
+
+def load_image_for_pattern(
+    image: Image.Image,
+    max_beads: Tuple[int, int],
+    oversample: int = WORKING_RESOLUTION_OVERSAMPLE
+) -> Image.Image:
+    """
+    Decodes an opened image at the smallest scale the pattern pipeline can use.
+
+    JPEGs are decoded with Image.draft, which lets libjpeg scale by 1/2, 1/4 or
+    1/8 in the DCT domain, so a phone photo is never fully decoded. Other
+    formats are decoded normally and reduced with downsample_to_working_resolution.
+    Either way the result keeps at least oversample pixels per bead.
+
+    Args:
+        image: Image from Image.open that has not been loaded yet
+        max_beads: (width, height) of the largest bead area the image is converted for
+        oversample: Minimum pixels per bead to keep
+
+    Returns:
+        RGB PIL Image with its pixels loaded
+    """
+    target_size = calculate_dimensions_maintaining_aspect_ratio(
+        image.width,
+        image.height,
+        max_beads[0],
+        max_beads[1]
+    )
+    original_size = image.size
+
+    if image.format == "JPEG":
+        image.draft("RGB", (target_size[0] * oversample, target_size[1] * oversample))
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    else:
+        image.load()
+
+    if image.size != original_size:
+        print(f"Decoded {original_size} image at reduced scale {image.size}")
+
+    return downsample_to_working_resolution(image, target_size, oversample)
+
+
+def decode_image_for_pattern(
+    data: bytes,
+    max_beads: Tuple[int, int],
+    oversample: int = WORKING_RESOLUTION_OVERSAMPLE
+) -> Image.Image:
+    """
+    Decodes uploaded image bytes at reduced scale (see load_image_for_pattern).
+
+    Args:
+        data: Encoded image bytes
+        max_beads: (width, height) of the largest bead area the image is converted for
+        oversample: Minimum pixels per bead to keep
+
+    Returns:
+        RGB PIL Image with its pixels loaded
+    """
+    return load_image_for_pattern(Image.open(io.BytesIO(data)), max_beads, oversample)
 
 
 def remove_background(image: Image.Image) -> Image.Image:
@@ -26,7 +143,7 @@ def remove_background(image: Image.Image) -> Image.Image:
         PIL Image with background removed and replaced with white
     """
     print("Removing background...")
-    output = rembg_remove(image)
+    output = run_background_removal(image)
 
     bg = Image.new('RGB', output.size, (255, 255, 255))
     if output.mode == 'RGBA':
@@ -51,6 +168,8 @@ def apply_bilateral_filter(image: Image.Image, d: int = 9, sigma_color: int = 75
     Returns:
         Filtered PIL Image
     """
+    import cv2
+
     img_array = np.array(image)
     filtered = cv2.bilateralFilter(img_array, d, sigma_color, sigma_space)
     return Image.fromarray(filtered)
@@ -68,6 +187,8 @@ def apply_mean_shift_filter(image: Image.Image, sp: int = 10, sr: int = 20) -> I
     Returns:
         Filtered PIL Image
     """
+    import cv2
+
     img_array = np.array(image)
     filtered = cv2.pyrMeanShiftFiltering(img_array, sp, sr)
     return Image.fromarray(filtered)
@@ -82,7 +203,8 @@ def enhanced_preprocess_image(
     brightness_boost: float = 1.0,
     simplify_details: bool = True,
     simplification_method: str = "bilateral",  # "bilateral", "mean_shift", or "gaussian"
-    simplification_strength: str = "strong"  # "light", "medium", "strong"
+    simplification_strength: str = "strong",  # "light", "medium", "strong"
+    working_size: Optional[Tuple[int, int]] = None
 ) -> Image.Image:
     """
     Advanced image preprocessing pipeline with multiple enhancement options.
@@ -97,12 +219,22 @@ def enhanced_preprocess_image(
         simplify_details: Whether to simplify details
         simplification_method: Method for simplification ("bilateral", "mean_shift", "gaussian")
         simplification_strength: Strength of simplification ("light", "medium", "strong")
+        working_size: Final bead grid (width, height). When given, the image is first
+            downsampled to a working resolution and spatial filter sizes are scaled to it
 
     Returns:
         Pre-processed PIL Image
     """
     print(f"Starting enhanced preprocessing (bg_removal={remove_bg}, enhance_colors={enhance_colors}, simplify={simplify_details})...")
 
+    # Spatial filter sizes were tuned for the full-resolution upload; scale them so
+    # they cover the same part of the picture at the working resolution
+    scale = 1.0
+    if working_size:
+        original_width = image.width
+        image = downsample_to_working_resolution(image, working_size)
+        scale = image.width / original_width
+
     if remove_bg:
         image = remove_background(image)
 
@@ -141,6 +273,12 @@ def enhanced_preprocess_image(
             mean_shift_params = {"sp": 10, "sr": 20}
             gaussian_radius = 0.8
 
+        if scale < 1.0:
+            bilateral_params["d"] = max(3, round(bilateral_params["d"] * scale))
+            bilateral_params["sigma_space"] = max(1, bilateral_params["sigma_space"] * scale)
+            mean_shift_params["sp"] = max(1, round(mean_shift_params["sp"] * scale))
+            gaussian_radius *= scale
+
         # Apply selected method
         if simplification_method == "bilateral":
             image = apply_bilateral_filter(image, **bilateral_params)
@@ -153,17 +291,29 @@ def enhanced_preprocess_image(
     return image
 
 
-def basic_preprocess_image(image: Image.Image, enhance_contrast: float = 1.2) -> Image.Image:
+def basic_preprocess_image(
+    image: Image.Image,
+    enhance_contrast: float = 1.2,
+    working_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
     """
     Basic image preprocessing for better bead pattern conversion.
 
     Args:
         image: Input PIL Image
         enhance_contrast: Contrast enhancement factor (1.0 = no change)
+        working_size: Final bead grid (width, height). When given, the image is first
+            downsampled to a working resolution and the blur radius scaled to it
 
     Returns:
         Pre-processed PIL Image
     """
+    blur_radius = 0.8
+    if working_size:
+        original_width = image.width
+        image = downsample_to_working_resolution(image, working_size)
+        blur_radius *= image.width / original_width
+
     if image.mode != 'RGB':
         image = image.convert('RGB')
 
@@ -171,6 +321,6 @@ def basic_preprocess_image(image: Image.Image, enhance_contrast: float = 1.2) ->
         enhancer = ImageEnhance.Contrast(image)
         image = enhancer.enhance(enhance_contrast)
 
-    image = image.filter(ImageFilter.GaussianBlur(radius=0.8))
+    image = image.filter(ImageFilter.GaussianBlur(radius=blur_radius))
 
     return image
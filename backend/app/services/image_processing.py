@@ -30,6 +30,9 @@ from .image_preprocessor import (
     apply_mean_shift_filter,
     enhanced_preprocess_image,
     basic_preprocess_image as preprocess_image,
+    probe_image_size,
+    load_image_for_pattern,
+    decode_image_for_pattern,
 )
 
 # Re-export from board_calculator
@@ -37,6 +40,7 @@ from .board_calculator import (
     BOARD_SIZE,
     calculate_dimensions_maintaining_aspect_ratio,
     suggest_board_dimensions,
+    suggest_board_dimensions_for_size,
     suggest_board_dimensions_from_file,
 )
 
@@ -3,7 +3,6 @@ Service for generating interior mockups by placing framed patterns in room image
 """
 from PIL import Image, ImageDraw
 import numpy as np
-import cv2
 import io
 import logging
 from typing import Dict, Optional
@@ -145,6 +144,8 @@ class MockupGenerator:
         )
 
         # Calculate perspective transformation matrix
+        import cv2
+
         matrix = cv2.getPerspectiveTransform(src_points, dst_points)
 
         # Apply transformation
@@ -0,0 +1,234 @@
+"""
+Content-addressed cache for generated patterns.
+
+Customers often submit the same photo several times while switching between
+sizes and styles. Results are cached under a hash of the decoded image pixels,
+every generation parameter and the palette version, so an identical request
+is answered without recomputing anything and a palette change never serves
+stale colors.
+
+Entries are kept as serialized JSON in a bounded in-memory LRU (byte budget
+PATTERN_CACHE_MAX_BYTES) with an optional on-disk tier (PATTERN_CACHE_DIR),
+which is evicted least recently used first once it exceeds
+PATTERN_CACHE_DISK_MAX_BYTES (see disk_cache.DiskCacheBudget). Entries of an old palette version are never hit
+again, so they age out through the same eviction.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+from .color_service import get_palette_version
+from .disk_cache import DiskCacheBudget, touch_cache_file
+
+logger = logging.getLogger(__name__)
+
+# (pattern_base64, colors_used, pattern_data) as returned by convert_image_to_pattern_in_memory
+PatternResult = Tuple[str, List[Dict], Dict]
+
+
+class PatternResultCache:
+    """
+    LRU cache of pattern results with a size-based byte budget.
+
+    Values are stored serialized, which makes the byte accounting exact and
+    hands every caller its own copy of the grid.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_budget = DiskCacheBudget(self.disk_dir, "*/*.json", disk_max_bytes) if self.disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[PatternResult]:
+        """Return the cached result for key, or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if payload is None:
+            payload = self._read_disk(key)
+            if payload is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            with self._lock:
+                self.disk_hits += 1
+            self._insert(key, payload)
+
+        pattern_base64, colors_used, pattern_data = json.loads(payload)
+        return pattern_base64, colors_used, pattern_data
+
+    def put(self, key: str, result: PatternResult) -> None:
+        """Store a result under key in memory and, if configured, on disk."""
+        payload = json.dumps(list(result), separators=(",", ":")).encode("utf-8")
+        self._insert(key, payload)
+        self._write_disk(key, payload)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": self.disk_dir is not None,
+                "disk_max_bytes": self.disk_max_bytes,
+            }
+
+    def _insert(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            return None
+        touch_cache_file(path)
+        return payload
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Temp file + atomic rename so readers never see a partial entry
+            temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(temp_fd, 'wb') as f:
+                f.write(payload)
+            Path(temp_path).replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write pattern cache entry {key}: {e}")
+            return
+
+        if self._disk_budget.add(len(payload)):
+            self._disk_budget.evict()
+
+
+# Global cache instance
+PATTERN_RESULT_CACHE = PatternResultCache(
+    max_bytes=settings.PATTERN_CACHE_MAX_BYTES,
+    disk_dir=settings.PATTERN_CACHE_DIR or None,
+    disk_max_bytes=settings.PATTERN_CACHE_DISK_MAX_BYTES
+)
+
+
+def compute_image_digest(image: Image.Image) -> str:
+    """
+    Hash the decoded pixels of an image.
+
+    Two uploads of the same picture in different containers (e.g. re-saved
+    PNG vs original) hash equal as long as the decoded pixels are identical.
+
+    Args:
+        image: PIL Image object
+
+    Returns:
+        Hex SHA-256 digest of mode, size and pixel data
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def make_pattern_cache_key(image_digest: str, params: Dict[str, Any]) -> str:
+    """
+    Build a cache key from an image digest, generation parameters and the palette version.
+
+    Args:
+        image_digest: Result of compute_image_digest
+        params: Every parameter that influences the output (JSON-serializable)
+
+    Returns:
+        Hex SHA-256 cache key
+    """
+    key_source = json.dumps(
+        {"image": image_digest, "params": params, "palette": get_palette_version()},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def convert_image_to_pattern_cached(image: Image.Image, **kwargs) -> PatternResult:
+    """
+    convert_image_to_pattern_in_memory with the result cache in front.
+
+    Args:
+        image: PIL Image object
+        **kwargs: Keyword arguments for convert_image_to_pattern_in_memory
+
+    Returns:
+        Tuple of (pattern_image_base64, colors_used, pattern_data)
+    """
+    from .pattern_generator import convert_image_to_pattern_in_memory
+
+    key = make_pattern_cache_key(compute_image_digest(image), {"single": kwargs})
+    cached = PATTERN_RESULT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    result = convert_image_to_pattern_in_memory(image, **kwargs)
+    PATTERN_RESULT_CACHE.put(key, result)
+    return result
+
+
+def get_pattern_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters of the global pattern cache."""
+    return PATTERN_RESULT_CACHE.stats()
+
+
+def clear_pattern_cache() -> None:
+    """Clear the in-memory pattern cache."""
+    PATTERN_RESULT_CACHE.clear()
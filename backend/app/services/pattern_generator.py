@@ -9,15 +9,30 @@ This module handles the core pattern generation logic including:
 """
 
 from fastapi import HTTPException
-from PIL import Image, ImageDraw
-from typing import List, Dict, Tuple
+from PIL import Image
+from typing import Any, List, Dict, Optional, Tuple
 import io
 import base64
 import math
 
-from .color_service import get_perle_colors, find_closest_color, hex_to_rgb, hex_to_code, code_to_hex
+import numpy as np
+
+from .color_service import (
+    get_perle_colors,
+    find_closest_color,
+    lookup_palette_indices,
+    match_colors_to_palette,
+    build_palette_array,
+    compute_palette_distance_matrix,
+    get_palette_distance_matrix,
+    hex_to_rgb,
+    hex_to_code,
+    code_to_hex,
+)
 from .image_preprocessor import enhanced_preprocess_image, basic_preprocess_image
+from .grid_storage import StoredGrid, pack_code_grid, unpack_code_grid, decode_index_grid, get_grid_shape
 from .board_calculator import calculate_dimensions_maintaining_aspect_ratio, BOARD_SIZE
+from .image_encoding import encode_pattern_image, pattern_image_to_data_uri
 
 
 def create_perle_palette_image(bead_colors: List[Dict]) -> Image.Image:
@@ -68,11 +83,375 @@ def quantize_to_perle_colors(
     return quantized.convert('RGB')
 
 
+def quantize_to_palette_indices(
+    image: Image.Image,
+    bead_colors: List[Dict],
+    use_dithering: bool = False,
+    color_metric: str = "rgb"
+) -> np.ndarray:
+    """
+    Quantizes image to perle color palette and keeps the palette indices.
+
+    PIL palette slots that don't map one-to-one to a bead (padding entries and
+    duplicate colors) are remapped to the bead index the matcher would pick.
+
+    Args:
+        image: Input PIL Image (RGB)
+        bead_colors: List of perle color dictionaries with RGB values
+        use_dithering: Whether to use Floyd-Steinberg dithering
+        color_metric: Distance metric used to resolve PIL palette slots to beads
+
+    Returns:
+        (H, W) array of indices into bead_colors
+    """
+    palette_img = create_perle_palette_image(bead_colors)
+
+    dither = Image.Dither.FLOYDSTEINBERG if use_dithering else Image.Dither.NONE
+
+    quantized = image.quantize(
+        palette=palette_img,
+        dither=dither
+    )
+
+    slot_rgb = np.array(palette_img.getpalette(), dtype=np.uint8).reshape(-1, 3)
+    slot_to_bead = match_colors_to_palette(slot_rgb, build_palette_array(bead_colors), color_metric)
+
+    return slot_to_bead[np.asarray(quantized)]
+
+
+def count_palette_indices(index_grid: np.ndarray) -> Dict[int, int]:
+    """
+    Counts beads per palette index.
+
+    Args:
+        index_grid: (H, W) array of palette indices
+
+    Returns:
+        Dictionary of palette index to count, ordered by first appearance in the grid
+    """
+    indices, first_seen, counts = np.unique(index_grid, return_index=True, return_counts=True)
+    return {int(indices[pos]): int(counts[pos]) for pos in np.argsort(first_seen)}
+
+
+RARE_COLOR_FILTER_MODES = ("vectorized", "reference")
+
+
+def filter_rare_palette_indices(
+    index_grid: np.ndarray,
+    bead_colors: List[Dict],
+    min_percentage: float,
+    color_metric: str = "rgb",
+    mode: str = "vectorized",
+) -> Tuple[np.ndarray, Dict[int, int]]:
+    """
+    Index-grid version of filter_rare_colors.
+
+    Each rare color gets a single replacement - the closest remaining color
+    according to the cached palette distance matrix - and the grid is remapped
+    in one vectorized step. The "reference" mode runs the original per-pixel
+    filter_rare_colors instead, for regression comparison.
+
+    Args:
+        index_grid: (H, W) array of indices into bead_colors
+        bead_colors: List of available bead colors
+        min_percentage: Minimum percentage (0.01 = 1%)
+        color_metric: Distance metric used to pick replacement colors
+        mode: "vectorized" or "reference"
+
+    Returns:
+        Tuple of (filtered_index_grid, color_counts) where color_counts maps
+        palette index to count in the same order filter_rare_colors produces
+    """
+    if mode not in RARE_COLOR_FILTER_MODES:
+        raise ValueError(f"Unknown rare color filter mode '{mode}'. Expected one of: {', '.join(RARE_COLOR_FILTER_MODES)}")
+
+    if mode == "reference":
+        return _filter_rare_palette_indices_reference(index_grid, bead_colors, min_percentage, color_metric)
+
+    palette_size = len(bead_colors)
+    flat = index_grid.ravel()
+    total_beads = flat.size
+    min_bead_count = max(1, int(total_beads * min_percentage))
+
+    print(f"Total beads: {total_beads}, Minimum beads per color: {min_bead_count}")
+
+    counts = np.bincount(flat, minlength=palette_size)
+    present, first_seen = np.unique(flat, return_index=True)
+    order = np.argsort(first_seen)
+    present = present[order]
+    first_seen = first_seen[order]
+
+    rare = counts[present] < min_bead_count
+    if not rare.any():
+        return index_grid, {int(i): int(counts[i]) for i in present}
+
+    rare_indices = present[rare]
+    print(f"Removing {len(rare_indices)} colors that appear less than {min_bead_count} times")
+
+    if bead_colors is get_perle_colors():
+        distances = get_palette_distance_matrix(color_metric)
+    else:
+        distances = compute_palette_distance_matrix(build_palette_array(bead_colors), color_metric)
+
+    # Colors sharing a hex with a rare color are excluded too, as in filter_rare_colors
+    hex_palette = np.array([bc["hex"] for bc in bead_colors])
+    excluded = np.isin(hex_palette, hex_palette[rare_indices])
+
+    remap = np.arange(palette_size, dtype=index_grid.dtype)
+    if excluded.all():
+        remap[rare_indices] = present[np.argmax(counts[present])]
+    else:
+        candidate_distances = np.where(excluded[None, :], np.inf, distances[rare_indices].astype(np.float64))
+        remap[rare_indices] = np.argmin(candidate_distances, axis=1)
+
+    filtered_grid = remap[index_grid]
+    new_counts = np.bincount(filtered_grid.ravel(), minlength=palette_size)
+
+    # Keep surviving colors in their original order, then newly used replacements
+    # ordered by the first pixel they replaced
+    filtered_counts = {int(i): int(new_counts[i]) for i in present[~rare]}
+    for index in remap[rare_indices][np.argsort(first_seen[rare], kind="stable")]:
+        if int(index) not in filtered_counts:
+            filtered_counts[int(index)] = int(new_counts[index])
+
+    print(f"After filtering: {len(filtered_counts)} unique colors remaining")
+
+    return filtered_grid, filtered_counts
+
+
+def _filter_rare_palette_indices_reference(
+    index_grid: np.ndarray,
+    bead_colors: List[Dict],
+    min_percentage: float,
+    color_metric: str,
+) -> Tuple[np.ndarray, Dict[int, int]]:
+    """Runs the original hex-based filter_rare_colors on an index grid."""
+    hex_palette = [bc["hex"] for bc in bead_colors]
+    index_by_hex = {}
+    for i, hex_color in enumerate(hex_palette):
+        index_by_hex.setdefault(hex_color, i)
+
+    hex_grid = [[hex_palette[i] for i in row] for row in index_grid.tolist()]
+    hex_counts = {}
+    for index, count in count_palette_indices(index_grid).items():
+        hex_counts[hex_palette[index]] = hex_counts.get(hex_palette[index], 0) + count
+
+    hex_grid, hex_counts = filter_rare_colors(hex_grid, hex_counts, bead_colors, min_percentage, color_metric)
+
+    filtered_grid = np.array(
+        [[index_by_hex[hex_color] for hex_color in row] for row in hex_grid],
+        dtype=index_grid.dtype
+    ).reshape(index_grid.shape)
+    return filtered_grid, {index_by_hex[hex_color]: count for hex_color, count in hex_counts.items()}
+
+
+def generate_palette_index_grid(
+    image: Image.Image,
+    bead_colors: List[Dict],
+    use_quantization: bool = True,
+    use_dithering: bool = False,
+    color_metric: str = "rgb",
+    min_percentage: float = 0.005,
+    rare_color_filter: str = "vectorized"
+) -> Tuple[np.ndarray, Dict[int, int]]:
+    """
+    Maps a resized image to bead colors and filters out rare colors.
+
+    Args:
+        image: PIL Image already resized to the bead grid dimensions
+        bead_colors: List of perle color dictionaries (must be get_perle_colors())
+        use_quantization: If True, use PIL color quantization
+        use_dithering: If True, use Floyd-Steinberg dithering
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
+        min_percentage: Minimum share of beads a color needs to be kept
+        rare_color_filter: "vectorized" or "reference" (see filter_rare_palette_indices)
+
+    Returns:
+        Tuple of (index_grid, color_counts) keyed by palette index
+    """
+    # PIL quantization matches in RGB space, so perceptual metrics skip it and
+    # match directly (unless dithering is requested)
+    if use_quantization and (color_metric == "rgb" or use_dithering):
+        print("Applying color quantization...")
+        index_grid = quantize_to_palette_indices(
+            image,
+            bead_colors,
+            use_dithering=use_dithering,
+            color_metric=color_metric
+        )
+    else:
+        print(f"Matching pixels to bead colors (metric={color_metric})...")
+        index_grid = lookup_palette_indices(np.asarray(image.convert('RGB')), metric=color_metric)
+
+    print("Color matching complete.")
+
+    return filter_rare_palette_indices(
+        index_grid,
+        bead_colors,
+        min_percentage=min_percentage,
+        color_metric=color_metric,
+        mode=rare_color_filter
+    )
+
+
+def build_pattern_outputs(
+    index_grid: np.ndarray,
+    color_counts: Dict[int, int],
+    bead_colors: List[Dict]
+) -> Tuple[List[List[str]], List[Dict], Dict[str, str]]:
+    """
+    Converts an index grid to the v2 code grid and colors_used list.
+
+    Args:
+        index_grid: (H, W) array of indices into bead_colors
+        color_counts: Dictionary of palette index to count
+        bead_colors: List of perle color dictionaries the indices refer to
+
+    Returns:
+        Tuple of (code_grid, colors_used, unknown_colors)
+    """
+    code_table = [""] * len(bead_colors)
+    unknown_colors = {}
+    colors_used = []
+    bead_color_lookup = {bc["hex"]: bc for bc in bead_colors}
+
+    for index, count in color_counts.items():
+        hex_color = bead_colors[index]["hex"]
+        code = hex_to_code(hex_color)
+        if not code:
+            # Unknown color - use fallback code "99"
+            if hex_color not in unknown_colors:
+                fallback_code = "99"
+                unknown_colors[hex_color] = fallback_code
+                print(f"Warning: Unknown color {hex_color}, using fallback code {fallback_code}")
+            code = unknown_colors[hex_color]
+        code_table[index] = code
+
+        # colors_used is stored without hex - it can be looked up from code
+        bead = bead_color_lookup[hex_color]
+        colors_used.append({
+            "name": bead["name"],
+            "code": bead.get("code", ""),
+            "count": count
+        })
+
+    code_grid = [[code_table[i] for i in row] for row in index_grid.tolist()]
+
+    print(f"Unique colors used: {len(colors_used)}")
+
+    return code_grid, colors_used, unknown_colors
+
+
+GRID_LINE_COLOR = (200, 200, 200)
+BOARD_LINE_COLOR = (60, 60, 60)
+
+
+def render_pattern_image(
+    index_grid: np.ndarray,
+    palette_rgb: np.ndarray,
+    scale: int = 20,
+    grid_lines: bool = False,
+    board_size: Optional[int] = None,
+    grid_line_color: Tuple[int, int, int] = GRID_LINE_COLOR,
+    board_line_color: Tuple[int, int, int] = BOARD_LINE_COLOR,
+) -> Image.Image:
+    """
+    Renders a palette index grid to an image without per-bead drawing calls.
+
+    The image is built at one pixel per bead and upscaled with nearest-neighbour
+    resampling, so every bead becomes a solid scale x scale block. Grid lines and
+    board separators are painted afterwards on the bead boundaries.
+
+    Args:
+        index_grid: (H, W) array of indices into palette_rgb
+        palette_rgb: (N, 3) uint8 array of colors
+        scale: Pixel size for each bead
+        grid_lines: Draw a 1px line between beads
+        board_size: Beads per board; draws a 2px separator between boards when set
+        grid_line_color: RGB color of the bead grid lines
+        board_line_color: RGB color of the board separators
+
+    Returns:
+        PIL Image of the pattern
+    """
+    height, width = index_grid.shape
+    bead_image = Image.fromarray(np.asarray(palette_rgb, dtype=np.uint8)[index_grid])
+    image = bead_image.resize((width * scale, height * scale), Image.Resampling.NEAREST)
+
+    if not grid_lines and not board_size:
+        return image
+
+    pixels = np.array(image)
+    if grid_lines and scale > 1:
+        pixels[scale::scale, :] = grid_line_color
+        pixels[:, scale::scale] = grid_line_color
+    if board_size:
+        step = board_size * scale
+        for offset in (-1, 0):
+            pixels[step + offset::step, :] = board_line_color
+            pixels[:, step + offset::step] = board_line_color
+
+    return Image.fromarray(pixels)
+
+
+def grid_to_index_grid(grid: StoredGrid, storage_version: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts a stored grid of color values to an index grid and its colors.
+
+    Each distinct value is resolved to RGB once, so rendering a stored pattern
+    costs one lookup per color instead of one per bead. v3 grids are already
+    stored as indices and are used without building a list of codes.
+
+    Args:
+        grid: 2D list of color values (hex codes for v1, color codes for v2),
+            or an encoded v3 grid
+        storage_version: 1 (hex), 2 (codes) or 3 (encoded codes) - determines how to interpret grid
+
+    Returns:
+        Tuple of (index_grid, palette_rgb). Unknown codes render as white.
+    """
+    if storage_version == 3:
+        values, index_grid = decode_index_grid(grid)
+    else:
+        unique_values, inverse = np.unique(np.array(grid, dtype=str), return_inverse=True)
+        values = unique_values.tolist()
+        index_grid = inverse.reshape(len(grid), len(grid[0]))
+
+    palette_rgb = np.empty((len(values), 3), dtype=np.uint8)
+    for i, color_value in enumerate(values):
+        if storage_version >= 2:
+            hex_color = code_to_hex(color_value)
+            if not hex_color:
+                hex_color = "#FFFFFF"  # Fallback to white for unknown codes
+        else:
+            hex_color = color_value  # Already hex
+        palette_rgb[i] = hex_to_rgb(hex_color)
+
+    return index_grid, palette_rgb
+
+
+def render_index_grid(index_grid: np.ndarray, bead_colors: List[Dict], scale: int = 20) -> Image.Image:
+    """
+    Creates a visual pattern image from a palette index grid.
+
+    Args:
+        index_grid: (H, W) array of indices into bead_colors
+        bead_colors: List of perle color dictionaries the indices refer to
+        scale: Pixel size for each bead (default 20x20 pixels per bead)
+
+    Returns:
+        PIL Image of the pattern
+    """
+    palette_rgb = np.array([bc["rgb"] for bc in bead_colors], dtype=np.uint8)
+    return render_pattern_image(index_grid, palette_rgb, scale=scale)
+
+
 def filter_rare_colors(
     pattern_data: List[List[str]],
     color_counts: Dict[str, int],
     bead_colors: List[Dict],
     min_percentage: float,
+    color_metric: str = "rgb",
 ) -> Tuple[List[List[str]], Dict[str, int]]:
     """
     Filters out colors that appear less than a minimum percentage of total beads.
@@ -83,6 +462,7 @@ def filter_rare_colors(
         color_counts: Dictionary of hex color to count
         bead_colors: List of available bead colors
         min_percentage: Minimum percentage (0.01 = 1%)
+        color_metric: Distance metric used to pick replacement colors
 
     Returns:
         Tuple of (updated_pattern_data, updated_color_counts)
@@ -111,7 +491,7 @@ def filter_rare_colors(
 
                 available_colors = [bc for bc in bead_colors if bc["hex"] not in colors_to_remove]
                 if available_colors:
-                    replacement_bead = find_closest_color(pixel_rgb, available_colors)
+                    replacement_bead = find_closest_color(pixel_rgb, available_colors, color_metric)
                     replacement_hex = replacement_bead["hex"]
                 else:
                     replacement_hex = most_common_color
@@ -139,27 +519,8 @@ def create_pattern_image(pattern_data: List[List[str]], scale: int = 20, storage
     Returns:
         PIL Image of the pattern
     """
-    height = len(pattern_data)
-    width = len(pattern_data[0]) if pattern_data else 0
-
-    pattern_img = Image.new('RGB', (width * scale, height * scale), 'white')
-
-    for y, row in enumerate(pattern_data):
-        for x, color_value in enumerate(row):
-            # Convert to hex for rendering
-            if storage_version == 2:
-                hex_color = code_to_hex(color_value)
-                if not hex_color:
-                    hex_color = "#FFFFFF"  # Fallback to white for unknown codes
-            else:
-                hex_color = color_value  # Already hex
-
-            rgb = hex_to_rgb(hex_color)
-            for py in range(scale):
-                for px in range(scale):
-                    pattern_img.putpixel((x * scale + px, y * scale + py), rgb)
-
-    return pattern_img
+    index_grid, palette_rgb = grid_to_index_grid(pattern_data, storage_version)
+    return render_pattern_image(index_grid, palette_rgb, scale=scale)
 
 
 def convert_image_to_pattern(
@@ -180,7 +541,8 @@ def convert_image_to_pattern(
     simplify_details: bool = True,
     simplification_method: str = "bilateral",
     simplification_strength: str = "medium",
-    use_nearest_neighbor: bool = False
+    use_nearest_neighbor: bool = False,
+    color_metric: str = "rgb"
 ) -> Tuple[str, List[Dict], Dict]:
     """
     Converts an image to a bead pattern with advanced processing options.
@@ -205,6 +567,7 @@ def convert_image_to_pattern(
         simplification_method: "bilateral", "mean_shift", or "gaussian"
         simplification_strength: "light", "medium", or "strong"
         use_nearest_neighbor: Whether to use nearest neighbor resampling
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
 
     Returns:
         Tuple of (output_path, colors_used, pattern_data)
@@ -215,22 +578,6 @@ def convert_image_to_pattern(
     if not bead_colors:
         raise HTTPException(status_code=500, detail="Perle color data is not available for processing.")
 
-    print("Pre-processing image...")
-    if use_advanced_preprocessing:
-        image = enhanced_preprocess_image(
-            image,
-            remove_bg=remove_bg,
-            enhance_colors=enhance_colors,
-            color_boost=color_boost,
-            contrast_boost=contrast_boost,
-            brightness_boost=brightness_boost,
-            simplify_details=simplify_details,
-            simplification_method=simplification_method,
-            simplification_strength=simplification_strength
-        )
-    else:
-        image = basic_preprocess_image(image, enhance_contrast=enhance_contrast)
-
     max_width = boards_width * BOARD_SIZE
     max_height = boards_height * BOARD_SIZE
 
@@ -241,90 +588,45 @@ def convert_image_to_pattern(
         max_height
     )
 
+    image = preprocess_source_image(
+        image,
+        use_advanced_preprocessing=use_advanced_preprocessing,
+        enhance_contrast=enhance_contrast,
+        remove_bg=remove_bg,
+        enhance_colors=enhance_colors,
+        color_boost=color_boost,
+        contrast_boost=contrast_boost,
+        brightness_boost=brightness_boost,
+        simplify_details=simplify_details,
+        simplification_method=simplification_method,
+        simplification_strength=simplification_strength,
+        working_size=(new_width, new_height)
+    )
+
     resampling_method = Image.Resampling.NEAREST if use_nearest_neighbor else Image.Resampling.LANCZOS
     img_resized = image.resize((new_width, new_height), resampling_method)
     print(f"Image resized to: {img_resized.size} using {resampling_method} (aspect ratio maintained)")
 
-    if use_quantization:
-        print("Applying color quantization...")
-        img_resized = quantize_to_perle_colors(
-            img_resized,
-            bead_colors,
-            use_dithering=use_dithering
-        )
-
-    pattern_data = []
-    color_counts = {}
-
-    print("Starting pixel-by-pixel color matching...")
-    for y in range(new_height):
-        row = []
-        for x in range(new_width):
-            pixel_rgb = img_resized.getpixel((x, y))
-            closest_bead = find_closest_color(pixel_rgb, bead_colors)
-            row.append(closest_bead["hex"])
-
-            color_key = closest_bead["hex"]
-            color_counts[color_key] = color_counts.get(color_key, 0) + 1
-
-        pattern_data.append(row)
-
-    print("Color matching complete.")
-
-    # Filter out rare colors
-    pattern_data_hex, color_counts = filter_rare_colors(
-        pattern_data,
-        color_counts,
+    index_grid, color_counts = generate_palette_index_grid(
+        img_resized,
         bead_colors,
-        min_percentage=0.005
+        use_quantization=use_quantization,
+        use_dithering=use_dithering,
+        color_metric=color_metric
     )
 
-    # Convert hex grid to code grid for v2 storage
-    print("Converting hex grid to code grid...")
-    pattern_data_codes = []
-    unknown_colors = {}
+    # Codes are only needed at the storage boundary
+    pattern_data_codes, colors_used, unknown_colors = build_pattern_outputs(
+        index_grid,
+        color_counts,
+        bead_colors
+    )
 
-    for row in pattern_data_hex:
-        code_row = []
-        for hex_color in row:
-            code = hex_to_code(hex_color)
-            if code:
-                code_row.append(code)
-            else:
-                # Unknown color - use fallback code "99"
-                if hex_color not in unknown_colors:
-                    fallback_code = "99"
-                    unknown_colors[hex_color] = fallback_code
-                    print(f"Warning: Unknown color {hex_color}, using fallback code {fallback_code}")
-                code_row.append(unknown_colors[hex_color])
-        pattern_data_codes.append(code_row)
-
-    pattern_img = create_pattern_image(pattern_data_hex, scale=20)
-    pattern_img.save(output_path)
+    pattern_img = render_index_grid(index_grid, bead_colors, scale=20)
+    with open(output_path, "wb") as f:
+        f.write(encode_pattern_image(pattern_img))
     print(f"Pattern image saved to: {output_path}")
 
-    # Build colors_used list (without hex - can be looked up from code)
-    colors_used = []
-    bead_color_lookup = {bc["hex"]: bc for bc in bead_colors}
-
-    for hex_color, count in color_counts.items():
-        bead = bead_color_lookup.get(hex_color)
-        if bead:
-            colors_used.append({
-                "name": bead["name"],
-                "code": bead.get("code", ""),
-                "count": count
-            })
-        else:
-            print(f"Warning: Hex color {hex_color} found in pattern but not in bead colors.")
-            colors_used.append({
-                "name": "Unknown Color",
-                "code": "",
-                "count": count
-            })
-
-    print(f"Unique colors used: {len(colors_used)}")
-
     # Build pattern_data dict with v2 format
     pattern_data_dict = {
         "grid": pattern_data_codes,
@@ -361,7 +663,8 @@ def convert_image_to_pattern_from_file(
     simplify_details: bool = True,
     simplification_method: str = "bilateral",
     simplification_strength: str = "medium",
-    use_nearest_neighbor: bool = False
+    use_nearest_neighbor: bool = False,
+    color_metric: str = "rgb"
 ) -> Tuple[str, List[Dict], Dict]:
     """
     Wrapper function that accepts file paths instead of Image objects.
@@ -387,6 +690,7 @@ def convert_image_to_pattern_from_file(
         simplification_method: Simplification method
         simplification_strength: Simplification strength
         use_nearest_neighbor: Whether to use nearest neighbor resampling
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
     """
     img = Image.open(image_path)
     return convert_image_to_pattern(
@@ -407,7 +711,8 @@ def convert_image_to_pattern_from_file(
         simplify_details=simplify_details,
         simplification_method=simplification_method,
         simplification_strength=simplification_strength,
-        use_nearest_neighbor=use_nearest_neighbor
+        use_nearest_neighbor=use_nearest_neighbor,
+        color_metric=color_metric
     )
 
 
@@ -428,7 +733,8 @@ def convert_image_to_pattern_in_memory(
     simplify_details: bool = True,
     simplification_method: str = "bilateral",
     simplification_strength: str = "medium",
-    use_nearest_neighbor: bool = False
+    use_nearest_neighbor: bool = False,
+    color_metric: str = "rgb"
 ) -> Tuple[str, List[Dict], Dict]:
     """
     Converts an image to a bead pattern entirely in memory.
@@ -452,6 +758,7 @@ def convert_image_to_pattern_in_memory(
         simplification_method: "bilateral", "mean_shift", or "gaussian"
         simplification_strength: "light", "medium", or "strong"
         use_nearest_neighbor: Whether to use nearest neighbor resampling
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
 
     Returns:
         Tuple of (pattern_image_base64, colors_used, pattern_data)
@@ -461,22 +768,6 @@ def convert_image_to_pattern_in_memory(
     if not bead_colors:
         raise HTTPException(status_code=500, detail="Perle color data is not available for processing.")
 
-    print("Pre-processing image...")
-    if use_advanced_preprocessing:
-        image = enhanced_preprocess_image(
-            image,
-            remove_bg=remove_bg,
-            enhance_colors=enhance_colors,
-            color_boost=color_boost,
-            contrast_boost=contrast_boost,
-            brightness_boost=brightness_boost,
-            simplify_details=simplify_details,
-            simplification_method=simplification_method,
-            simplification_strength=simplification_strength
-        )
-    else:
-        image = basic_preprocess_image(image, enhance_contrast=enhance_contrast)
-
     max_width = boards_width * BOARD_SIZE
     max_height = boards_height * BOARD_SIZE
 
@@ -487,94 +778,144 @@ def convert_image_to_pattern_in_memory(
         max_height
     )
 
+    image = preprocess_source_image(
+        image,
+        use_advanced_preprocessing=use_advanced_preprocessing,
+        enhance_contrast=enhance_contrast,
+        remove_bg=remove_bg,
+        enhance_colors=enhance_colors,
+        color_boost=color_boost,
+        contrast_boost=contrast_boost,
+        brightness_boost=brightness_boost,
+        simplify_details=simplify_details,
+        simplification_method=simplification_method,
+        simplification_strength=simplification_strength,
+        working_size=(new_width, new_height)
+    )
+
     resampling_method = Image.Resampling.NEAREST if use_nearest_neighbor else Image.Resampling.LANCZOS
     img_resized = image.resize((new_width, new_height), resampling_method)
     print(f"Image resized to: {img_resized.size} using {resampling_method} (aspect ratio maintained)")
 
-    if use_quantization:
-        print("Applying color quantization...")
-        img_resized = quantize_to_perle_colors(
-            img_resized,
-            bead_colors,
-            use_dithering=use_dithering
+    return build_pattern_from_resized_image(
+        img_resized,
+        bead_colors,
+        use_quantization=use_quantization,
+        use_dithering=use_dithering,
+        color_metric=color_metric
+    )
+
+
+PYRAMID_OVERSAMPLE = 4  # Pyramid levels keep at least this many source pixels per bead
+
+
+def preprocess_source_image(
+    image: Image.Image,
+    use_advanced_preprocessing: bool = False,
+    enhance_contrast: float = 1.2,
+    remove_bg: bool = False,
+    enhance_colors: bool = True,
+    color_boost: float = 1.5,
+    contrast_boost: float = 1.3,
+    brightness_boost: float = 1.0,
+    simplify_details: bool = True,
+    simplification_method: str = "bilateral",
+    simplification_strength: str = "medium",
+    working_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """
+    Runs the basic or enhanced preprocessing step shared by all pattern sizes.
+
+    Defaults match convert_image_to_pattern_in_memory; see it for the arguments.
+    working_size is the largest bead grid that will be sampled from the result;
+    the source is downsampled to a small multiple of it before any filtering.
+
+    Returns:
+        Pre-processed PIL Image
+    """
+    print("Pre-processing image...")
+    if use_advanced_preprocessing:
+        return enhanced_preprocess_image(
+            image,
+            remove_bg=remove_bg,
+            enhance_colors=enhance_colors,
+            color_boost=color_boost,
+            contrast_boost=contrast_boost,
+            brightness_boost=brightness_boost,
+            simplify_details=simplify_details,
+            simplification_method=simplification_method,
+            simplification_strength=simplification_strength,
+            working_size=working_size
         )
+    return basic_preprocess_image(image, enhance_contrast=enhance_contrast, working_size=working_size)
 
-    pattern_data = []
-    color_counts = {}
 
-    print("Starting pixel-by-pixel color matching...")
-    for y in range(new_height):
-        row = []
-        for x in range(new_width):
-            pixel_rgb = img_resized.getpixel((x, y))
-            closest_bead = find_closest_color(pixel_rgb, bead_colors)
-            row.append(closest_bead["hex"])
+def build_image_pyramid(image: Image.Image, min_size: Tuple[int, int], oversample: int = PYRAMID_OVERSAMPLE) -> List[Image.Image]:
+    """
+    Builds a list of successively halved copies of an image.
 
-            color_key = closest_bead["hex"]
-            color_counts[color_key] = color_counts.get(color_key, 0) + 1
+    Halving stops once the next level would have fewer than oversample pixels
+    per bead for min_size, so every level can still be resized to any target
+    at least as large as min_size without visible quality loss.
 
-        pattern_data.append(row)
+    Args:
+        image: Pre-processed source image (level 0)
+        min_size: Smallest (width, height) in beads that will be sampled
+        oversample: Minimum source pixels per bead kept in each level
 
-    print("Color matching complete.")
+    Returns:
+        List of images, largest first
+    """
+    levels = [image]
+    while True:
+        level = levels[-1]
+        if level.width // 2 < min_size[0] * oversample or level.height // 2 < min_size[1] * oversample:
+            return levels
+        levels.append(level.reduce(2))
 
-    # Filter out rare colors
-    pattern_data_hex, color_counts = filter_rare_colors(
-        pattern_data,
-        color_counts,
-        bead_colors,
-        min_percentage=0.005
-    )
 
-    # Convert hex grid to code grid for v2 storage
-    print("Converting hex grid to code grid...")
-    pattern_data_codes = []
-    unknown_colors = {}
+def build_pattern_from_resized_image(
+    img_resized: Image.Image,
+    bead_colors: List[Dict],
+    use_quantization: bool = True,
+    use_dithering: bool = False,
+    color_metric: str = "rgb"
+) -> Tuple[str, List[Dict], Dict]:
+    """
+    Quantizes a bead-resolution image and builds the API outputs for it.
 
-    for row in pattern_data_hex:
-        code_row = []
-        for hex_color in row:
-            code = hex_to_code(hex_color)
-            if code:
-                code_row.append(code)
-            else:
-                # Unknown color - use fallback code "99"
-                if hex_color not in unknown_colors:
-                    fallback_code = "99"
-                    unknown_colors[hex_color] = fallback_code
-                    print(f"Warning: Unknown color {hex_color}, using fallback code {fallback_code}")
-                code_row.append(unknown_colors[hex_color])
-        pattern_data_codes.append(code_row)
-
-    # Create pattern image using hex grid for rendering
-    pattern_img = create_pattern_image(pattern_data_hex, scale=20)
-
-    # Convert to base64 with data URI prefix for consistency
-    buffer = io.BytesIO()
-    pattern_img.save(buffer, format='PNG')
-    buffer.seek(0)
-    pattern_base64 = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+    Args:
+        img_resized: Image with one pixel per bead
+        bead_colors: List of available bead colors
+        use_quantization: If True, use color quantization for better results
+        use_dithering: If True, use Floyd-Steinberg dithering
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
 
-    # Build colors_used list (without hex - can be looked up from code)
-    colors_used = []
-    bead_color_lookup = {bc["hex"]: bc for bc in bead_colors}
+    Returns:
+        Tuple of (pattern_image_base64, colors_used, pattern_data)
+    """
+    new_width, new_height = img_resized.size
 
-    for hex_color, count in color_counts.items():
-        bead = bead_color_lookup.get(hex_color)
-        if bead:
-            colors_used.append({
-                "name": bead["name"],
-                "code": bead.get("code", ""),
-                "count": count
-            })
-        else:
-            print(f"Warning: Hex color {hex_color} found in pattern but not in bead colors.")
-            colors_used.append({
-                "name": "Unknown Color",
-                "code": "",
-                "count": count
-            })
+    index_grid, color_counts = generate_palette_index_grid(
+        img_resized,
+        bead_colors,
+        use_quantization=use_quantization,
+        use_dithering=use_dithering,
+        color_metric=color_metric
+    )
 
-    print(f"Unique colors used: {len(colors_used)}")
+    # Codes are only needed at the API boundary
+    pattern_data_codes, colors_used, unknown_colors = build_pattern_outputs(
+        index_grid,
+        color_counts,
+        bead_colors
+    )
+
+    # Create pattern image directly from the index grid
+    pattern_img = render_index_grid(index_grid, bead_colors, scale=20)
+
+    # Palette PNG as base64 with data URI prefix for consistency
+    pattern_base64 = pattern_image_to_data_uri(pattern_img)
 
     # Build pattern_data dict with v2 format
     pattern_data_dict = {
@@ -594,6 +935,166 @@ def convert_image_to_pattern_in_memory(
     return pattern_base64, colors_used, pattern_data_dict
 
 
+PATTERN_BUILD_OPTIONS = ("use_quantization", "use_dithering", "use_nearest_neighbor", "color_metric")
+
+
+def split_pattern_options(options: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Splits convert_image_to_patterns_in_memory keyword arguments by stage.
+
+    Returns:
+        (preprocess options for prepare_pattern_pyramid,
+         per-size options for build_pattern_from_pyramid_level)
+    """
+    preprocess_options = {k: v for k, v in options.items() if k not in PATTERN_BUILD_OPTIONS}
+    build_options = {k: v for k, v in options.items() if k in PATTERN_BUILD_OPTIONS}
+    return preprocess_options, build_options
+
+
+def prepare_pattern_pyramid(
+    image: Image.Image,
+    board_sizes: List[Tuple[int, int]],
+    **preprocess_options
+) -> Tuple[List[Tuple[int, int]], List[Image.Image]]:
+    """
+    Runs the shared preprocessing once and builds the image pyramid for several sizes.
+
+    Args:
+        image: PIL Image object
+        board_sizes: List of (boards_width, boards_height)
+        **preprocess_options: Keyword arguments for preprocess_source_image
+
+    Returns:
+        (bead dimensions per board size in the order given, pyramid levels largest first)
+    """
+    targets = [
+        calculate_dimensions_maintaining_aspect_ratio(
+            image.width,
+            image.height,
+            boards_width * BOARD_SIZE,
+            boards_height * BOARD_SIZE
+        )
+        for boards_width, boards_height in board_sizes
+    ]
+    max_size = (max(w for w, _ in targets), max(h for _, h in targets))
+    min_size = (min(w for w, _ in targets), min(h for _, h in targets))
+
+    image = preprocess_source_image(image, working_size=max_size, **preprocess_options)
+    pyramid = build_image_pyramid(image, min_size)
+    print(f"Built image pyramid with {len(pyramid)} level(s) for {len(targets)} size(s)")
+    return targets, pyramid
+
+
+def select_pyramid_level(level_sizes: List[Tuple[int, int]], target: Tuple[int, int]) -> int:
+    """
+    Index of the smallest pyramid level that still has enough pixels per bead for target.
+
+    Args:
+        level_sizes: (width, height) of each pyramid level, largest first
+        target: Bead dimensions (width, height)
+    """
+    selected = 0
+    for index, (width, height) in enumerate(level_sizes):
+        if width >= target[0] * PYRAMID_OVERSAMPLE and height >= target[1] * PYRAMID_OVERSAMPLE:
+            selected = index
+    return selected
+
+
+def build_pattern_from_pyramid_level(
+    source: Image.Image,
+    target: Tuple[int, int],
+    bead_colors: List[Dict],
+    use_quantization: bool = True,
+    use_dithering: bool = False,
+    use_nearest_neighbor: bool = False,
+    color_metric: str = "rgb"
+) -> Tuple[str, List[Dict], Dict]:
+    """
+    Resizes a pyramid level to one bead size and builds the pattern for it.
+
+    Args:
+        source: Pyramid level chosen with select_pyramid_level
+        target: Bead dimensions (width, height)
+        bead_colors: List of available bead colors
+        use_quantization, use_dithering, use_nearest_neighbor, color_metric:
+            See convert_image_to_patterns_in_memory
+
+    Returns:
+        Tuple of (pattern_image_base64, colors_used, pattern_data)
+    """
+    resampling_method = Image.Resampling.NEAREST if use_nearest_neighbor else Image.Resampling.LANCZOS
+    img_resized = source.resize(target, resampling_method)
+    print(f"Image resized to: {img_resized.size} from {source.size} pyramid level")
+
+    return build_pattern_from_resized_image(
+        img_resized,
+        bead_colors,
+        use_quantization=use_quantization,
+        use_dithering=use_dithering,
+        color_metric=color_metric
+    )
+
+
+def convert_image_to_patterns_in_memory(
+    image: Image.Image,
+    board_sizes: List[Tuple[int, int]],
+    use_quantization: bool = True,
+    use_dithering: bool = False,
+    use_nearest_neighbor: bool = False,
+    color_metric: str = "rgb",
+    **preprocess_options
+) -> List[Tuple[str, List[Dict], Dict]]:
+    """
+    Converts an image to bead patterns in several sizes at close to the cost of one.
+
+    Preprocessing (contrast, blur, bilateral/mean-shift filtering, background
+    removal) runs once, at a working resolution sized for the largest board
+    size. An image pyramid is built from the result
+    and every size is resized from the smallest level that still has
+    PYRAMID_OVERSAMPLE pixels per bead, then quantized and counted on its own.
+    The CPU worker pool runs the same steps with one task per size (see
+    cpu_pool.preprocess_shared_image).
+
+    Args:
+        image: PIL Image object
+        board_sizes: List of (boards_width, boards_height), e.g. [(2, 2), (4, 4), (6, 6)]
+        use_quantization: If True, use color quantization for better results
+        use_dithering: If True, use Floyd-Steinberg dithering
+        use_nearest_neighbor: Whether to use nearest neighbor resampling
+        color_metric: Color distance metric - "rgb", "cie76", "cie94" or "ciede2000"
+        **preprocess_options: Preprocessing keyword arguments accepted by
+            convert_image_to_pattern_in_memory (use_advanced_preprocessing,
+            enhance_contrast, remove_bg, enhance_colors, ...)
+
+    Returns:
+        List of (pattern_image_base64, colors_used, pattern_data), one per board size
+        in the order given
+    """
+    bead_colors = get_perle_colors()
+
+    if not bead_colors:
+        raise HTTPException(status_code=500, detail="Perle color data is not available for processing.")
+
+    if not board_sizes:
+        return []
+
+    targets, pyramid = prepare_pattern_pyramid(image, board_sizes, **preprocess_options)
+    level_sizes = [level.size for level in pyramid]
+
+    return [
+        build_pattern_from_pyramid_level(
+            pyramid[select_pyramid_level(level_sizes, target)],
+            target,
+            bead_colors,
+            use_quantization=use_quantization,
+            use_dithering=use_dithering,
+            use_nearest_neighbor=use_nearest_neighbor,
+            color_metric=color_metric
+        )
+        for target in targets
+    ]
+
+
 def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
     """
     Convert a PIL Image to base64 string.
@@ -611,72 +1112,62 @@ def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
     return base64.b64encode(buffer.getvalue()).decode('utf-8')
 
 
-def render_grid_to_image(grid: List[List[str]], bead_size: int = 10, storage_version: int = 1) -> Image.Image:
+def render_grid_to_image(
+    grid: StoredGrid,
+    bead_size: int = 10,
+    storage_version: int = 1,
+    grid_lines: bool = False,
+    board_lines: bool = False
+) -> Image.Image:
     """
     Renders a grid of color values to a PIL Image with rectangular beads.
 
     Args:
-        grid: 2D list of color values (hex codes for v1, color codes for v2)
+        grid: 2D list of color values (hex codes for v1, color codes for v2) or encoded v3 grid
         bead_size: Size of each bead in pixels (default: 10)
-        storage_version: 1 (hex) or 2 (codes) - determines how to interpret grid
+        storage_version: 1 (hex), 2 (codes) or 3 (encoded codes) - determines how to interpret grid
+        grid_lines: Draw lines between beads
+        board_lines: Draw separators between 29x29 boards
 
     Returns:
         PIL Image object
     """
-    if not grid or not grid[0]:
+    if not grid or 0 in get_grid_shape(grid, storage_version):
         raise ValueError("Grid is empty")
 
-    height = len(grid)
-    width = len(grid[0])
-
-    # Create image with white background
-    img_width = width * bead_size
-    img_height = height * bead_size
-    image = Image.new('RGB', (img_width, img_height), 'white')
-    draw = ImageDraw.Draw(image)
-
-    # Draw each bead as a rectangle
-    for row_idx, row in enumerate(grid):
-        for col_idx, color_value in enumerate(row):
-            # Convert to hex for rendering
-            if storage_version == 2:
-                hex_color = code_to_hex(color_value)
-                if not hex_color:
-                    hex_color = "#FFFFFF"  # Fallback to white for unknown codes
-            else:
-                hex_color = color_value  # Already hex
-
-            # Calculate bead position
-            x = col_idx * bead_size
-            y = row_idx * bead_size
+    index_grid, palette_rgb = grid_to_index_grid(grid, storage_version)
 
-            # Draw rectangular bead
-            draw.rectangle(
-                [x, y, x + bead_size, y + bead_size],
-                fill=hex_color,
-                outline=None
-            )
-
-    return image
+    return render_pattern_image(
+        index_grid,
+        palette_rgb,
+        scale=bead_size,
+        grid_lines=grid_lines,
+        board_size=BOARD_SIZE if board_lines else None
+    )
 
 
-def render_grid_to_base64(grid: List[List[str]], bead_size: int = 10, storage_version: int = 1) -> str:
+def render_grid_to_base64(
+    grid: StoredGrid,
+    bead_size: int = 10,
+    storage_version: int = 1,
+    grid_lines: bool = False,
+    board_lines: bool = False,
+    format: str = "png"
+) -> str:
     """
-    Renders a grid to a PNG image and returns it as base64 string.
+    Renders a grid to an image and returns it as base64 string.
 
     Args:
-        grid: 2D list of color values (hex codes for v1, color codes for v2)
+        grid: 2D list of color values (hex codes for v1, color codes for v2) or encoded v3 grid
         bead_size: Size of each bead in pixels (default: 10)
-        storage_version: 1 (hex) or 2 (codes) - determines how to interpret grid
+        storage_version: 1 (hex), 2 (codes) or 3 (encoded codes) - determines how to interpret grid
+        grid_lines: Draw lines between beads
+        board_lines: Draw separators between 29x29 boards
+        format: "png" (palette PNG) or "webp" (lossless WebP)
 
     Returns:
-        Base64 encoded PNG image string
+        Base64 encoded image string with data URI prefix
     """
-    image = render_grid_to_image(grid, bead_size, storage_version)
-
-    # Convert to base64 with data URI prefix for consistency
-    buffer = io.BytesIO()
-    image.save(buffer, format='PNG')
-    buffer.seek(0)
+    image = render_grid_to_image(grid, bead_size, storage_version, grid_lines, board_lines)
 
-    return f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+    return pattern_image_to_data_uri(image, format)
@@ -1,6 +1,12 @@
 """Service for pattern operations"""
 from app.models.pattern import Pattern
-from sqlalchemy.orm import Session
+from app.services.grid_storage import compress_pattern_data
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, defer
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
 import uuid as uuid_lib
 import logging
 
@@ -37,7 +43,7 @@ def save_custom_pattern(db: Session, pattern_data: dict, colors_used: list) -> i
         # Create pattern record
         db_pattern = Pattern(
             uuid=str(uuid_lib.uuid4()),
-            pattern_data=pattern_data,
+            pattern_data=compress_pattern_data(pattern_data),
             grid_size=grid_size,
             colors_used=colors_used,
         )
@@ -51,3 +57,104 @@ def save_custom_pattern(db: Session, pattern_data: dict, colors_used: list) -> i
     except Exception as e:
         logger.error(f"Failed to save custom pattern: {str(e)}")
         raise
+
+
+PATTERN_LIST_MAX_LIMIT = 200
+
+
+def encode_pattern_cursor(created_at: datetime, pattern_id: int) -> str:
+    """
+    Encode the (created_at, id) position of a pattern as an opaque cursor.
+
+    Args:
+        created_at: Pattern creation time
+        pattern_id: Pattern ID
+
+    Returns:
+        URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{pattern_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_pattern_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_pattern_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (created_at, pattern_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, pattern_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pattern_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def list_pattern_summaries(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    boards_width: Optional[int] = None,
+    boards_height: Optional[int] = None,
+    styled: Optional[bool] = None,
+    sanity_product_id: Optional[str] = None
+) -> Tuple[List[Tuple[Pattern, Dict[str, Any]]], Optional[str]]:
+    """
+    List patterns newest first without loading their grids.
+
+    pattern_data is deferred and replaced by "pattern_data - 'grid'" computed in
+    the database, so neither the grid nor its JSON parsing reaches Python.
+    Pages are keyset-paginated on (created_at, id), so a page costs the same
+    no matter how deep into the list it is.
+
+    Args:
+        db: Database session
+        limit: Page size (None = all remaining patterns)
+        cursor: next_cursor from the previous page
+        boards_width: Only patterns with this many boards in width
+        boards_height: Only patterns with this many boards in height
+        styled: Only AI-styled (True) or non-styled (False) patterns
+        sanity_product_id: Only the pattern linked to this Sanity product
+
+    Returns:
+        Tuple of ([(pattern, pattern_data without grid)], next_cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    pattern_meta = Pattern.pattern_data.op("-", return_type=JSONB)(literal_column("'grid'"))
+
+    query = db.query(Pattern, pattern_meta).options(defer(Pattern.pattern_data))
+
+    if boards_width is not None:
+        query = query.filter(Pattern.pattern_data["boards_width"].as_float() == boards_width)
+    if boards_height is not None:
+        query = query.filter(Pattern.pattern_data["boards_height"].as_float() == boards_height)
+    if styled is not None:
+        query = query.filter(func.coalesce(Pattern.pattern_data["styled"].as_boolean(), False) == styled)
+    if sanity_product_id is not None:
+        query = query.filter(Pattern.pattern_data["sanity_product_id"].astext == sanity_product_id)
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_pattern_cursor(cursor)
+        query = query.filter(tuple_(Pattern.created_at, Pattern.id) < tuple_(cursor_created_at, cursor_id))
+
+    query = query.order_by(Pattern.created_at.desc(), Pattern.id.desc())
+
+    if limit is None:
+        return query.all(), None
+
+    # One extra row tells whether there is a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last_pattern = rows[-1][0]
+    return rows, encode_pattern_cursor(last_pattern.created_at, last_pattern.id)
@@ -0,0 +1,90 @@
+"""
+Process-wide registry of the static images used in pattern PDFs.
+
+The logo, the QR code and the board layout grids (static/pdf, static/grids)
+are identical in every PDF. Each file is looked up, decoded and measured once
+per process and kept as a ReportLab ImageReader, so generating a PDF no
+longer touches the filesystem for them. Within a document drawImage embeds
+an image once and every page that draws it refers to the same XObject.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from reportlab.lib.utils import ImageReader
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+
+class PdfImageAsset(NamedTuple):
+    reader: "ImageReader"
+    width: float  # Points, with the source pixels at 96 DPI
+    height: float
+    path: str
+
+
+# Loaded assets by path relative to STATIC_DIR (None = file missing)
+_PDF_ASSETS: Dict[str, Optional[PdfImageAsset]] = {}
+_ASSETS_LOCK = threading.Lock()
+
+
+def _load_asset(path: Path) -> Optional[PdfImageAsset]:
+    """Decode an image file and wrap it for ReportLab."""
+    from reportlab.lib.utils import ImageReader
+
+    if not path.exists():
+        logger.warning(f"PDF image not found: {path}.")
+        return None
+
+    with Image.open(path) as img:
+        img.load()
+        image = img.copy()
+
+    reader = ImageReader(image)
+    reader.getRGBData()  # Extract the pixel data now rather than in the first PDF
+
+    width_pixels, height_pixels = image.size
+    return PdfImageAsset(reader, width_pixels * 72 / 96, height_pixels * 72 / 96, str(path))
+
+
+def get_pdf_asset(relative_path: str) -> Optional[PdfImageAsset]:
+    """
+    Get a static image, loading it on first use.
+
+    Args:
+        relative_path: Path below app/static, e.g. "pdf/pearly_black.png"
+
+    Returns:
+        PdfImageAsset, or None if the file does not exist
+    """
+    if relative_path not in _PDF_ASSETS:
+        with _ASSETS_LOCK:
+            if relative_path not in _PDF_ASSETS:
+                _PDF_ASSETS[relative_path] = _load_asset(STATIC_DIR / relative_path)
+    return _PDF_ASSETS[relative_path]
+
+
+def get_pdf_image(file_name: str) -> Optional[PdfImageAsset]:
+    """Get an image from static/pdf (logo, QR code)."""
+    return get_pdf_asset(f"pdf/{file_name}")
+
+
+def get_grid_image(boards_width: int, boards_height: int) -> Optional[PdfImageAsset]:
+    """
+    Get the board layout image for a pattern size.
+    Images are named like static/grids/2x3.png; None if there is none for this size.
+    """
+    return get_pdf_asset(f"grids/{boards_width}x{boards_height}.png")
+
+
+def clear_pdf_assets() -> None:
+    """Drop all loaded assets so they are read from disk again."""
+    with _ASSETS_LOCK:
+        _PDF_ASSETS.clear()
@@ -0,0 +1,291 @@
+"""
+On-disk cache of generated pattern PDFs.
+
+The same pattern PDF is downloaded many times by customers and by fulfilment,
+and generating it takes about a second for a large pattern. PDFs are stored
+under a key built from the pattern id, a hash of the grid, the rest of the
+pattern data, colors_used, the product title, the palette version and
+PDF_TEMPLATE_VERSION, so any change to what ends up on the page gives a new key.
+
+Layout: <PDF_CACHE_DIR>/<palette version>/<pattern id>/<key>.pdf
+
+Entries are evicted least recently used first once the directory exceeds
+PDF_CACHE_MAX_BYTES (see disk_cache.DiskCacheBudget). Editing a grid drops the
+pattern's directory; a palette change drops every other palette version's
+directory, as does each eviction.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from app.core.config import settings
+from .color_service import get_palette_version
+from .disk_cache import CacheFileEntry, DiskCacheBudget, list_cache_files, touch_cache_file
+from .pdf_generator import PDF_TEMPLATE_VERSION, spool_pattern_pdf
+from .render_cache import compute_grid_digest
+
+logger = logging.getLogger(__name__)
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class PdfFileCache:
+    """
+    Size-bounded LRU of PDF files on disk.
+
+    Recency is the file modification time, which is bumped on every hit, so the
+    cache survives restarts and can be shared by several worker processes.
+    """
+
+    def __init__(self, cache_dir: Optional[str], max_bytes: int):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = max_bytes
+        self._budget = DiskCacheBudget(self.cache_dir, "*/*/*.pdf", max_bytes) if self.cache_dir else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def open(self, pattern_id: str, key: str) -> Optional[BinaryIO]:
+        """Open the cached PDF for key, or return None."""
+        if not self.enabled:
+            return None
+
+        path = self._path(pattern_id, key)
+        try:
+            pdf_file = open(path, 'rb')
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        touch_cache_file(path)
+        with self._lock:
+            self.hits += 1
+        return pdf_file
+
+    def put(self, pattern_id: str, key: str, pdf_file: BinaryIO) -> None:
+        """Copy a PDF (from its current position) into the cache, then evict if over budget."""
+        if not self.enabled:
+            return
+
+        path = self._path(pattern_id, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Temp file + atomic rename so readers never see a partial PDF
+            temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(temp_fd, 'wb') as f:
+                shutil.copyfileobj(pdf_file, f, _COPY_CHUNK_SIZE)
+                size = f.tell()
+            Path(temp_path).replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write PDF cache entry {key}: {e}")
+            return
+
+        if self._budget.add(size):
+            self._evict()
+
+    def invalidate_pattern(self, pattern_id: str) -> int:
+        """Delete every cached PDF of a pattern. Returns the number of files removed."""
+        if not self.enabled:
+            return 0
+
+        removed = 0
+        for pattern_dir in self.cache_dir.glob(f"*/{pattern_id}"):
+            removed += sum(1 for _ in pattern_dir.glob("*.pdf"))
+            shutil.rmtree(pattern_dir, ignore_errors=True)
+        self._budget.reset()
+        return removed
+
+    def purge_stale_palettes(self) -> int:
+        """Delete PDFs rendered with any palette version other than the current one."""
+        if not self.enabled or not self.cache_dir.exists():
+            return 0
+
+        current = get_palette_version()
+        removed = 0
+        for palette_dir in self.cache_dir.iterdir():
+            if palette_dir.is_dir() and palette_dir.name != current:
+                removed += sum(1 for _ in palette_dir.glob("*/*.pdf"))
+                shutil.rmtree(palette_dir, ignore_errors=True)
+        self._budget.reset()
+        return removed
+
+    def clear(self) -> None:
+        """Delete all cached PDFs and reset the counters."""
+        if self.enabled and self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._budget.reset()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "enabled": self.enabled,
+            }
+
+    def _path(self, pattern_id: str, key: str) -> Path:
+        return self.cache_dir / get_palette_version() / str(pattern_id) / f"{key}.pdf"
+
+    def _entries(self) -> List[CacheFileEntry]:
+        """(mtime, size, path) of every cached PDF."""
+        if not self.enabled:
+            return []
+        return list_cache_files(self.cache_dir, "*/*/*.pdf")
+
+    def _evict(self) -> None:
+        self.purge_stale_palettes()
+        self._budget.evict()
+
+
+# Global cache instance
+PDF_CACHE = PdfFileCache(
+    cache_dir=settings.PDF_CACHE_DIR or None,
+    max_bytes=settings.PDF_CACHE_MAX_BYTES
+)
+
+
+def make_pdf_cache_key(
+    pattern_id: str,
+    pattern_data: Dict,
+    colors_used: List[Dict],
+    product_title: Optional[str] = None
+) -> str:
+    """
+    Build the cache key of a pattern PDF.
+
+    Args:
+        pattern_id: Pattern ID
+        pattern_data: Stored pattern data (any storage version)
+        colors_used: Stored colors_used
+        product_title: Product title passed to the generator
+
+    Returns:
+        Hex SHA-256 cache key
+    """
+    grid = pattern_data.get("grid", [])
+    storage_version = pattern_data.get("storage_version", 1)
+    key_source = json.dumps(
+        {
+            "pattern": str(pattern_id),
+            "grid": compute_grid_digest(grid, storage_version),
+            "pattern_data": {k: v for k, v in pattern_data.items() if k != "grid"},
+            "colors_used": colors_used,
+            "product_title": product_title,
+            "palette": get_palette_version(),
+            "template": PDF_TEMPLATE_VERSION,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def open_pattern_pdf(
+    pattern_id: str,
+    pattern_data: Dict,
+    colors_used: List[Dict],
+    product_title: Optional[str] = None
+) -> BinaryIO:
+    """
+    Open a pattern PDF from the cache, generating and caching it on a miss.
+
+    Args:
+        pattern_id: Pattern ID
+        pattern_data: Stored pattern data
+        colors_used: Stored colors_used
+        product_title: Optional product title to display on cover page
+
+    Returns:
+        File object positioned at the start of the PDF (the caller closes it)
+    """
+    key = make_pdf_cache_key(pattern_id, pattern_data, colors_used, product_title)
+
+    cached = PDF_CACHE.open(pattern_id, key)
+    if cached is not None:
+        return cached
+
+    # The generator adds hex values to colors_used, which must not leak into the caller's copy
+    pdf_file = spool_pattern_pdf(pattern_data, copy.deepcopy(colors_used), product_title=product_title)
+    PDF_CACHE.put(pattern_id, key, pdf_file)
+    pdf_file.seek(0)
+    return pdf_file
+
+
+def pregenerate_order_pdfs(order_id: int) -> None:
+    """
+    Generate and cache the PDFs of every pattern in an order.
+
+    Meant to run as a background task once an order is paid, so the first
+    download by fulfilment or the customer is served from the cache.
+
+    Args:
+        order_id: Order ID
+    """
+    if not PDF_CACHE.enabled:
+        return
+
+    from app.core.database import SessionLocal
+    from app.models.order_line import OrderLine
+    from app.models.pattern import Pattern
+
+    db = SessionLocal()
+    try:
+        patterns = (
+            db.query(Pattern)
+            .join(OrderLine, OrderLine.pattern_id == Pattern.id)
+            .filter(OrderLine.order_id == order_id)
+            .distinct()
+            .all()
+        )
+
+        for pattern in patterns:
+            if not pattern.pattern_data:
+                continue
+            try:
+                open_pattern_pdf(str(pattern.id), pattern.pattern_data, pattern.colors_used or []).close()
+            except Exception as e:
+                logger.error(f"Failed to pre-generate PDF for pattern {pattern.id} (order {order_id}): {e}")
+
+        logger.info(f"Pre-generated {len(patterns)} pattern PDF(s) for order {order_id}")
+    except Exception as e:
+        logger.error(f"Failed to pre-generate PDFs for order {order_id}: {e}")
+    finally:
+        db.close()
+
+
+def invalidate_pattern_pdfs(pattern_id: str) -> None:
+    """Drop every cached PDF of a pattern (call after its grid changes)."""
+    PDF_CACHE.invalidate_pattern(str(pattern_id))
+
+
+def purge_stale_palette_pdfs() -> None:
+    """Drop cached PDFs rendered with an outdated palette (call after palette changes)."""
+    PDF_CACHE.purge_stale_palettes()
+
+
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and disk usage of the PDF cache."""
+    return PDF_CACHE.stats()
@@ -1,25 +1,110 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors as reportlab_colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.utils import ImageReader
-from typing import List, Dict, Tuple, Optional
-from PIL import Image
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, List, Dict, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
 import io
+import json
 import os
+import tempfile
+import threading
 
-from .color_service import code_to_hex
+from .color_service import code_to_hex, get_palette_version
+from app.core.config import settings
 from .pattern_generator import render_grid_to_image
+from .grid_storage import decode_grid
+from .pdf_assets import get_grid_image, get_pdf_image
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when the PDF layout changes so cached PDFs (see pdf_cache) are regenerated
+PDF_TEMPLATE_VERSION = 1
+
+PDF_SPOOL_MAX_BYTES = 4 * 1024 * 1024  # Spooled PDFs larger than this move from memory to a temp file
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+BoardSlice = Tuple[Tuple[str, ...], ...]
+
+
+class BoardPageCache:
+    """
+    LRU cache of board page content (PDF operators) with a size-based byte budget.
+
+    A board page's bead placements only depend on its 29x29 slice of the grid,
+    so after a grid edit only the boards whose slice changed are drawn again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached operators for key, or None."""
+        with self._lock:
+            operators = self._entries.get(key)
+            if operators is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return operators
+
+    def put(self, key: str, operators: str) -> None:
+        """Store the operators of one board page."""
+        if len(operators) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = operators
+            self._bytes += len(operators)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global board page cache
+BOARD_PAGE_CACHE = BoardPageCache(max_bytes=settings.PDF_BOARD_CACHE_MAX_BYTES)
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
+
 
 # Register custom fonts
 def _register_fonts():
     """Register Tahoma fonts for use in PDFs."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
     fonts_dir = os.path.join(os.path.dirname(__file__), '..', 'fonts')
     regular_path = os.path.join(fonts_dir, 'tahoma.ttf')
     bold_path = os.path.join(fonts_dir, 'tahoma-bold.ttf')
@@ -39,11 +124,16 @@ def _register_fonts():
         return True
     return False
 
-# Try to register fonts at module load
-_QUICKSAND_AVAILABLE = _register_fonts()
+# Fonts are registered on first use (None = not tried yet) so importing this module stays cheap
+_QUICKSAND_AVAILABLE: Optional[bool] = None
 
 def _get_font(style: str = 'regular') -> str:
     """Get the appropriate font name based on availability."""
+    global _QUICKSAND_AVAILABLE
+
+    if _QUICKSAND_AVAILABLE is None:
+        _QUICKSAND_AVAILABLE = _register_fonts()
+
     if _QUICKSAND_AVAILABLE:
         font_map = {
             'regular': 'Tahoma',
@@ -79,40 +169,8 @@ def get_board_label(board_x: int, board_y: int) -> str:
     return f"{letter}{number}"
 
 
-def get_grid_image_path(boards_width: int, boards_height: int) -> str:
-    """
-    Returns the path to the grid image based on dimensions.
-    Images should be named like: 1x1.png, 2x3.png, etc.
-    Returns None if the image doesn't exist.
-    """
-    grids_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'grids')
-    image_name = f"{boards_width}x{boards_height}.png"
-    image_path = os.path.join(grids_dir, image_name)
-
-    if os.path.exists(image_path):
-        return image_path
-
-    logger.warning(f"Grid image not found: {image_path}. Falling back to drawn grid.")
-    return None
-
-def get_pdf_image_path(file_name: str) -> str:
-    """
-    Returns the path to the grid image based on dimensions.
-    Images should be named like: 1x1.png, 2x3.png, etc.
-    Returns None if the image doesn't exist.
-    """
-    pdf_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'pdf')
-    image_name = f"{file_name}"
-    image_path = os.path.join(pdf_dir, image_name)
-
-    if os.path.exists(image_path):
-        return image_path
-
-    logger.warning(f"pdf image not found: {image_path}.")
-    return None
-
 def _draw_title_page(
-    c: canvas.Canvas,
+    c: "canvas.Canvas",
     page_width: float,
     page_height: float,
     boards_width: int,
@@ -132,24 +190,20 @@ def _draw_title_page(
         grid: Pattern grid data
         storage_version: Storage version (1 for hex, 2 for codes)
     """
-    # Draw logo at the top
-    logo_image_path = get_pdf_image_path("pearly_black.png")
+    # Draw logo at the top (loaded and measured once per process)
+    logo = get_pdf_image("pearly_black.png")
 
-    if logo_image_path:
+    if logo:
         try:
-            with Image.open(logo_image_path) as img:
-                logo_width_pixels, logo_height_pixels = img.size
-
-            # Convert pixels to points (assuming 72 DPI)
-            logo_width = (logo_width_pixels * 72 / 96)
-            logo_height = (logo_height_pixels * 72 / 96)
+            logo_width = logo.width
+            logo_height = logo.height
 
             # Center the logo horizontally at top of page
             logo_x = (page_width - logo_width) / 2
             logo_y = page_height - 2 * cm - logo_height
 
             c.drawImage(
-                logo_image_path,
+                logo.reader,
                 logo_x,
                 logo_y,
                 width=logo_width,
@@ -157,7 +211,7 @@ def _draw_title_page(
                 preserveAspectRatio=True,
                 mask='auto'
             )
-            logger.info(f"Title page - Using logo image: {logo_image_path}")
+            logger.info(f"Title page - Using logo image: {logo.path}")
 
             # Position content below logo
             content_y = logo_y - 1 * cm
@@ -211,6 +265,8 @@ def _draw_title_page(
         img_x = (page_width - display_width) / 2
         img_y = info_y - display_height - 1 * cm
 
+        from reportlab.lib.utils import ImageReader
+
         c.drawImage(
             ImageReader(img_buffer),
             img_x,
@@ -231,7 +287,7 @@ def _draw_title_page(
 
 
 def _draw_instructions_page(
-    c: canvas.Canvas,
+    c: "canvas.Canvas",
     page_width: float,
     page_height: float,
     boards_width: int,
@@ -242,25 +298,20 @@ def _draw_instructions_page(
     Each board is represented as a labeled square in a grid.
     This is page 2 of the PDF.
     """
-    # Draw logo at the top of the page
-    logo_image_path = get_pdf_image_path("pearly_black.png")
+    # Draw logo at the top of the page (same image as the title page, embedded once)
+    logo = get_pdf_image("pearly_black.png")
 
-    if logo_image_path:
+    if logo:
         try:
-            # Get original image dimensions
-            with Image.open(logo_image_path) as img:
-                logo_width_pixels, logo_height_pixels = img.size
-
-            # Convert pixels to points (assuming 72 DPI)
-            logo_width = (logo_width_pixels * 72 / 96)  # Adjust DPI ratio as needed
-            logo_height = (logo_height_pixels * 72 / 96)
+            logo_width = logo.width
+            logo_height = logo.height
 
             # Center the logo horizontally at top of page
             logo_x = (page_width - logo_width) / 2
             logo_y = page_height - 1 * cm - logo_height
 
             c.drawImage(
-                logo_image_path,
+                logo.reader,
                 logo_x,
                 logo_y,
                 width=logo_width,
@@ -268,7 +319,7 @@ def _draw_instructions_page(
                 preserveAspectRatio=True,
                 mask='auto'
             )
-            logger.info(f"Using logo image: {logo_image_path}")
+            logger.info(f"Using logo image: {logo.path}")
 
             # Position content below logo
             title_y = logo_y - 1 * cm
@@ -277,7 +328,6 @@ def _draw_instructions_page(
             logger.error(f"Failed to draw logo: {e}.")
             import traceback
             traceback.print_exc()
-            logo_image_path = None
             title_y = page_height - 3 * cm
     else:
         print("Logo image path not found")
@@ -299,13 +349,13 @@ def _draw_instructions_page(
     grid_start_x = (page_width - total_grid_width) / 2
     grid_start_y = title_y - 1 * cm - total_grid_height
     # Try to use grid image first, fall back to drawing if not available
-    grid_image_path = get_grid_image_path(boards_width, boards_height)
+    grid_image = get_grid_image(boards_width, boards_height)
 
-    if grid_image_path:
+    if grid_image:
         # Draw the grid image
         try:
             c.drawImage(
-                grid_image_path,
+                grid_image.reader,
                 grid_start_x,
                 grid_start_y,
                 width=total_grid_width,
@@ -313,12 +363,12 @@ def _draw_instructions_page(
                 preserveAspectRatio=True,
                 mask='auto'
             )
-            logger.info(f"Using grid image: {grid_image_path}")
+            logger.info(f"Using grid image: {grid_image.path}")
         except Exception as e:
             logger.error(f"Failed to draw grid image: {e}. Falling back to drawn grid.")
-            grid_image_path = None  # Fall back to drawing
+            grid_image = None  # Fall back to drawing
     # Draw grid manually if no image or image failed
-    if not grid_image_path:
+    if not grid_image:
         for board_y in range(boards_height):
             for board_x in range(boards_width):
                 # Calculate position (top-left origin, flip y to start from top)
@@ -388,18 +438,13 @@ def _draw_instructions_page(
     footer_y = 3 * cm
 
     # Draw QR code in original size, centered on page
-    qr_image_path = get_pdf_image_path("perlehjelpen_qr.png")
+    qr_image = get_pdf_image("perlehjelpen_qr.png")
 
-    if qr_image_path:
+    if qr_image:
         footer_y = 4 * cm
         try:
-            # Get original image dimensions
-            with Image.open(qr_image_path) as img:
-                qr_width_pixels, qr_height_pixels = img.size
-
-            # Convert pixels to points (assuming 72 DPI)
-            qr_width = (qr_width_pixels * 72 / 96)  # Adjust DPI ratio as needed
-            qr_height = (qr_height_pixels * 72 / 96)
+            qr_width = qr_image.width
+            qr_height = qr_image.height
 
             # Center the QR code horizontally
             qr_x = (page_width - qr_width) / 2
@@ -407,7 +452,7 @@ def _draw_instructions_page(
             qr_y = footer_y - line_spacing - 1.25 * cm - qr_height
 
             c.drawImage(
-                qr_image_path,
+                qr_image.reader,
                 qr_x,
                 footer_y,
                 width=qr_width,
@@ -415,10 +460,9 @@ def _draw_instructions_page(
                 preserveAspectRatio=True,
                 mask='auto'
             )
-            logger.info(f"Using QR code image: {qr_image_path}")
+            logger.info(f"Using QR code image: {qr_image.path}")
         except Exception as e:
             logger.error(f"Failed to draw QR image: {e}.")
-            qr_image_path = None
 
     footer_text_y = footer_y - line_spacing - 0.5 * cm
     c.setFont(_get_font('bold'), 10)
@@ -428,6 +472,200 @@ def _draw_instructions_page(
     c.drawCentredString(page_width / 2, footer_text_y - 2 * line_spacing, "www.feelpearly.no/perlehjelpen")
 
 
+def _bead_form_name(color_value: str) -> str:
+    """Stable, PDF-name-safe form name for a grid value."""
+    return f"bead_{color_value.encode('utf-8').hex()}"
+
+
+def _board_page_key(board_slice: BoardSlice, geometry: Tuple[float, float, float]) -> str:
+    """Cache key of a board page: its grid slice, the page geometry, palette and template version."""
+    key_source = json.dumps(
+        [board_slice, geometry, get_palette_version(), PDF_TEMPLATE_VERSION],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def _board_page_operators(board_slice: BoardSlice, geometry: Tuple[float, float, float]) -> str:
+    """
+    Builds the PDF operators that place one bead form per cell of a board.
+
+    Args:
+        board_slice: Grid values of the board, row by row
+        geometry: (left edge, top edge, bead size) in points
+
+    Returns:
+        Content stream fragment (one "q 1 0 0 1 x y cm /Form Do Q" per bead)
+    """
+    from reportlab.lib.rl_accel import fp_str
+    from reportlab.pdfbase.pdfdoc import xObjectName
+
+    left, top, bead_size_points = geometry
+    operators = []
+    for local_y, row in enumerate(board_slice):
+        # Note: PDF coordinates start from bottom-left, so rows go down from the top edge
+        y = top - (local_y + 1) * bead_size_points
+        for local_x, color_value in enumerate(row):
+            x = left + local_x * bead_size_points
+            operators.append(f"q 1 0 0 1 {fp_str(x, y)} cm /{xObjectName(_bead_form_name(color_value))} Do Q")
+    return "\n".join(operators)
+
+
+def _build_board_pages(board_slices: List[BoardSlice], geometry: Tuple[float, float, float]) -> List[str]:
+    """
+    Returns the page content of every board, in order, from the board page cache.
+
+    Boards missing from the cache are built in the PDF worker pool when
+    PDF_BOARD_WORKERS is set and more than one board is missing, otherwise
+    in-process. If the pool is broken (a worker died) it is discarded and the
+    boards are built in-process. Operators are a pure function of the slice
+    and geometry, so the result is identical either way.
+
+    Args:
+        board_slices: Grid values of each board, row by row
+        geometry: (left edge, top edge, bead size) in points
+
+    Returns:
+        Content stream fragment per board
+    """
+    from .cpu_pool import discard_pdf_executor, get_pdf_executor
+
+    keys = [_board_page_key(board_slice, geometry) for board_slice in board_slices]
+    pages = [BOARD_PAGE_CACHE.get(key) for key in keys]
+    missing = [index for index, operators in enumerate(pages) if operators is None]
+
+    built = None
+    executor = get_pdf_executor() if len(missing) > 1 else None
+    if executor is not None:
+        chunksize = max(1, -(-len(missing) // settings.PDF_BOARD_WORKERS))  # Ceiling division
+        try:
+            built = list(executor.map(
+                _board_page_operators,
+                [board_slices[index] for index in missing],
+                [geometry] * len(missing),
+                chunksize=chunksize
+            ))
+        except BrokenProcessPool:
+            logger.warning("PDF worker pool is broken (a worker died); restarting it and building boards in-process")
+            discard_pdf_executor(executor)
+
+    if built is None:
+        built = [_board_page_operators(board_slices[index], geometry) for index in missing]
+
+    for index, operators in zip(missing, built):
+        BOARD_PAGE_CACHE.put(keys[index], operators)
+        pages[index] = operators
+
+    return pages
+
+
+def _place_board_beads(c: "canvas.Canvas", board_slice: BoardSlice, operators: str) -> None:
+    """
+    Adds a board's bead placements to the current page.
+
+    Args:
+        c: ReportLab canvas (bead forms already defined)
+        board_slice: Grid values of the board, row by row
+        operators: Page content from _build_board_pages
+    """
+    c.addLiteral(operators)
+
+    # ReportLab only lists forms drawn through doForm in the page resources, so
+    # draw each form the literal operators use once more, clipped to an empty
+    # area so nothing is painted (sorted, for deterministic output)
+    c.saveState()
+    clip = c.beginPath()
+    clip.rect(0, 0, 0, 0)
+    c.clipPath(clip, stroke=0, fill=0)
+    for value in sorted({value for row in board_slice for value in row}):
+        c.doForm(_bead_form_name(value))
+    c.restoreState()
+
+
+def _define_bead_forms(
+    c: "canvas.Canvas",
+    grid: List[List[str]],
+    storage_version: int,
+    color_info: Dict[str, Dict],
+    bead_size_points: float,
+    font_size: float
+) -> Dict[str, str]:
+    """
+    Defines one reusable form XObject per distinct grid value.
+
+    Each form is a colored bead circle with its color code centered in black or
+    white, drawn once with its origin at the bead's lower-left corner. Board
+    pages then place a form per bead instead of repeating the drawing operators.
+    Form names depend only on the grid value, so cached board pages stay valid
+    across documents.
+    Forms must be defined between pages (ReportLab builds them from the current
+    page stream).
+
+    Args:
+        c: ReportLab canvas
+        grid: Pattern grid data (hex values for v1, color codes for v2)
+        storage_version: Storage version (1 for hex, 2 for codes)
+        color_info: Color lookup built from colors_used (keyed by hex for v1)
+        bead_size_points: Bead diameter in points
+        font_size: Font size of the code label
+
+    Returns:
+        Dictionary mapping grid value to form name
+    """
+    from reportlab.lib import colors as reportlab_colors
+
+    font_name = _get_font('bold')
+    form_names = {}
+
+    for color_value in sorted({value for row in grid for value in row}):
+        if storage_version == 2:
+            # Grid contains codes, convert to hex for rendering
+            color_code = color_value
+            hex_color = code_to_hex(color_value)
+            if not hex_color:
+                hex_color = "#FFFFFF"  # Fallback to white for unknown codes
+                print(f"PDF Generation - Unknown color code in grid: {color_value}")
+            else:
+                logger.debug(f"PDF Generation v2 - Code {color_code} -> Hex {hex_color}")
+        else:
+            # Grid contains hex, extract code from color_info
+            hex_color = color_value
+            color_info_entry = color_info.get(hex_color, {})
+            color_code = color_info_entry.get('code', '?')
+            if not color_info_entry:
+                print(f"PDF Generation v1 - Hex {hex_color} not found in color_info")
+                print(f"PDF Generation v1 - Available keys: {list(color_info.keys())[:5]}")
+
+        form_name = _bead_form_name(color_value)
+        c.beginForm(form_name, 0, 0, bead_size_points, bead_size_points)
+
+        # Draw circle with color
+        r, g, b = hex_to_rgb_normalized(hex_color)
+        c.setFillColorRGB(r, g, b)
+        c.circle(bead_size_points / 2, bead_size_points / 2, bead_size_points / 2, fill=1, stroke=0)
+
+        brightness = (r * 299 + g * 587 + b * 114) / 1000
+        c.setFillColor(reportlab_colors.black if brightness > 0.5 else reportlab_colors.white)
+
+        # Center the text (width is measured once per code)
+        text = str(color_code)
+        text_width = c.stringWidth(text, font_name, font_size)
+        # Adjust y for text baseline
+        text_y = (bead_size_points - font_size) / 2 + font_size * 0.2
+        c.setFont(font_name, font_size)
+        c.drawString((bead_size_points - text_width) / 2, text_y, text)
+
+        c.endForm()
+        form_names[color_value] = form_name
+
+    return form_names
+
+
+def get_board_page_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters of the board page cache."""
+    return BOARD_PAGE_CACHE.stats()
+
+
 def generate_pattern_pdf(
     pattern_data: Dict,
     colors_used: List[Dict],
@@ -449,6 +687,86 @@ def generate_pattern_pdf(
     Returns:
         PDF content as bytes
     """
+    buffer = io.BytesIO()
+    write_pattern_pdf(pattern_data, colors_used, buffer, product_title=product_title)
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+
+    # Optionally save to file
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
+
+    return pdf_bytes
+
+
+def spool_pattern_pdf(
+    pattern_data: Dict,
+    colors_used: List[Dict],
+    product_title: Optional[str] = None
+) -> BinaryIO:
+    """
+    Generates the pattern PDF into a spooled temporary file for streaming.
+
+    The PDF is written once, into memory up to PDF_SPOOL_MAX_BYTES and to a
+    temp file beyond that, instead of being copied between buffers. Pair with
+    iter_pdf_chunks to send it.
+
+    Args:
+        pattern_data: Dictionary containing grid, width, height, boards_width, boards_height
+        colors_used: List of color dictionaries with hex, name, code, and count
+        product_title: Optional product title to display on cover page
+
+    Returns:
+        File object positioned at the start of the PDF (the caller closes it)
+    """
+    pdf_file = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES, suffix='.pdf')
+    try:
+        write_pattern_pdf(pattern_data, colors_used, pdf_file, product_title=product_title)
+    except Exception:
+        pdf_file.close()
+        raise
+    pdf_file.seek(0)
+    return pdf_file
+
+
+def iter_pdf_chunks(pdf_file: BinaryIO, chunk_size: int = PDF_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Reads a spooled PDF in chunks and closes it when done (or when the client disconnects).
+
+    Args:
+        pdf_file: File object from spool_pattern_pdf
+        chunk_size: Bytes per chunk
+
+    Yields:
+        PDF content chunks
+    """
+    try:
+        while True:
+            chunk = pdf_file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        pdf_file.close()
+
+
+def write_pattern_pdf(
+    pattern_data: Dict,
+    colors_used: List[Dict],
+    output: BinaryIO,
+    product_title: Optional[str] = None
+) -> None:
+    """
+    Draws the pattern PDF and writes it to a binary file object.
+
+    Args:
+        pattern_data: Dictionary containing grid, width, height, boards_width, boards_height
+        colors_used: List of color dictionaries with hex, name, code, and count
+        output: Writable binary file object
+        product_title: Optional product title to display on cover page
+    """
     grid = pattern_data.get('grid', [])
     pattern_width = pattern_data.get('width', 0)
     pattern_height = pattern_data.get('height', 0)
@@ -456,6 +774,7 @@ def generate_pattern_pdf(
     boards_height = pattern_data.get('boards_height', 1)
     board_size = pattern_data.get('board_size', 29)
     storage_version = pattern_data.get('storage_version', 1)  # Default to v1 for legacy patterns
+    grid, storage_version = decode_grid(grid, storage_version)  # v3 is drawn as a v2 code grid
 
     # Calculate dimensions from grid if not in pattern_data
     if pattern_width == 0 and grid:
@@ -503,8 +822,10 @@ def generate_pattern_pdf(
         except KeyError as e:
             print(f"PDF Generation - KeyError building color_info for v1: {e}")
             raise
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+    from reportlab.pdfgen import canvas
+
+    # invariant: fixed creation date and document ID, so identical input gives identical bytes
+    c = canvas.Canvas(output, pagesize=A4, invariant=1)
     page_width, page_height = A4
 
     pattern_cm_size = 14.4
@@ -521,109 +842,45 @@ def generate_pattern_pdf(
     # Page 2: Instructions page with board layout and assembly instructions
     _draw_instructions_page(c, page_width, page_height, boards_width, boards_height)
     c.showPage()
+
+    # Calculate font size for numbers inside circles
+    # We want the text to be readable but fit inside the circle
+    # Circle diameter is bead_size_points
+    font_size = max(4, min(bead_size_points * 0.5, 12))
+    _define_bead_forms(c, grid, storage_version, color_info, bead_size_points, font_size)
+
+    boards = []
     for board_y in range(boards_height):
         for board_x in range(boards_width):
             start_x = board_x * board_size
             start_y = board_y * board_size
             end_x = min(start_x + board_size, pattern_width)
             end_y = min(start_y + board_size, pattern_height)
+            board_slice = tuple(tuple(row[start_x:end_x]) for row in grid[start_y:end_y])
+            boards.append((board_x, board_y, end_x - start_x, end_y - start_y, board_slice))
 
-            board_label = get_board_label(board_x, board_y)
-
-            c.setFont(_get_font('bold'), 16)
-            c.drawString(margin_left, page_height - margin_top + 1 * cm, f"Brett {board_label}")
+    board_pages = _build_board_pages(
+        [board_slice for *_, board_slice in boards],
+        (margin_left, page_height - margin_top, bead_size_points)
+    )
 
-            c.setFont(_get_font('regular'), 10)
-            board_width_beads = end_x - start_x
-            board_height_beads = end_y - start_y
-            c.drawString(
-                margin_left,
-                page_height - margin_top + 0.5 * cm,
-                f"{board_width_beads} × {board_height_beads} perler"
-            )
+    for (board_x, board_y, board_width_beads, board_height_beads, board_slice), operators in zip(boards, board_pages):
+        board_label = get_board_label(board_x, board_y)
 
-            # Calculate font size for numbers inside circles
-            # We want the text to be readable but fit inside the circle
-            # Circle diameter is bead_size_points
-            font_size = max(4, min(bead_size_points * 0.5, 12))
-            c.setFont(_get_font('bold'), font_size)
-
-            # Draw the beads
-            logged_colors = set()  # Track which colors we've logged to avoid spam
-            for row_idx in range(start_y, end_y):
-                for col_idx in range(start_x, end_x):
-                    if row_idx < len(grid) and col_idx < len(grid[row_idx]):
-                        color_value = grid[row_idx][col_idx]
-
-                        # Convert to hex and code based on storage version
-                        if storage_version == 2:
-                            # Grid contains codes, convert to hex for rendering
-                            color_code = color_value
-                            hex_color = code_to_hex(color_value)
-                            if not hex_color:
-                                hex_color = "#FFFFFF"  # Fallback to white for unknown codes
-                                if color_value not in logged_colors:
-                                    print(f"PDF Generation - Unknown color code in grid: {color_value}")
-                                    logged_colors.add(color_value)
-                            elif color_value not in logged_colors:
-                                logger.debug(f"PDF Generation v2 - Code {color_code} -> Hex {hex_color}")
-                                logged_colors.add(color_value)
-                        else:
-                            # Grid contains hex, extract code from color_info
-                            hex_color = color_value
-                            color_info_entry = color_info.get(hex_color, {})
-                            color_code = color_info_entry.get('code', '?')
-
-                            if hex_color not in logged_colors:
-                                if not color_info_entry:
-                                    print(f"PDF Generation v1 - Hex {hex_color} not found in color_info")
-                                    print(f"PDF Generation v1 - Available keys: {list(color_info.keys())[:5]}")
-                                logged_colors.add(hex_color)
-
-                        # Note: PDF coordinates start from bottom-left
-                        # We need to flip the y-coordinate
-                        local_x = col_idx - start_x
-                        local_y = row_idx - start_y
-
-                        x = margin_left + local_x * bead_size_points
-                        # Flip y: start from top and go down
-                        y = page_height - margin_top - (local_y + 1) * bead_size_points
-
-                        # Draw circle with color
-                        r, g, b = hex_to_rgb_normalized(hex_color)
-                        c.setFillColorRGB(r, g, b)
-                        c.circle(
-                            x + bead_size_points / 2,
-                            y + bead_size_points / 2,
-                            bead_size_points / 2,
-                            fill=1,
-                            stroke=0
-                        )
-
-                        brightness = (r * 299 + g * 587 + b * 114) / 1000
-                        text_color = reportlab_colors.black if brightness > 0.5 else reportlab_colors.white
-                        c.setFillColor(text_color)
-
-                        # Center the text
-                        text = str(color_code)
-                        text_width = c.stringWidth(text, _get_font('bold'), font_size)
-                        text_x = x + (bead_size_points - text_width) / 2
-                        # Adjust y for text baseline
-                        text_y = y + (bead_size_points - font_size) / 2 + font_size * 0.2
-
-                        c.drawString(text_x, text_y, text)
-
-            # Create new page for next board
-            c.showPage()
+        c.setFont(_get_font('bold'), 16)
+        c.drawString(margin_left, page_height - margin_top + 1 * cm, f"Brett {board_label}")
 
-    c.save()
+        c.setFont(_get_font('regular'), 10)
+        c.drawString(
+            margin_left,
+            page_height - margin_top + 0.5 * cm,
+            f"{board_width_beads} × {board_height_beads} perler"
+        )
 
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+        # Place one bead form per cell
+        _place_board_beads(c, board_slice, operators)
 
-    # Optionally save to file
-    if output_path:
-        with open(output_path, 'wb') as f:
-            f.write(pdf_bytes)
+        # Create new page for next board
+        c.showPage()
 
-    return pdf_bytes
+    c.save()
@@ -0,0 +1,186 @@
+"""
+Cache of rendered pattern images.
+
+GET /patterns/{id}/image and /render-grid render the whole grid and encode it
+on every request. Encoded images are cached here under a key built from the
+pattern id, a hash of the grid, the palette version and every render option.
+The same key is used as the HTTP ETag, so a conditional request can be
+answered with 304 before anything is rendered.
+
+Entries live in a bounded in-memory LRU (byte budget RENDER_CACHE_MAX_BYTES)
+and are dropped per pattern when its grid is edited.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from .color_service import get_palette_version
+from .grid_storage import StoredGrid
+
+
+class RenderedImageCache:
+    """
+    LRU cache of encoded images with a size-based byte budget and per-pattern invalidation.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._keys_by_pattern: Dict[str, Set[str]] = {}
+        self._pattern_by_key: Dict[str, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached image for key, or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, pattern_id: str, key: str, data: bytes) -> None:
+        """Store an image rendered for pattern_id under key."""
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = data
+            self._bytes += len(data)
+            self._keys_by_pattern.setdefault(pattern_id, set()).add(key)
+            self._pattern_by_key[key] = pattern_id
+
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_pattern(self, pattern_id: str) -> int:
+        """Drop every image cached for a pattern. Returns the number of entries removed."""
+        with self._lock:
+            keys = list(self._keys_by_pattern.get(pattern_id, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pattern.clear()
+            self._pattern_by_key.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock
+        data = self._entries.pop(key, None)
+        if data is None:
+            return
+        self._bytes -= len(data)
+        pattern_id = self._pattern_by_key.pop(key)
+        keys = self._keys_by_pattern[pattern_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_pattern[pattern_id]
+
+
+# Global cache instance
+RENDER_CACHE = RenderedImageCache(max_bytes=settings.RENDER_CACHE_MAX_BYTES)
+
+
+def compute_grid_digest(grid: StoredGrid, storage_version: int) -> str:
+    """
+    Hash a stored grid.
+
+    Args:
+        grid: pattern_data["grid"] (list grid or encoded v3 grid)
+        storage_version: pattern_data["storage_version"]
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    serialized = json.dumps([storage_version, grid], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def make_render_key(pattern_id: str, grid_digest: str, options: Dict[str, Any]) -> str:
+    """
+    Build the cache key / ETag for a rendered pattern image.
+
+    Args:
+        pattern_id: Pattern ID
+        grid_digest: Result of compute_grid_digest
+        options: Every option that influences the response (bead size, lines, format, ...)
+
+    Returns:
+        Hex SHA-256 key
+    """
+    key_source = json.dumps(
+        {"pattern": str(pattern_id), "grid": grid_digest, "options": options, "palette": get_palette_version()},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def get_or_render(pattern_id: str, key: str, render: Callable[[], bytes]) -> bytes:
+    """
+    Return the cached image for key, rendering and caching it on a miss.
+
+    Args:
+        pattern_id: Pattern ID (for invalidation)
+        key: Result of make_render_key
+        render: Produces the encoded image
+
+    Returns:
+        Encoded image bytes
+    """
+    data = RENDER_CACHE.get(key)
+    if data is None:
+        data = render()
+        RENDER_CACHE.put(str(pattern_id), key, data)
+    return data
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match: Header value (may list several ETags or be "*")
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def invalidate_pattern_images(pattern_id: str) -> None:
+    """Drop every cached rendering of a pattern (call after its grid changes)."""
+    RENDER_CACHE.invalidate_pattern(str(pattern_id))
@@ -492,3 +492,38 @@ class SanityService:
             except Exception as e:
                 logger.error(f"Error fetching products from Sanity: {str(e)}")
                 raise
+
+    async def get_product_skus(self) -> List[Dict[str, Any]]:
+        """
+        Fetch the SKU and database pattern ID of every product created from a pattern.
+
+        Returns:
+            List of dicts with _id, sku, patternId and _createdAt
+        """
+        url = f"https://{self.project_id}.api.sanity.io/v{self.api_version}/data/query/{self.dataset}"
+
+        query = '''*[_type == "products" && defined(sku) && defined(patternId)] | order(_createdAt asc){
+            _id,
+            sku,
+            patternId,
+            _createdAt
+        }'''
+
+        params = {"query": query}
+        headers = {"Authorization": f"Bearer {self.api_token}"}
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            try:
+                response = await client.get(url, params=params, headers=headers)
+                response.raise_for_status()
+                products = response.json().get("result", [])
+
+                logger.info(f"Fetched SKUs of {len(products)} pattern products from Sanity")
+
+                return products
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to fetch product SKUs from Sanity: {e.response.text}")
+                raise Exception(f"Sanity query failed: {e.response.text}")
+            except Exception as e:
+                logger.error(f"Error fetching product SKUs from Sanity: {str(e)}")
+                raise
@@ -0,0 +1,135 @@
+"""
+Script to backfill patterns.sanity_product_sku from Sanity products.
+
+Migration 013 added the column without data, because the SKU of a product
+created from a pattern is only stored on the Sanity product document (with
+the database pattern ID in patternId). This script copies it back so the
+unique index also protects products created before the migration.
+
+If a SKU was used for several patterns, the pattern of the oldest Sanity
+product keeps it; the others are reported and left empty.
+
+Usage:
+    # Dry run (preview changes)
+    python scripts/backfill_pattern_skus.py --dry-run
+
+    # Backfill
+    python scripts/backfill_pattern_skus.py
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.models.pattern import Pattern
+from app.services.sanity_service import SanityService
+
+
+def assign_skus(products: List[Dict]) -> Tuple[Dict[int, str], List[str]]:
+    """
+    Decide which pattern gets which SKU.
+
+    Args:
+        products: Sanity products (sku, patternId) ordered oldest first
+
+    Returns:
+        ({pattern_id: sku}, list of conflict descriptions)
+    """
+    sku_by_pattern: Dict[int, str] = {}
+    pattern_by_sku: Dict[str, int] = {}
+    conflicts = []
+
+    for product in products:
+        sku = product["sku"]
+        try:
+            pattern_id = int(product["patternId"])
+        except (TypeError, ValueError):
+            conflicts.append(f"Product {product.get('_id')}: invalid patternId {product.get('patternId')!r}")
+            continue
+
+        if sku in pattern_by_sku and pattern_by_sku[sku] != pattern_id:
+            conflicts.append(f"SKU {sku}: already assigned to pattern {pattern_by_sku[sku]}, skipping pattern {pattern_id}")
+            continue
+        if pattern_id in sku_by_pattern and sku_by_pattern[pattern_id] != sku:
+            conflicts.append(f"Pattern {pattern_id}: already has SKU {sku_by_pattern[pattern_id]}, skipping {sku}")
+            continue
+
+        pattern_by_sku[sku] = pattern_id
+        sku_by_pattern[pattern_id] = sku
+
+    return sku_by_pattern, conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill patterns.sanity_product_sku from Sanity")
+    parser.add_argument("--dry-run", action="store_true", help="Preview changes without saving")
+
+    args = parser.parse_args()
+
+    print("Fetching pattern products from Sanity...")
+    products = asyncio.run(SanityService().get_product_skus())
+    sku_by_pattern, conflicts = assign_skus(products)
+    print(f"✅ {len(products)} product(s), {len(sku_by_pattern)} pattern(s) with a SKU")
+    print(f"Mode: {'🔍 DRY RUN' if args.dry_run else '🚀 LIVE BACKFILL'}")
+    print("=" * 80)
+
+    db = SessionLocal()
+
+    try:
+        taken = {
+            sku: pattern_id
+            for pattern_id, sku in db.query(Pattern.id, Pattern.sanity_product_sku)
+            .filter(Pattern.sanity_product_sku.isnot(None))
+        }
+
+        updated = 0
+        patterns = db.query(Pattern).filter(Pattern.id.in_(list(sku_by_pattern))).all()
+        for pattern in patterns:
+            sku = sku_by_pattern[pattern.id]
+            if pattern.sanity_product_sku == sku:
+                continue
+            if pattern.sanity_product_sku is not None:
+                conflicts.append(f"Pattern {pattern.id}: has SKU {pattern.sanity_product_sku}, Sanity says {sku}")
+                continue
+            if sku in taken:
+                conflicts.append(f"SKU {sku}: already used by pattern {taken[sku]}, skipping pattern {pattern.id}")
+                continue
+
+            print(f"Pattern {pattern.id}: ➕ {sku}")
+            if not args.dry_run:
+                pattern.sanity_product_sku = sku
+            taken[sku] = pattern.id
+            updated += 1
+
+        missing = set(sku_by_pattern) - {pattern.id for pattern in patterns}
+        for pattern_id in sorted(missing):
+            conflicts.append(f"Pattern {pattern_id}: referenced by Sanity but not in the database")
+
+        if not args.dry_run:
+            db.commit()
+
+        print()
+        print("=" * 80)
+        print(f"{'Would update' if args.dry_run else 'Updated'}: {updated} pattern(s)")
+        if conflicts:
+            print(f"⚠️  {len(conflicts)} conflict(s), left unchanged:")
+            for conflict in conflicts:
+                print(f"   - {conflict}")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
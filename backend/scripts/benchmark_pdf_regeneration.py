@@ -0,0 +1,75 @@
+"""
+Benchmark PDF regeneration after a one-cell grid edit.
+
+Generates a random pattern, then times a full (cold) PDF build against a
+rebuild after changing a single bead, where only the edited board's page
+content is drawn again and the other boards come from the board page cache.
+
+Usage:
+    # 6x6 boards (default)
+    python scripts/benchmark_pdf_regeneration.py
+
+    # 4x4 boards, 5 runs each
+    python scripts/benchmark_pdf_regeneration.py --boards 4 --runs 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.color_service import get_perle_colors
+from app.services.pdf_generator import BOARD_PAGE_CACHE, generate_pattern_pdf
+
+BOARD_SIZE = 29
+
+
+def _generate(grid, colors_used) -> float:
+    """Generate the PDF once and return the elapsed time in milliseconds."""
+    size = len(grid)
+    pattern_data = {"grid": grid, "width": size, "height": size, "storage_version": 2}
+    start = time.perf_counter()
+    generate_pattern_pdf(pattern_data, [dict(c) for c in colors_used])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF regeneration after a one-cell edit")
+    parser.add_argument("--boards", type=int, default=6, help="Boards per side")
+    parser.add_argument("--colors", type=int, default=24, help="Number of colors in the pattern")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (best is reported)")
+
+    args = parser.parse_args()
+
+    codes = [c["code"] for c in get_perle_colors() if c.get("code")][:args.colors]
+    size = args.boards * BOARD_SIZE
+    rng = random.Random(0)
+    grid = [[rng.choice(codes) for _ in range(size)] for _ in range(size)]
+    colors_used = [{"code": code, "name": code, "count": 1} for code in codes]
+
+    _generate(grid, colors_used)  # Warm up fonts, palette and imports
+
+    cold = []
+    for _ in range(args.runs):
+        BOARD_PAGE_CACHE.clear()
+        cold.append(_generate(grid, colors_used))
+
+    edited = []
+    for run in range(args.runs):
+        # Every run edits one cell, so exactly one board misses the cache
+        row, col = rng.randrange(size), rng.randrange(size)
+        grid[row][col] = codes[(codes.index(grid[row][col]) + 1) % len(codes)]
+        edited.append(_generate(grid, colors_used))
+
+    print(f"📄 {args.boards}x{args.boards} boards ({size}x{size} beads, {len(codes)} colors), best of {args.runs}")
+    print(f"   Full build (cold board cache): {min(cold):.0f} ms")
+    print(f"   Rebuild after one-cell edit:   {min(edited):.0f} ms")
+    print(f"   Board page cache: {BOARD_PAGE_CACHE.stats()}")
+
+
+if __name__ == "__main__":
+    main()
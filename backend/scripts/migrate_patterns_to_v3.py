@@ -0,0 +1,125 @@
+"""
+Script to migrate pattern storage from code lists (v2) to compressed index grids (v3).
+
+Rows are streamed from the database with yield_per, so memory use stays flat
+regardless of how many patterns there are, and updates are written and
+committed one batch at a time on a separate session.
+
+Usage:
+    # Dry run (preview changes and size savings)
+    python scripts/migrate_patterns_to_v3.py --dry-run
+
+    # Migrate all v2 patterns
+    python scripts/migrate_patterns_to_v3.py
+
+    # Stream and commit 200 patterns at a time
+    python scripts/migrate_patterns_to_v3.py --batch-size 200
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models.pattern import Pattern
+from app.services.grid_storage import compress_pattern_data
+
+
+def _json_size(value) -> int:
+    """Size of a value serialized as compact JSON."""
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate patterns from code lists (v2) to compressed grids (v3)")
+    parser.add_argument("--dry-run", action="store_true", help="Preview changes without saving")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows fetched and committed per batch")
+
+    args = parser.parse_args()
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+
+    results = {
+        "migrated": 0,
+        "errors": 0,
+        "bytes_before": 0,
+        "bytes_after": 0
+    }
+
+    try:
+        # Only id and pattern_data are loaded, streamed batch_size rows at a time
+        rows = (
+            read_db.query(Pattern.id, Pattern.pattern_data)
+            .filter(Pattern.pattern_data['storage_version'].astext == '2')
+            .order_by(Pattern.id)
+            .yield_per(args.batch_size)
+        )
+
+        print(f"Mode: {'🔍 DRY RUN' if args.dry_run else '🚀 LIVE MIGRATION'}")
+        print("=" * 80)
+        print()
+
+        batch = []
+
+        def flush_batch():
+            if batch and not args.dry_run:
+                write_db.execute(update(Pattern), batch)
+                write_db.commit()
+            print(f"   💾 {results['migrated']} pattern(s) processed")
+            batch.clear()
+
+        for pattern_id, pattern_data in rows:
+            try:
+                compressed = compress_pattern_data(pattern_data)
+                if compressed is pattern_data:
+                    continue
+
+                results["bytes_before"] += _json_size(pattern_data)
+                results["bytes_after"] += _json_size(compressed)
+                results["migrated"] += 1
+                batch.append({"id": pattern_id, "pattern_data": compressed})
+            except Exception as e:
+                results["errors"] += 1
+                print(f"Pattern {pattern_id}: ❌ ERROR - {e}")
+
+            if len(batch) >= args.batch_size:
+                flush_batch()
+
+        flush_batch()
+
+        print()
+        print("=" * 80)
+
+        if args.dry_run:
+            print("⚠️  DRY RUN - No changes saved to database")
+        else:
+            print("✅ Migration committed successfully!")
+
+        print()
+        print("📊 Results Summary:")
+        print(f"   ✅ Migrated: {results['migrated']}")
+        print(f"   ❌ Errors:   {results['errors']}")
+        if results["bytes_before"]:
+            saved = 1 - results["bytes_after"] / results["bytes_before"]
+            print(f"   📦 pattern_data: {results['bytes_before']:,} → {results['bytes_after']:,} bytes ({saved:.0%} smaller)")
+        print()
+
+    except Exception as e:
+        write_db.rollback()
+        print(f"❌ Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        read_db.close()
+        write_db.close()
+
+
+if __name__ == "__main__":
+    main()
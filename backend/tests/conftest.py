@@ -0,0 +1,27 @@
+"""
+Shared pytest configuration.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Don't download/load the background removal model when TestClient runs the app lifespan
+os.environ.setdefault("REMBG_PRELOAD", "false")
+
+
+@pytest.fixture
+def gradient_image(request) -> Image.Image:
+    """
+    Smooth RGB gradient image.
+
+    Size is 64x48 unless set with indirect parametrization:
+        @pytest.mark.parametrize("gradient_image", [(120, 90)], indirect=True)
+    """
+    width, height = getattr(request, "param", (64, 48))
+    x = np.linspace(0, 255, width)
+    y = np.linspace(0, 255, height)
+    xx, yy = np.meshgrid(x, y)
+    return Image.fromarray(np.dstack([xx, yy, 255 - xx]).astype(np.uint8))
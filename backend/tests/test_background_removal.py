@@ -0,0 +1,99 @@
+"""
+Unit tests for background_removal.py
+
+The rembg model is replaced by a fake so the tests need no model download.
+"""
+
+import threading
+import time
+from PIL import Image
+from app.core.config import settings
+from app.services import background_removal
+
+
+class TestBackgroundRemovalSession:
+    """Test suite for the shared rembg session."""
+
+    def setup_method(self):
+        """Setup before each test - start without a session."""
+        background_removal.reset_background_removal()
+
+    def teardown_method(self):
+        """Cleanup after each test - drop the fake session."""
+        background_removal.reset_background_removal()
+
+    def test_session_is_created_once_and_warmed_up(self, monkeypatch):
+        """Test that repeated removals reuse one session created at init."""
+        created = []
+        calls = []
+        monkeypatch.setattr(background_removal, "_create_session", lambda name, threads: created.append(name) or object())
+        monkeypatch.setattr(background_removal, "_remove", lambda image, session: calls.append(session) or image.convert("RGBA"))
+
+        background_removal.init_background_removal(warm_up=True)
+        background_removal.run_background_removal(Image.new("RGB", (8, 8)))
+        background_removal.run_background_removal(Image.new("RGB", (8, 8)))
+
+        assert created == [settings.REMBG_MODEL]
+        assert len(calls) == 3
+        assert calls[0] is calls[1] is calls[2]
+
+    def test_concurrency_is_bounded(self, monkeypatch):
+        """Test that no more than REMBG_MAX_CONCURRENCY inferences run at once."""
+        monkeypatch.setattr(settings, "REMBG_MAX_CONCURRENCY", 2)
+        monkeypatch.setattr(background_removal, "_create_session", lambda name, threads: object())
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_remove(image, session):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return image
+
+        monkeypatch.setattr(background_removal, "_remove", fake_remove)
+
+        threads = [
+            threading.Thread(target=background_removal.run_background_removal, args=(Image.new("RGB", (4, 4)),))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(peak) == 6
+        assert max(peak) <= 2
+
+    def test_reset_during_inference(self, monkeypatch):
+        """Test that a reset while an inference runs does not break it or later calls."""
+        monkeypatch.setattr(background_removal, "_create_session", lambda name, threads: object())
+        started = threading.Event()
+        release = threading.Event()
+        sessions = []
+        results = []
+
+        def fake_remove(image, session):
+            sessions.append(session)
+            if len(sessions) == 1:
+                started.set()
+                release.wait(5)
+            return image
+
+        monkeypatch.setattr(background_removal, "_remove", fake_remove)
+        in_flight = threading.Thread(
+            target=lambda: results.append(background_removal.run_background_removal(Image.new("RGB", (4, 4))))
+        )
+        in_flight.start()
+        assert started.wait(5)
+
+        background_removal.reset_background_removal()
+        results.append(background_removal.run_background_removal(Image.new("RGB", (4, 4))))
+        release.set()
+        in_flight.join()
+
+        assert len(results) == 2
+        assert sessions[0] is not sessions[1]
@@ -7,6 +7,7 @@ for hex codes and color codes.
 
 import pytest
 import json
+import numpy as np
 import tempfile
 import shutil
 from pathlib import Path
@@ -19,6 +20,21 @@ from app.services.color_service import (
     hex_to_rgb,
     add_color_to_palette,
     clear_color_cache,
+    find_closest_color,
+    get_palette_array,
+    match_colors_to_palette,
+    build_color_lookup_table,
+    lookup_palette_indices,
+    get_palette_version,
+    get_palette_lab,
+    rgb_to_lab,
+    delta_e_cie76,
+    delta_e_cie94,
+    delta_e_ciede2000,
+    calculate_color_difference,
+    get_palette_distance_matrix,
+    LUT_AMBIGUOUS,
+    COLOR_METRICS,
     CODE_TO_COLOR_MAP,
     HEX_TO_COLOR_MAP,
     PERLE_COLORS_FILEPATH,
@@ -236,6 +252,167 @@ class TestColorService:
             assert all(c in hex_chars for c in hex_val[1:]), f"Hex {hex_val} contains invalid characters"
 
 
+class TestMatchColorsToPalette:
+    """Test suite for the vectorized palette matcher."""
+
+    def setup_method(self):
+        """Setup before each test - ensure colors are loaded."""
+        get_perle_colors()
+
+    def test_palette_array_matches_colors(self):
+        """Test that the palette array is aligned with the color list."""
+        colors = get_perle_colors()
+        palette = get_palette_array()
+
+        assert palette.shape == (len(colors), 3)
+        for color, row in zip(colors, palette):
+            assert tuple(row) == color["rgb"]
+
+    def test_exact_palette_colors_match_themselves(self):
+        """Test that palette colors map to a color with identical RGB."""
+        colors = get_perle_colors()
+        palette = get_palette_array()
+
+        indices = match_colors_to_palette(palette)
+
+        for color, index in zip(colors, indices):
+            assert colors[index]["rgb"] == color["rgb"]
+
+    def test_matches_find_closest_color(self):
+        """Test that the vectorized matcher agrees with the per-pixel matcher."""
+        colors = get_perle_colors()
+        rng = np.random.default_rng(42)
+        pixels = rng.integers(0, 256, size=(20, 30, 3), dtype=np.uint8)
+
+        indices = match_colors_to_palette(pixels)
+
+        assert indices.shape == (20, 30)
+        for y in range(20):
+            for x in range(30):
+                expected = find_closest_color(tuple(int(v) for v in pixels[y, x]), colors)
+                assert colors[indices[y, x]]["hex"] == expected["hex"]
+
+    def test_rejects_non_rgb_input(self):
+        """Test that input without 3 channels is rejected."""
+        with pytest.raises(ValueError):
+            match_colors_to_palette(np.zeros((4, 4, 4), dtype=np.uint8))
+
+
+class TestColorLookupTable:
+    """Test suite for the precomputed RGB lookup table."""
+
+    def setup_method(self):
+        """Setup before each test - ensure colors are loaded."""
+        get_perle_colors()
+
+    def test_lookup_agrees_with_exact_matcher(self):
+        """Test that table lookups give the same indices as exact matching."""
+        rng = np.random.default_rng(7)
+        pixels = rng.integers(0, 256, size=(200, 300, 3), dtype=np.uint8)
+
+        assert np.array_equal(lookup_palette_indices(pixels), match_colors_to_palette(pixels))
+
+    def test_lookup_handles_palette_colors(self):
+        """Test that palette colors resolve exactly through the table."""
+        palette = get_palette_array()
+
+        assert np.array_equal(lookup_palette_indices(palette), match_colors_to_palette(palette))
+
+    def test_unambiguous_cells_hold_nearest_index(self):
+        """Test that resolved cells agree with exact matching of their corners."""
+        palette = np.array([[0, 0, 0], [255, 255, 255]], dtype=np.int32)
+        lut = build_color_lookup_table(palette, bits=2)
+
+        assert lut.shape == (4, 4, 4)
+        assert lut[0, 0, 0] == 0
+        assert lut[3, 3, 3] == 1
+        assert (lut == LUT_AMBIGUOUS).any()
+
+    def test_palette_version_is_stable(self):
+        """Test that clearing the cache recomputes the same version for the same file."""
+        version = get_palette_version()
+        clear_color_cache()
+
+        assert get_palette_version() == version
+
+
+class TestPerceptualColorMetrics:
+    """Test suite for CIELAB conversion and perceptual color metrics."""
+
+    def setup_method(self):
+        """Setup before each test - ensure colors are loaded."""
+        get_perle_colors()
+
+    def test_rgb_to_lab_reference_values(self):
+        """Test Lab conversion of white, black and pure red."""
+        lab = rgb_to_lab(np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]]))
+
+        assert lab[0] == pytest.approx([100.0, 0.0, 0.0], abs=0.01)
+        assert lab[1] == pytest.approx([0.0, 0.0, 0.0], abs=0.01)
+        assert lab[2] == pytest.approx([53.24, 80.09, 67.20], abs=0.01)
+
+    def test_palette_lab_is_cached(self):
+        """Test that the palette Lab array is cached and aligned with the palette."""
+        assert get_palette_lab() is get_palette_lab()
+        assert np.allclose(get_palette_lab(), rgb_to_lab(get_palette_array()))
+
+    def test_ciede2000_reference_pairs(self):
+        """Test CIEDE2000 against published reference data (Sharma et al. 2005)."""
+        pairs = [
+            ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+            ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+            ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+            ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+        ]
+        lab1 = np.array([p[0] for p in pairs])
+        lab2 = np.array([p[1] for p in pairs])
+        expected = np.array([p[2] for p in pairs])
+
+        assert delta_e_ciede2000(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+
+    def test_cie76_and_cie94_identical_colors(self):
+        """Test that identical colors have zero difference."""
+        lab = np.array([[50.0, 20.0, -30.0]])
+
+        assert delta_e_cie76(lab, lab)[0] == 0
+        assert delta_e_cie94(lab, lab)[0] == 0
+
+    @pytest.mark.parametrize("metric", COLOR_METRICS)
+    def test_vectorized_matcher_agrees_with_find_closest_color(self, metric):
+        """Test that every metric gives the same result vectorized and per pixel."""
+        colors = get_perle_colors()
+        rng = np.random.default_rng(3)
+        pixels = rng.integers(0, 256, size=(60, 3), dtype=np.uint8)
+
+        indices = match_colors_to_palette(pixels, metric=metric)
+
+        for pixel, index in zip(pixels, indices):
+            expected = find_closest_color(tuple(int(v) for v in pixel), colors, metric)
+            assert colors[index]["hex"] == expected["hex"]
+
+    def test_calculate_color_difference_default_is_rgb(self):
+        """Test that the default metric is Euclidean RGB distance."""
+        assert calculate_color_difference((0, 0, 0), (3, 4, 0)) == 5.0
+
+    def test_unknown_metric_rejected(self):
+        """Test that an unknown metric raises ValueError."""
+        with pytest.raises(ValueError):
+            match_colors_to_palette(np.zeros((2, 3), dtype=np.uint8), metric="hsv")
+
+    def test_palette_distance_matrix_is_cached_per_metric(self):
+        """Test that palette-to-palette distances are cached and cleared with the palette."""
+        matrix = get_palette_distance_matrix("ciede2000")
+        palette_size = len(get_palette_array())
+
+        assert matrix.shape == (palette_size, palette_size)
+        assert np.allclose(np.diag(matrix), 0)
+        assert get_palette_distance_matrix("ciede2000") is matrix
+        assert get_palette_distance_matrix("rgb") is not matrix
+
+        clear_color_cache()
+        assert get_palette_distance_matrix("ciede2000") is not matrix
+
+
 class TestAddColorToPalette:
     """Test suite for add_color_to_palette function."""
 
@@ -360,3 +537,11 @@ class TestAddColorToPalette:
 
         assert len(updated_colors) == initial_count + 1
         assert any(c["hex"] == test_hex for c in updated_colors)
+
+    def test_add_color_changes_palette_version(self):
+        """Test that adding a color gives the palette a new version."""
+        initial_version = get_palette_version()
+
+        add_color_to_palette("#ABCABC")
+
+        assert get_palette_version() != initial_version
@@ -0,0 +1,117 @@
+"""
+Unit tests for cpu_pool.py
+
+Tests shared memory image handoff, per-size pattern generation in the pool and
+recovery from a broken pool. The worker functions are called in-process here; the
+pool itself only adds pickling.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services import cpu_pool
+from app.services.cpu_pool import share_image, open_shared_image, generate_patterns_in_cpu_pool
+from app.services.pattern_generator import convert_image_to_patterns_in_memory
+
+
+@pytest.mark.parametrize("gradient_image", [(90, 60)], indirect=True)
+class TestSharedImage:
+    """Test suite for passing images through shared memory."""
+
+    def test_shared_image_round_trip(self, gradient_image):
+        """Test that an image read back from shared memory has identical pixels."""
+        image = gradient_image
+
+        with share_image(image) as ref:
+            restored = open_shared_image(ref)
+
+        assert restored.mode == "RGB"
+        assert restored.size == image.size
+        assert np.array_equal(np.asarray(restored), np.asarray(image))
+
+    def test_pool_generation_matches_direct_generation(self, gradient_image, monkeypatch):
+        """Test that one preprocessing task plus one task per size gives the direct call's patterns."""
+        image = gradient_image
+        board_sizes = [(1, 1), (2, 2), (3, 3)]
+        options = {"use_nearest_neighbor": True, "enhance_contrast": 1.5}
+        calls = []
+
+        async def run_in_process(func, *args, **kwargs):
+            calls.append(func.__name__)
+            return func(*args, **kwargs)
+
+        monkeypatch.setattr(cpu_pool, "run_in_cpu_pool", run_in_process)
+
+        results = asyncio.run(generate_patterns_in_cpu_pool(image, board_sizes, options))
+        expected = convert_image_to_patterns_in_memory(image, board_sizes, **options)
+
+        assert calls == ["preprocess_shared_image"] + ["generate_pattern_from_shared_level"] * 3
+        assert [r[2] for r in results] == [e[2] for e in expected]
+        assert [r[1] for r in results] == [e[1] for e in expected]
+        assert [r[0] for r in results] == [e[0] for e in expected]
+
+
+class TestCpuPoolRecovery:
+    """Test suite for replacing a pool whose worker died."""
+
+    def test_call_after_worker_death_succeeds(self, monkeypatch):
+        """Test that run_in_cpu_pool starts a fresh pool once a worker was killed."""
+        monkeypatch.setattr(settings, "CPU_WORKERS", 1)
+        monkeypatch.setattr(cpu_pool, "CPU_EXECUTOR", None)
+        try:
+            broken = cpu_pool.get_cpu_executor()
+            # Kill the worker the way the OOM killer would
+            with pytest.raises(BrokenProcessPool):
+                broken.submit(os._exit, 1).result(timeout=60)
+
+            assert asyncio.run(cpu_pool.run_in_cpu_pool(pow, 2, 10)) == 1024
+            assert cpu_pool.CPU_EXECUTOR is not broken
+        finally:
+            cpu_pool.shutdown_cpu_executor()
+
+    def test_concurrent_first_calls_create_one_pdf_pool(self, monkeypatch):
+        """Test that threads racing on the lazy create share a single PDF pool."""
+        created = []
+
+        class SlowPool:
+            def __init__(self, **kwargs):
+                time.sleep(0.05)  # Widen the race window
+                created.append(self)
+
+        monkeypatch.setattr(settings, "PDF_BOARD_WORKERS", 2)
+        monkeypatch.setattr(cpu_pool, "PDF_EXECUTOR", None)
+        monkeypatch.setattr(cpu_pool, "ProcessPoolExecutor", SlowPool)
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(cpu_pool.get_pdf_executor())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
+
+
+class TestCpuWorkerCount:
+    """Test suite for sizing the pool by the container's CPU share."""
+
+    def test_cgroup_quota_caps_worker_count(self, monkeypatch):
+        """Test that the cgroup CPU quota limits the default worker count."""
+        monkeypatch.setattr(settings, "CPU_WORKERS", 0)
+        monkeypatch.setattr(cpu_pool.os, "sched_getaffinity", lambda pid: set(range(32)), raising=False)
+        monkeypatch.setattr(cpu_pool, "_cgroup_cpu_limit", lambda: 2)
+
+        assert cpu_pool.get_cpu_worker_count() == 2
+
+    def test_explicit_setting_wins(self, monkeypatch):
+        """Test that CPU_WORKERS overrides detection."""
+        monkeypatch.setattr(settings, "CPU_WORKERS", 3)
+        monkeypatch.setattr(cpu_pool, "_cgroup_cpu_limit", lambda: 1)
+
+        assert cpu_pool.get_cpu_worker_count() == 3
@@ -0,0 +1,80 @@
+"""
+Unit tests for grid_storage.py
+
+Tests the compressed v3 grid format and its v2 compatibility helpers.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from app.services.grid_storage import (
+    encode_grid,
+    decode_grid,
+    decode_index_grid,
+    get_grid_shape,
+    compress_pattern_data,
+    expand_pattern_data,
+)
+from app.services.pattern_generator import convert_image_to_pattern_in_memory, render_grid_to_image
+from app.services.pdf_generator import generate_pattern_pdf
+
+
+@pytest.mark.parametrize("gradient_image", [(300, 200)], indirect=True)
+class TestGridStorage:
+    """Test suite for v3 grid encoding."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, gradient_image):
+        """Setup before each test - generate a v2 pattern."""
+        _, self.colors_used, self.pattern_data = convert_image_to_pattern_in_memory(gradient_image, 4, 4)
+        self.grid = self.pattern_data["grid"]
+
+    def test_encode_decode_round_trip(self):
+        """Test that an encoded grid decodes to the original code grid."""
+        encoded = encode_grid(self.grid)
+
+        assert decode_grid(encoded, 3) == (self.grid, 2)
+        assert get_grid_shape(encoded, 3) == get_grid_shape(self.grid, 2) == (len(self.grid), len(self.grid[0]))
+
+    def test_v3_is_smaller_than_v2(self):
+        """Test that the encoded grid is much smaller than the JSON code grid."""
+        compressed = compress_pattern_data(self.pattern_data)
+
+        assert compressed["storage_version"] == 3
+        assert len(json.dumps(compressed)) * 4 < len(json.dumps(self.pattern_data))
+
+    def test_compress_and_expand(self):
+        """Test that compress/expand only touch the grid and leave other versions alone."""
+        compressed = compress_pattern_data(self.pattern_data)
+
+        assert expand_pattern_data(compressed) == self.pattern_data
+        assert expand_pattern_data(self.pattern_data) is self.pattern_data
+        assert compress_pattern_data(compressed) is compressed
+
+        v1 = {"grid": [["#FFFFFF"]], "storage_version": 1}
+        assert compress_pattern_data(v1) is v1
+
+    def test_unknown_encoding_raises(self):
+        """Test that an unsupported encoding is rejected."""
+        encoded = {**encode_grid(self.grid), "encoding": "rle"}
+
+        with pytest.raises(ValueError):
+            decode_index_grid(encoded)
+
+    def test_render_v3_matches_v2(self):
+        """Test that a v3 grid renders the same image as its v2 grid."""
+        encoded = encode_grid(self.grid)
+
+        v2_image = render_grid_to_image(self.grid, bead_size=4, storage_version=2, board_lines=True)
+        v3_image = render_grid_to_image(encoded, bead_size=4, storage_version=3, board_lines=True)
+
+        assert np.array_equal(np.asarray(v2_image), np.asarray(v3_image))
+
+    def test_pdf_accepts_v3(self):
+        """Test that a PDF can be generated from v3 pattern data."""
+        compressed = compress_pattern_data(self.pattern_data)
+
+        pdf = generate_pattern_pdf(compressed, [dict(c) for c in self.colors_used])
+
+        assert pdf.startswith(b"%PDF")
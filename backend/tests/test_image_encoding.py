@@ -0,0 +1,95 @@
+"""
+Unit tests for image_encoding.py
+
+Tests that pattern images are encoded losslessly and more compactly than a
+plain RGB PNG.
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from app.services.color_service import get_perle_colors
+from app.services.image_encoding import encode_pattern_image, pattern_image_to_data_uri
+from app.services.pattern_generator import render_pattern_image
+
+
+def _pattern_image(color_count: int, size: int = 58, scale: int = 10) -> Image.Image:
+    """Render a random pattern using color_count perle colors."""
+    rng = np.random.default_rng(0)
+    palette_rgb = np.array([c["rgb"] for c in get_perle_colors()[:color_count]], dtype=np.uint8)
+    index_grid = rng.integers(0, color_count, (size, size))
+    return render_pattern_image(index_grid, palette_rgb, scale=scale, grid_lines=True, board_size=29)
+
+
+def _decode(data: bytes) -> Image.Image:
+    """Decode image bytes."""
+    return Image.open(io.BytesIO(data))
+
+
+class TestEncodePatternImage:
+    """Test suite for encode_pattern_image."""
+
+    @pytest.mark.parametrize("color_count", [6, 40])
+    def test_palette_png_is_lossless(self, color_count):
+        """Test that the palette PNG decodes to exactly the rendered pixels."""
+        image = _pattern_image(color_count)
+
+        decoded = _decode(encode_pattern_image(image))
+
+        assert decoded.format == "PNG"
+        assert decoded.mode == "P"
+        assert np.array_equal(np.asarray(decoded.convert("RGB")), np.asarray(image))
+
+    def test_near_identical_colors_round_trip(self):
+        """Test that colors differing by one step in a single channel are never merged."""
+        rng = np.random.default_rng(1)
+        base = rng.integers(1, 255, (64, 3))
+        offsets = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]])
+        palette_rgb = (base[:, None, :] + offsets[None, :, :]).reshape(-1, 3).astype(np.uint8)
+        image = Image.fromarray(palette_rgb[rng.integers(0, len(palette_rgb), (80, 80))])
+
+        decoded = _decode(encode_pattern_image(image))
+
+        assert decoded.mode == "P"
+        assert np.array_equal(np.asarray(decoded.convert("RGB")), np.asarray(image))
+
+    def test_small_palette_uses_4_bits(self):
+        """Test that up to 16 colors are written with a 4-bit palette."""
+        data = encode_pattern_image(_pattern_image(6))
+
+        assert data[24] == 4  # IHDR bit depth
+
+    def test_palette_png_is_smaller_than_rgb_png(self):
+        """Test that the palette PNG beats Pillow's default RGB PNG."""
+        image = _pattern_image(40)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+
+        assert len(encode_pattern_image(image)) < len(buffer.getvalue())
+
+    def test_many_colors_fall_back_to_rgb_png(self):
+        """Test that images with more than 256 colors are still encoded losslessly."""
+        rng = np.random.default_rng(0)
+        image = Image.fromarray(rng.integers(0, 256, (40, 40, 3), dtype=np.uint8))
+
+        decoded = _decode(encode_pattern_image(image))
+
+        assert decoded.mode == "RGB"
+        assert np.array_equal(np.asarray(decoded), np.asarray(image))
+
+    def test_webp_is_lossless(self):
+        """Test that WebP output is lossless and gets the right data URI."""
+        image = _pattern_image(40)
+
+        decoded = _decode(encode_pattern_image(image, "webp"))
+
+        assert decoded.format == "WEBP"
+        assert np.array_equal(np.asarray(decoded.convert("RGB")), np.asarray(image))
+        assert pattern_image_to_data_uri(image, "webp").startswith("data:image/webp;base64,")
+
+    def test_unknown_format_raises(self):
+        """Test that an unsupported format raises ValueError."""
+        with pytest.raises(ValueError):
+            encode_pattern_image(_pattern_image(6), "gif")
@@ -0,0 +1,97 @@
+"""
+Unit tests for image_preprocessor.py
+
+Tests the reduced-scale upload decoding and the working-resolution stage
+that runs before the expensive filters.
+"""
+
+import io
+import numpy as np
+from PIL import Image
+from app.services.image_preprocessor import (
+    downsample_to_working_resolution,
+    enhanced_preprocess_image,
+    basic_preprocess_image,
+    WORKING_RESOLUTION_OVERSAMPLE,
+    probe_image_size,
+    decode_image_for_pattern,
+)
+
+
+def _noise_image(width: int, height: int) -> Image.Image:
+    """Create a random RGB image."""
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def _encode(image: Image.Image, format: str) -> bytes:
+    """Encode an image to bytes in the given format."""
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+class TestUploadDecoding:
+    """Test suite for decoding uploads at reduced scale."""
+
+    def test_probe_reads_size_without_decoding(self):
+        """Test that the size is read from the header, even of a truncated file."""
+        data = _encode(_noise_image(1600, 1200), "JPEG")
+
+        assert probe_image_size(data[:2048]) == (1600, 1200)
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        """Test that a large JPEG is DCT-scaled but keeps enough pixels per bead."""
+        data = _encode(_noise_image(3200, 2400), "JPEG")
+
+        image = decode_image_for_pattern(data, (58, 58))
+
+        assert image.mode == "RGB"
+        assert image.width < 3200
+        assert image.width >= 58 * WORKING_RESOLUTION_OVERSAMPLE
+        assert image.height >= 43 * WORKING_RESOLUTION_OVERSAMPLE
+
+    def test_png_is_reduced_after_decoding(self):
+        """Test that non-JPEG formats are converted to RGB and reduced."""
+        data = _encode(_noise_image(1600, 1200).convert("RGBA"), "PNG")
+
+        image = decode_image_for_pattern(data, (58, 58))
+
+        assert image.mode == "RGB"
+        assert image.size == downsample_to_working_resolution(_noise_image(1600, 1200), (58, 43)).size
+
+    def test_small_upload_is_decoded_at_full_size(self):
+        """Test that an image smaller than the working resolution is left alone."""
+        data = _encode(_noise_image(200, 150), "JPEG")
+
+        assert decode_image_for_pattern(data, (116, 116)).size == (200, 150)
+
+
+class TestWorkingResolution:
+    """Test suite for downsampling before filtering."""
+
+    def test_downsample_keeps_oversample_pixels_per_bead(self):
+        """Test that the working image is reduced but never below the oversampled target."""
+        image = _noise_image(4000, 3000)
+
+        working = downsample_to_working_resolution(image, (174, 130))
+
+        assert working.width < image.width
+        assert working.width >= 174 * WORKING_RESOLUTION_OVERSAMPLE
+        assert working.height >= 130 * WORKING_RESOLUTION_OVERSAMPLE
+
+    def test_small_image_is_not_downsampled(self):
+        """Test that an image already near the target size is returned unchanged."""
+        image = _noise_image(300, 200)
+
+        assert downsample_to_working_resolution(image, (58, 38)) is image
+
+    def test_preprocessing_runs_at_working_resolution(self):
+        """Test that both preprocessing paths return the working-resolution image."""
+        image = _noise_image(2400, 1800)
+
+        enhanced = enhanced_preprocess_image(image, simplification_method="mean_shift", working_size=(58, 43))
+        basic = basic_preprocess_image(image, working_size=(58, 43))
+
+        assert enhanced.size == basic.size == downsample_to_working_resolution(image, (58, 43)).size
+        assert enhanced.mode == basic.mode == "RGB"
@@ -0,0 +1,96 @@
+"""
+Import-time checks for app.main
+
+Workers that only serve orders or checkout should start fast. Heavy
+dependencies (rembg/onnxruntime, OpenCV, ReportLab's PDF canvas and fonts,
+replicate) must load on first use, not when the app is imported, and the
+optional model preload must not hold up startup.
+"""
+
+import asyncio
+import subprocess
+import threading
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that must not be imported by `import app.main`
+LAZY_MODULES = (
+    "rembg",
+    "onnxruntime",
+    "cv2",
+    "replicate",
+    "reportlab.pdfgen.canvas",
+    "reportlab.pdfbase.ttfonts",
+)
+
+def _profile_app_import():
+    """Import app.main in a fresh interpreter and return {module: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+class TestImportTime:
+    """Test suite guarding application startup cost."""
+
+    @classmethod
+    def setup_class(cls):
+        """Profile the import once for the whole class."""
+        cls.timings = _profile_app_import()
+
+    def test_app_main_imports(self):
+        """Test that the profiled interpreter actually imported app.main."""
+        assert "app.main" in self.timings
+
+    def test_heavy_modules_load_lazily(self):
+        """Test that heavy dependencies are not imported at startup."""
+        eagerly_imported = [name for name in LAZY_MODULES if name in self.timings]
+
+        assert eagerly_imported == []
+
+
+class TestStartup:
+    """Test suite for the app lifespan."""
+
+    def test_model_preload_does_not_block_startup(self, monkeypatch):
+        """Test that the app starts serving while the background removal warm-up still runs."""
+        from app import main
+        from app.core.config import settings
+        from app.services import background_removal
+
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_init(warm_up=True):
+            started.set()
+            release.wait(timeout=30)
+
+        monkeypatch.setattr(settings, "REMBG_PRELOAD", True)
+        monkeypatch.setattr(main, "run_migrations", lambda: None)
+        monkeypatch.setattr(main, "run_pattern_migration", lambda: None)
+        monkeypatch.setattr(background_removal, "init_background_removal", slow_init)
+
+        async def start_app():
+            async with main.lifespan(main.app):
+                await asyncio.to_thread(started.wait, 30)
+                serving_during_warm_up = not release.is_set()
+                release.set()
+            return serving_during_warm_up
+
+        assert asyncio.run(start_app())
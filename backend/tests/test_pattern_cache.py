@@ -0,0 +1,140 @@
+"""
+Unit tests for pattern_cache.py
+
+Tests the byte-bounded LRU, the on-disk tier, key construction and the cached
+generator wrapper.
+"""
+
+import json
+import os
+
+import numpy as np
+from PIL import Image
+from app.services import disk_cache, pattern_cache
+from app.services.pattern_cache import (
+    PatternResultCache,
+    compute_image_digest,
+    make_pattern_cache_key,
+    convert_image_to_pattern_cached,
+)
+
+
+def _result(size: int = 10):
+    """Build a small fake (pattern_base64, colors_used, pattern_data) tuple."""
+    return "data:image/png;base64," + "A" * size, [{"code": "01", "count": 4}], {"grid": [["01", "01"], ["01", "01"]]}
+
+
+class TestPatternResultCache:
+    """Test suite for the LRU cache itself."""
+
+    def test_round_trip_and_counters(self):
+        """Test that a stored result comes back equal and counters are updated."""
+        cache = PatternResultCache(max_bytes=10_000)
+
+        assert cache.get("a") is None
+        cache.put("a", _result())
+        assert cache.get("a") == _result()
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_returns_independent_copies(self):
+        """Test that mutating a returned result does not change the cached entry."""
+        cache = PatternResultCache(max_bytes=10_000)
+        cache.put("a", _result())
+
+        cache.get("a")[2]["grid"][0][0] = "99"
+
+        assert cache.get("a") == _result()
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        """Test that the least recently used entry is evicted when over budget."""
+        entry_bytes = len(b'["' + _result(100)[0].encode() + b'"]') + 100
+        cache = PatternResultCache(max_bytes=entry_bytes * 2)
+
+        cache.put("a", _result(100))
+        cache.put("b", _result(100))
+        cache.get("a")
+        cache.put("c", _result(100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_disk_tier_survives_memory_clear(self, tmp_path):
+        """Test that entries are read back from disk after the memory tier is cleared."""
+        cache = PatternResultCache(max_bytes=10_000, disk_dir=str(tmp_path))
+        cache.put("abcdef", _result())
+        cache.clear()
+
+        assert cache.get("abcdef") == _result()
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_disk_tier_evicts_least_recently_used(self, tmp_path):
+        """Test that the on-disk tier stays within its byte budget, oldest files first."""
+        entry_bytes = len(json.dumps(list(_result(100)), separators=(",", ":")))
+        cache = PatternResultCache(max_bytes=10_000, disk_dir=str(tmp_path), disk_max_bytes=entry_bytes * 2)
+        cache.put("aa01", _result(100))
+        cache.put("bb02", _result(100))
+
+        # Make "aa01" the least recently used file
+        os.utime(cache._disk_path("aa01"), (1, 1))
+        cache.put("cc03", _result(100))
+        cache.clear()
+
+        assert cache.get("aa01") is None
+        assert cache.get("bb02") == _result(100)
+        assert cache.get("cc03") == _result(100)
+        assert sum(p.stat().st_size for p in tmp_path.glob("*/*.json")) <= entry_bytes * 2
+
+
+    def test_disk_writes_scan_directory_only_when_over_budget(self, tmp_path, monkeypatch):
+        """Test that the disk tier keeps a running total instead of listing the directory per write."""
+        entry_bytes = len(json.dumps(list(_result(100)), separators=(",", ":")))
+        cache = PatternResultCache(max_bytes=10_000, disk_dir=str(tmp_path), disk_max_bytes=entry_bytes * 3)
+        scans = []
+        original_list = disk_cache.list_cache_files
+        monkeypatch.setattr(disk_cache, "list_cache_files", lambda *args: scans.append(args) or original_list(*args))
+
+        for key in ["aa01", "bb02", "cc03"]:
+            cache.put(key, _result(100))
+        assert len(scans) == 1  # Seeds the running total
+
+        cache.put("dd04", _result(100))
+        assert len(scans) == 2  # Over budget: rescan and evict
+        assert sum(p.stat().st_size for p in tmp_path.glob("*/*.json")) <= entry_bytes * 3
+
+
+class TestPatternCacheKeys:
+    """Test suite for content-addressed keys and the cached generator."""
+
+    def test_digest_depends_on_pixels_only(self):
+        """Test that equal pixels hash equal and a changed pixel does not."""
+        pixels = np.zeros((8, 8, 3), dtype=np.uint8)
+        changed = pixels.copy()
+        changed[0, 0] = 1
+
+        assert compute_image_digest(Image.fromarray(pixels)) == compute_image_digest(Image.fromarray(pixels.copy()))
+        assert compute_image_digest(Image.fromarray(pixels)) != compute_image_digest(Image.fromarray(changed))
+
+    def test_key_includes_params_and_palette_version(self, monkeypatch):
+        """Test that parameters and the palette version both change the key."""
+        key = make_pattern_cache_key("digest", {"boards": 2})
+
+        assert make_pattern_cache_key("digest", {"boards": 2}) == key
+        assert make_pattern_cache_key("digest", {"boards": 3}) != key
+
+        monkeypatch.setattr(pattern_cache, "get_palette_version", lambda: "other-palette")
+        assert make_pattern_cache_key("digest", {"boards": 2}) != key
+
+    def test_cached_generator_hits_on_repeat(self, monkeypatch):
+        """Test that a repeated generation is served from the cache."""
+        monkeypatch.setattr(pattern_cache, "PATTERN_RESULT_CACHE", PatternResultCache(max_bytes=10_000_000))
+        image = Image.fromarray(np.full((40, 40, 3), 120, dtype=np.uint8))
+
+        first = convert_image_to_pattern_cached(image, boards_width=1, boards_height=1)
+        second = convert_image_to_pattern_cached(image, boards_width=1, boards_height=1)
+
+        assert first[2] == second[2]
+        assert pattern_cache.PATTERN_RESULT_CACHE.stats()["hits"] == 1
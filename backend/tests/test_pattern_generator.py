@@ -0,0 +1,215 @@
+"""
+Unit tests for pattern_generator.py
+
+Tests the palette index grid pipeline: quantization, rare color filtering,
+counting, code conversion and rendering.
+"""
+
+import pytest
+import numpy as np
+from app.services.color_service import get_perle_colors, hex_to_code, lookup_palette_indices
+from app.services.pattern_generator import (
+    quantize_to_palette_indices,
+    quantize_to_perle_colors,
+    count_palette_indices,
+    filter_rare_colors,
+    filter_rare_palette_indices,
+    build_pattern_outputs,
+    render_index_grid,
+    render_pattern_image,
+    render_grid_to_image,
+    BOARD_LINE_COLOR,
+    GRID_LINE_COLOR,
+    create_pattern_image,
+    convert_image_to_pattern_in_memory,
+    convert_image_to_patterns_in_memory,
+    build_image_pyramid,
+    pack_code_grid,
+    unpack_code_grid,
+)
+
+
+class TestIndexGridPipeline:
+    """Test suite for the palette index grid helpers."""
+
+    def setup_method(self):
+        """Setup before each test - ensure colors are loaded."""
+        self.bead_colors = get_perle_colors()
+
+    def test_quantize_indices_match_quantized_rgb(self, gradient_image):
+        """Test that quantized indices equal re-matching the quantized RGB image."""
+        image = gradient_image
+
+        index_grid = quantize_to_palette_indices(image, self.bead_colors)
+        quantized_rgb = np.asarray(quantize_to_perle_colors(image, self.bead_colors))
+
+        assert index_grid.shape == (48, 64)
+        assert index_grid.max() < len(self.bead_colors)
+        assert np.array_equal(index_grid, lookup_palette_indices(quantized_rgb))
+
+    def test_count_palette_indices_orders_by_first_appearance(self):
+        """Test that counts follow first appearance in row-major order."""
+        grid = np.array([[3, 3, 1], [0, 1, 3]], dtype=np.uint8)
+
+        counts = count_palette_indices(grid)
+
+        assert list(counts.items()) == [(3, 3), (1, 2), (0, 1)]
+
+    def test_filter_rare_indices_matches_hex_filter(self):
+        """Test that index-based filtering gives the same result as the hex-based filter."""
+        rng = np.random.default_rng(5)
+        # A few dominant colors plus scattered rare ones
+        index_grid = rng.choice([0, 5, 10], size=(40, 40)).astype(np.uint8)
+        index_grid[rng.integers(0, 40, 6), rng.integers(0, 40, 6)] = 20
+
+        hex_grid = [[self.bead_colors[i]["hex"] for i in row] for row in index_grid.tolist()]
+        hex_counts = {}
+        for row in hex_grid:
+            for hex_color in row:
+                hex_counts[hex_color] = hex_counts.get(hex_color, 0) + 1
+
+        expected_grid, expected_counts = filter_rare_colors(hex_grid, hex_counts, self.bead_colors, 0.01)
+        filtered_grid, filtered_counts = filter_rare_palette_indices(index_grid, self.bead_colors, 0.01)
+
+        assert [[self.bead_colors[i]["hex"] for i in row] for row in filtered_grid.tolist()] == expected_grid
+        assert {self.bead_colors[i]["hex"]: c for i, c in filtered_counts.items()} == expected_counts
+        assert 20 not in filtered_counts
+
+    def test_build_pattern_outputs(self):
+        """Test conversion of an index grid to codes and colors_used."""
+        grid = np.array([[0, 1], [1, 1]], dtype=np.uint8)
+        counts = count_palette_indices(grid)
+
+        code_grid, colors_used, unknown_colors = build_pattern_outputs(grid, counts, self.bead_colors)
+
+        code0 = hex_to_code(self.bead_colors[0]["hex"])
+        code1 = hex_to_code(self.bead_colors[1]["hex"])
+        assert code_grid == [[code0, code1], [code1, code1]]
+        assert [c["count"] for c in colors_used] == [1, 3]
+        assert unknown_colors == {}
+
+    def test_render_index_grid_matches_hex_renderer(self):
+        """Test that rendering from indices gives the same pixels as the hex renderer."""
+        grid = np.array([[0, 1, 2], [3, 4, 5]], dtype=np.uint8)
+        hex_grid = [[self.bead_colors[i]["hex"] for i in row] for row in grid.tolist()]
+
+        fast = render_index_grid(grid, self.bead_colors, scale=4)
+        reference = create_pattern_image(hex_grid, scale=4)
+
+        assert fast.size == (12, 8)
+        assert np.array_equal(np.asarray(fast), np.asarray(reference))
+
+    def test_render_code_grid_matches_index_renderer(self):
+        """Test that a stored v2 code grid renders like its index grid, unknown codes as white."""
+        grid = np.array([[0, 1, 2], [3, 4, 5]], dtype=np.uint8)
+        code_grid = [[self.bead_colors[i]["code"] for i in row] for row in grid.tolist()]
+        code_grid[1][2] = "not-a-code"
+
+        image = np.asarray(render_grid_to_image(code_grid, bead_size=5, storage_version=2))
+        expected = np.asarray(render_index_grid(grid, self.bead_colors, scale=5)).copy()
+        expected[5:, 10:] = 255
+
+        assert np.array_equal(image, expected)
+
+    def test_render_grid_and_board_lines(self):
+        """Test that grid lines sit on bead boundaries and board separators on board boundaries."""
+        index_grid = np.zeros((6, 6), dtype=np.uint8)
+        palette_rgb = np.array([[10, 20, 30]], dtype=np.uint8)
+
+        pixels = np.asarray(render_pattern_image(index_grid, palette_rgb, scale=4, grid_lines=True, board_size=3))
+
+        assert pixels.shape == (24, 24, 3)
+        assert tuple(pixels[1, 1]) == (10, 20, 30)
+        assert tuple(pixels[4, 1]) == GRID_LINE_COLOR
+        assert tuple(pixels[1, 4]) == GRID_LINE_COLOR
+        assert tuple(pixels[11, 1]) == BOARD_LINE_COLOR
+        assert tuple(pixels[12, 1]) == BOARD_LINE_COLOR
+        assert tuple(pixels[1, 12]) == BOARD_LINE_COLOR
+
+    @pytest.mark.parametrize("gradient_image", [(120, 90)], indirect=True)
+    def test_convert_image_returns_code_grid(self, gradient_image):
+        """Test that the in-memory generator returns a v2 code grid."""
+        pattern_base64, colors_used, pattern_data = convert_image_to_pattern_in_memory(
+            gradient_image,
+            boards_width=2,
+            boards_height=2,
+        )
+
+        assert pattern_base64.startswith("data:image/png;base64,")
+        assert pattern_data["storage_version"] == 2
+        assert len(pattern_data["grid"]) == pattern_data["height"]
+        assert len(pattern_data["grid"][0]) == pattern_data["width"]
+        assert sum(c["count"] for c in colors_used) == pattern_data["width"] * pattern_data["height"]
+        valid_codes = {bc["code"] for bc in get_perle_colors()}
+        assert all(code in valid_codes for row in pattern_data["grid"] for code in row)
+
+    @pytest.mark.parametrize("color_metric", ["rgb", "cie76", "cie94", "ciede2000"])
+    def test_vectorized_filter_matches_reference_mode(self, color_metric):
+        """Test that the vectorized rare color filter matches the per-pixel reference."""
+        rng = np.random.default_rng(11)
+        index_grid = rng.choice([2, 7, 12, 30], size=(50, 60)).astype(np.uint8)
+        for rare_index in (1, 16, 25, 40):
+            index_grid[rng.integers(0, 50, 4), rng.integers(0, 60, 4)] = rare_index
+
+        fast_grid, fast_counts = filter_rare_palette_indices(
+            index_grid, self.bead_colors, 0.01, color_metric
+        )
+        reference_grid, reference_counts = filter_rare_palette_indices(
+            index_grid, self.bead_colors, 0.01, color_metric, mode="reference"
+        )
+
+        assert np.array_equal(fast_grid, reference_grid)
+        assert list(fast_counts.items()) == list(reference_counts.items())
+
+    def test_filter_rejects_unknown_mode(self):
+        """Test that an unknown filter mode raises ValueError."""
+        grid = np.zeros((2, 2), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            filter_rare_palette_indices(grid, self.bead_colors, 0.01, mode="fast")
+
+    def test_pack_code_grid_round_trip(self, gradient_image):
+        """Test that a packed code grid unpacks to the original grid."""
+        _, _, pattern_data = convert_image_to_pattern_in_memory(gradient_image, 2, 2)
+
+        codes, index_grid = pack_code_grid(pattern_data["grid"])
+
+        assert index_grid.dtype == np.uint8
+        assert index_grid.shape == (pattern_data["height"], pattern_data["width"])
+        assert codes == sorted(set(code for row in pattern_data["grid"] for code in row))
+        assert unpack_code_grid(codes, index_grid) == pattern_data["grid"]
+
+
+class TestMultiSizePipeline:
+    """Test suite for generating several sizes from one preprocessed image."""
+
+    @pytest.mark.parametrize("gradient_image", [(1000, 800)], indirect=True)
+    def test_pyramid_keeps_oversampled_levels(self, gradient_image):
+        """Test that pyramid levels halve until the smallest target would be undersampled."""
+        levels = build_image_pyramid(gradient_image, min_size=(58, 46), oversample=4)
+
+        assert [level.size for level in levels] == [(1000, 800), (500, 400), (250, 200)]
+
+    @pytest.mark.parametrize("gradient_image", [(900, 600)], indirect=True)
+    def test_sizes_match_single_size_dimensions(self, gradient_image):
+        """Test that each size has the same dimensions as a separate single-size run."""
+        image = gradient_image
+        board_sizes = [(2, 2), (4, 4), (6, 6)]
+
+        results = convert_image_to_patterns_in_memory(image, board_sizes)
+
+        assert len(results) == 3
+        for (boards_width, boards_height), (_, colors_used, pattern_data) in zip(board_sizes, results):
+            _, _, expected = convert_image_to_pattern_in_memory(image, boards_width, boards_height)
+            assert (pattern_data["width"], pattern_data["height"]) == (expected["width"], expected["height"])
+            assert sum(c["count"] for c in colors_used) == pattern_data["width"] * pattern_data["height"]
+
+    @pytest.mark.parametrize("gradient_image", [(120, 90)], indirect=True)
+    def test_unreduced_source_matches_single_size(self, gradient_image):
+        """Test that sizes sampled from the full-resolution level equal single-size output."""
+        image = gradient_image
+
+        results = convert_image_to_patterns_in_memory(image, [(1, 1), (2, 2)])
+
+        for (boards_width, boards_height), result in zip([(1, 1), (2, 2)], results):
+            assert result == convert_image_to_pattern_in_memory(image, boards_width, boards_height)
@@ -0,0 +1,129 @@
+"""
+Unit tests for pattern API helpers.
+
+Tests that the multipart/mixed generate-three-sizes body carries the same
+patterns as the JSON response, the admin pattern list cursor, and that
+unreadable uploads are rejected with 400.
+"""
+
+import asyncio
+import base64
+import io
+import json
+from datetime import datetime, timezone
+from email import message_from_bytes
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from app.api.patterns import PatternSizeResult, build_three_sizes_multipart, upload_image
+from app.services.pattern_generator import convert_image_to_patterns_in_memory, unpack_code_grid
+from app.services.pattern_service import encode_pattern_cursor, decode_pattern_cursor
+
+
+@pytest.mark.parametrize("gradient_image", [(120, 90)], indirect=True)
+class TestThreeSizesMultipart:
+    """Test suite for build_three_sizes_multipart."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, gradient_image):
+        """Setup before each test - generate two pattern sizes."""
+        self.results = [
+            PatternSizeResult(
+                size=size,
+                boardsWidth=pattern_data["boards_width"],
+                boardsHeight=pattern_data["boards_height"],
+                patternBase64=pattern_base64,
+                colorsUsed=colors_used,
+                patternData=pattern_data,
+                beadCount=pattern_data["width"] * pattern_data["height"]
+            )
+            for size, (pattern_base64, colors_used, pattern_data) in zip(
+                ["small", "large"],
+                convert_image_to_patterns_in_memory(gradient_image, [(1, 1), (2, 2)])
+            )
+        ]
+
+    def _parse(self):
+        """Split the multipart body into {Content-ID: payload}."""
+        response = build_three_sizes_multipart(self.results)
+        message = message_from_bytes(
+            f"Content-Type: {response.headers['content-type']}\r\n\r\n".encode("ascii") + response.body
+        )
+        return {part["Content-ID"].strip("<>"): part.get_payload(decode=True) for part in message.get_payload()}
+
+    def test_multipart_round_trip(self):
+        """Test that PNGs and packed grids decode to the JSON response values."""
+        parts = self._parse()
+        manifest = json.loads(parts["manifest"])
+
+        assert [p["size"] for p in manifest["patterns"]] == ["small", "large"]
+        for entry, result in zip(manifest["patterns"], self.results):
+            encoding = entry["patternData"].pop("grid_encoding")
+            index_grid = np.frombuffer(parts[entry["grid"]], dtype=encoding["dtype"]).reshape(encoding["shape"])
+
+            assert unpack_code_grid(encoding["codes"], index_grid) == result.patternData["grid"]
+            assert parts[entry["image"]] == base64.b64decode(result.patternBase64.split(",", 1)[1])
+            assert entry["patternData"] == {k: v for k, v in result.patternData.items() if k != "grid"}
+            assert entry["colorsUsed"] == result.colorsUsed
+
+    def test_multipart_is_smaller_than_json(self):
+        """Test that the binary body is smaller than the JSON response."""
+        response = build_three_sizes_multipart(self.results)
+        json_size = len(json.dumps({"patterns": [r.model_dump() for r in self.results]}))
+
+        assert len(response.body) < json_size
+
+
+class TestPatternListCursor:
+    """Test suite for the admin pattern list cursor."""
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the position it was built from."""
+        created_at = datetime(2026, 3, 2, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+        cursor = encode_pattern_cursor(created_at, 42)
+
+        assert decode_pattern_cursor(cursor) == (created_at, 42)
+
+    def test_invalid_cursor_raises(self):
+        """Test that a malformed cursor raises ValueError."""
+        with pytest.raises(ValueError):
+            decode_pattern_cursor("not-a-cursor")
+
+
+class _FakeUpload:
+    """Minimal stand-in for fastapi.UploadFile."""
+
+    def __init__(self, content: bytes):
+        self.content_type = "image/png"
+        self._content = content
+
+    async def read(self) -> bytes:
+        return self._content
+
+
+class TestUploadImage:
+    """Test suite for the upload endpoint's input validation."""
+
+    def _upload(self, content: bytes):
+        return asyncio.run(upload_image(file=_FakeUpload(content), db=None))
+
+    def test_unreadable_image_is_rejected(self):
+        """Test that bytes PIL cannot decode give 400 instead of 500."""
+        with pytest.raises(HTTPException) as excinfo:
+            self._upload(b"not an image")
+
+        assert excinfo.value.status_code == 400
+
+    def test_decompression_bomb_is_rejected(self, gradient_image, monkeypatch):
+        """Test that an image over the pixel limit gives 400."""
+        buffer = io.BytesIO()
+        gradient_image.save(buffer, format="PNG")
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 10)
+
+        with pytest.raises(HTTPException) as excinfo:
+            self._upload(buffer.getvalue())
+
+        assert excinfo.value.status_code == 400
@@ -0,0 +1,76 @@
+"""
+Unit tests for pdf_assets.py
+
+Tests that static PDF images are loaded once per process, that missing files
+are reported as None, and that a shared asset is embedded once per document.
+"""
+
+import io
+
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services import pdf_assets
+from app.services.pdf_assets import get_pdf_asset
+
+
+def _write_logo(directory):
+    """Write a small RGBA PNG to directory/pdf/logo.png."""
+    (directory / "pdf").mkdir()
+    Image.new("RGBA", (8, 4), (255, 0, 0, 128)).save(directory / "pdf" / "logo.png")
+
+
+def _draw_twice(asset) -> bytes:
+    """Draw the asset on two pages and return the PDF."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    for _ in range(2):
+        c.drawImage(asset.reader, 10, 10, width=asset.width, height=asset.height, mask='auto')
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+class TestPdfAssets:
+    """Test suite for the static image registry."""
+
+    def test_asset_is_loaded_once(self, tmp_path, monkeypatch):
+        """Test that repeated lookups reuse the first load."""
+        _write_logo(tmp_path)
+        monkeypatch.setattr(pdf_assets, "STATIC_DIR", tmp_path)
+        monkeypatch.setattr(pdf_assets, "_PDF_ASSETS", {})
+        loads = []
+        original_load = pdf_assets._load_asset
+
+        def counting_load(path):
+            loads.append(path)
+            return original_load(path)
+
+        monkeypatch.setattr(pdf_assets, "_load_asset", counting_load)
+
+        asset = get_pdf_asset("pdf/logo.png")
+
+        assert get_pdf_asset("pdf/logo.png") is asset
+        assert len(loads) == 1
+        assert (asset.width, asset.height) == (6, 3)
+
+    def test_missing_file_returns_none(self, tmp_path, monkeypatch):
+        """Test that a missing image is reported as None."""
+        monkeypatch.setattr(pdf_assets, "STATIC_DIR", tmp_path)
+        monkeypatch.setattr(pdf_assets, "_PDF_ASSETS", {})
+
+        assert get_pdf_asset("grids/9x9.png") is None
+
+    def test_shared_asset_is_embedded_once_per_document(self, tmp_path, monkeypatch):
+        """Test that documents drawing the shared reader are identical and embed it once."""
+        _write_logo(tmp_path)
+        monkeypatch.setattr(pdf_assets, "STATIC_DIR", tmp_path)
+        monkeypatch.setattr(pdf_assets, "_PDF_ASSETS", {})
+        asset = get_pdf_asset("pdf/logo.png")
+
+        pdf = _draw_twice(asset)
+
+        assert pdf == _draw_twice(asset)
+        # The image and its soft mask, shared by both pages
+        assert pdf.count(b"/Subtype /Image") == 2
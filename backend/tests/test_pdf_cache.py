@@ -0,0 +1,133 @@
+"""
+Unit tests for pdf_cache.py
+
+Tests the size-bounded on-disk LRU, per-pattern and palette invalidation, key
+construction and the cached PDF opener.
+"""
+
+import io
+import os
+
+from app.services import pdf_cache
+from app.services.pdf_cache import PdfFileCache, make_pdf_cache_key, open_pattern_pdf
+
+
+def _pattern_data(grid=None):
+    """Build small v2 pattern data."""
+    return {"grid": grid or [["01", "02"], ["02", "01"]], "width": 2, "height": 2, "storage_version": 2}
+
+
+def _colors_used():
+    """Build colors_used for _pattern_data."""
+    return [{"code": "01", "name": "White", "count": 2}, {"code": "02", "name": "Cream", "count": 2}]
+
+
+class TestPdfFileCache:
+    """Test suite for the on-disk LRU itself."""
+
+    def test_round_trip_and_counters(self, tmp_path):
+        """Test that a stored PDF is read back and counters are updated."""
+        cache = PdfFileCache(str(tmp_path), max_bytes=10_000)
+
+        assert cache.open("1", "a") is None
+        cache.put("1", "a", io.BytesIO(b"%PDF-1"))
+        with cache.open("1", "a") as f:
+            assert f.read() == b"%PDF-1"
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 6)
+
+    def test_disabled_without_directory(self):
+        """Test that an empty cache dir disables the cache."""
+        cache = PdfFileCache(None, max_bytes=10_000)
+        cache.put("1", "a", io.BytesIO(b"%PDF-1"))
+
+        assert not cache.enabled
+        assert cache.open("1", "a") is None
+
+    def test_evicts_least_recently_used_within_byte_budget(self, tmp_path):
+        """Test that the least recently used PDF is deleted when over budget."""
+        cache = PdfFileCache(str(tmp_path), max_bytes=250)
+        cache.put("1", "a", io.BytesIO(b"x" * 100))
+        cache.put("1", "b", io.BytesIO(b"x" * 100))
+
+        # Make "b" older than "a"
+        b_path = cache._path("1", "b")
+        os.utime(b_path, (1, 1))
+
+        cache.put("2", "c", io.BytesIO(b"x" * 100))
+
+        assert cache.open("1", "b") is None
+        assert cache.open("1", "a") is not None
+        assert cache.stats()["bytes"] == 200
+
+    def test_invalidate_pattern_only_drops_that_pattern(self, tmp_path):
+        """Test that invalidation removes every PDF of one pattern and nothing else."""
+        cache = PdfFileCache(str(tmp_path), max_bytes=10_000)
+        cache.put("1", "a", io.BytesIO(b"1"))
+        cache.put("1", "b", io.BytesIO(b"2"))
+        cache.put("2", "c", io.BytesIO(b"3"))
+
+        assert cache.invalidate_pattern("1") == 2
+        assert cache.open("1", "a") is None
+        assert cache.open("2", "c") is not None
+
+    def test_palette_change_purges_old_entries(self, tmp_path, monkeypatch):
+        """Test that PDFs of a previous palette version are deleted."""
+        cache = PdfFileCache(str(tmp_path), max_bytes=10_000)
+        monkeypatch.setattr(pdf_cache, "get_palette_version", lambda: "old")
+        cache.put("1", "a", io.BytesIO(b"1"))
+
+        monkeypatch.setattr(pdf_cache, "get_palette_version", lambda: "new")
+        cache.put("1", "b", io.BytesIO(b"2"))
+
+        assert cache.purge_stale_palettes() == 1
+        assert not (tmp_path / "old").exists()
+        assert cache.stats()["entries"] == 1
+
+
+class TestPdfCacheKey:
+    """Test suite for key construction."""
+
+    def test_key_changes_with_everything_on_the_page(self, monkeypatch):
+        """Test that grid, title, colors, palette and template version all change the key."""
+        key = make_pdf_cache_key("1", _pattern_data(), _colors_used())
+
+        assert key == make_pdf_cache_key("1", _pattern_data(), _colors_used())
+        assert key != make_pdf_cache_key("2", _pattern_data(), _colors_used())
+        assert key != make_pdf_cache_key("1", _pattern_data([["01", "01"], ["02", "01"]]), _colors_used())
+        assert key != make_pdf_cache_key("1", _pattern_data(), _colors_used(), product_title="Katt")
+        assert key != make_pdf_cache_key("1", _pattern_data(), _colors_used()[:1])
+
+        monkeypatch.setattr(pdf_cache, "PDF_TEMPLATE_VERSION", -1)
+        assert key != make_pdf_cache_key("1", _pattern_data(), _colors_used())
+
+        monkeypatch.setattr(pdf_cache, "get_palette_version", lambda: "other")
+        assert key != make_pdf_cache_key("1", _pattern_data(), _colors_used())
+
+
+class TestOpenPatternPdf:
+    """Test suite for the cached PDF opener."""
+
+    def test_second_download_is_served_from_cache(self, tmp_path, monkeypatch):
+        """Test that the PDF is generated once and then read from disk."""
+        monkeypatch.setattr(pdf_cache, "PDF_CACHE", PdfFileCache(str(tmp_path), max_bytes=10_000_000))
+        calls = []
+        original_spool = pdf_cache.spool_pattern_pdf
+
+        def counting_spool(*args, **kwargs):
+            calls.append(args)
+            return original_spool(*args, **kwargs)
+
+        monkeypatch.setattr(pdf_cache, "spool_pattern_pdf", counting_spool)
+        colors_used = _colors_used()
+
+        with open_pattern_pdf("1", _pattern_data(), colors_used) as f:
+            first = f.read()
+        with open_pattern_pdf("1", _pattern_data(), colors_used) as f:
+            second = f.read()
+
+        assert first.startswith(b"%PDF")
+        assert second == first
+        assert len(calls) == 1
+        assert "hex" not in colors_used[0]
@@ -0,0 +1,186 @@
+"""
+Unit tests for pdf_generator.py
+
+Tests page layout, that beads are drawn from one reusable form per color,
+per-board page caching, deterministic (optionally parallel) output and the
+spooled streaming output.
+"""
+
+import base64
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.services import cpu_pool
+from app.services.color_service import get_perle_colors
+from app.services.pdf_generator import BOARD_PAGE_CACHE, generate_pattern_pdf, spool_pattern_pdf, iter_pdf_chunks
+
+
+def _count(pattern: bytes, pdf: bytes) -> int:
+    """Count regex matches in the raw PDF bytes."""
+    return len(re.findall(pattern, pdf))
+
+
+def _page_xobject_usage(pdf: bytes):
+    """
+    For every page, the XObjects its content stream draws and the ones its resources define.
+
+    Minimal parser for ReportLab output: uncompressed object table, content
+    streams encoded with ASCII85 and/or Flate.
+    """
+    objects = {
+        int(number): body
+        for number, body in re.findall(rb"(\d+) 0 obj\n(.*?)endobj", pdf, re.DOTALL)
+    }
+
+    def stream_content(body: bytes) -> bytes:
+        header, data = body.split(b"stream", 1)
+        data = data.lstrip(b"\r\n").rsplit(b"endstream", 1)[0]
+        if b"/ASCII85Decode" in header:
+            data = base64.a85decode(data.strip(), adobe=True, ignorechars=b" \t\n\r\v")
+        if b"/FlateDecode" in header:
+            data = zlib.decompress(data)
+        return data
+
+    pages = []
+    for body in objects.values():
+        if not re.search(rb"/Type /Page\n", body):
+            continue
+        contents = stream_content(objects[int(re.search(rb"/Contents (\d+) 0 R", body).group(1))])
+        xobjects = re.search(rb"/XObject <<(.*?)>>", body, re.DOTALL)
+        defined = set(re.findall(rb"/(\S+) \d+ 0 R", xobjects.group(1))) if xobjects else set()
+        pages.append((set(re.findall(rb"/(\S+) Do", contents)), defined))
+    return pages
+
+
+class TestPatternPdf:
+    """Test suite for generate_pattern_pdf."""
+
+    def setup_method(self):
+        """Setup before each test - a 2x1 board pattern with three codes."""
+        self.codes = [c["code"] for c in get_perle_colors() if c.get("code")][:3]
+        width, height = 40, 29
+        grid = [[self.codes[(x + y) % 3] for x in range(width)] for y in range(height)]
+        self.pattern_data = {
+            "grid": grid,
+            "width": width,
+            "height": height,
+            "boards_width": 2,
+            "boards_height": 1,
+            "storage_version": 2,
+        }
+        self.colors_used = [{"code": code, "name": code, "count": 1} for code in self.codes]
+
+    def test_one_page_per_board(self):
+        """Test that the PDF has a title page, an instructions page and one page per board."""
+        pdf = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        assert pdf.startswith(b"%PDF")
+        assert _count(rb"/Type /Page\n", pdf) == 2 + 2
+
+    def test_page_resources_define_every_drawn_form(self):
+        """Test that each page lists every XObject it draws (bead forms placed by literal operators included)."""
+        pdf = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+        pages = _page_xobject_usage(pdf)
+
+        assert len(pages) == 2 + 2
+        board_pages = [(drawn, defined) for drawn, defined in pages if any(b"bead_" in name for name in drawn)]
+        assert len(board_pages) == 2
+        for drawn, defined in pages:
+            assert drawn <= defined
+
+    def test_beads_reuse_one_form_per_color(self):
+        """Test that each color is defined once as a form and placed per bead."""
+        pdf = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        assert _count(rb"/Subtype /Form", pdf) == len(self.codes)
+
+    def test_grid_edit_only_redraws_the_edited_board(self):
+        """Test that after a one-cell edit only that board's page content is rebuilt."""
+        BOARD_PAGE_CACHE.clear()
+        generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+        assert BOARD_PAGE_CACHE.stats()["misses"] == 2
+
+        self.pattern_data["grid"][3][35] = self.codes[0] if self.pattern_data["grid"][3][35] != self.codes[0] else self.codes[1]
+        pdf = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        stats = BOARD_PAGE_CACHE.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+        assert _count(rb"/Type /Page\n", pdf) == 2 + 2
+
+    def test_output_is_deterministic(self):
+        """Test that the same pattern gives byte-identical PDFs, cached or not."""
+        BOARD_PAGE_CACHE.clear()
+        first = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+        second = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        assert first == second
+
+    def test_parallel_board_pages_match_serial(self, monkeypatch):
+        """Test that board pages built in a worker pool give the same bytes as in-process."""
+        BOARD_PAGE_CACHE.clear()
+        serial = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        # The process pool only adds pickling; a thread pool exercises the same path
+        BOARD_PAGE_CACHE.clear()
+        monkeypatch.setattr(settings, "PDF_BOARD_WORKERS", 2)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            monkeypatch.setattr(cpu_pool, "get_pdf_executor", lambda: executor)
+            parallel = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        assert parallel == serial
+        assert BOARD_PAGE_CACHE.stats()["misses"] == 2
+
+    def test_broken_pool_falls_back_to_in_process(self, monkeypatch):
+        """Test that a broken worker pool is discarded and the PDF is still built."""
+        BOARD_PAGE_CACHE.clear()
+        serial = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        class BrokenExecutor:
+            def map(self, *args, **kwargs):
+                raise BrokenProcessPool("worker died")
+
+        discarded = []
+        BOARD_PAGE_CACHE.clear()
+        monkeypatch.setattr(settings, "PDF_BOARD_WORKERS", 2)
+        monkeypatch.setattr(cpu_pool, "get_pdf_executor", lambda: BrokenExecutor())
+        monkeypatch.setattr(cpu_pool, "discard_pdf_executor", discarded.append)
+
+        assert generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used]) == serial
+        assert len(discarded) == 1
+
+    def test_hex_grid_with_unknown_color(self):
+        """Test that v1 hex grids work, including hex values missing from colors_used."""
+        pattern_data = {
+            "grid": [["#FFFFFF", "#000000"], ["#123456", "#FFFFFF"]],
+            "storage_version": 1,
+        }
+        colors_used = [
+            {"hex": "#FFFFFF", "code": "01", "name": "White"},
+            {"hex": "#000000", "code": "18", "name": "Black"},
+        ]
+
+        pdf = generate_pattern_pdf(pattern_data, colors_used)
+
+        assert _count(rb"/Subtype /Form", pdf) == 3
+
+    def test_spooled_pdf_streams_in_chunks(self):
+        """Test that a spooled PDF is read back in chunks and closed afterwards."""
+        pdf_file = spool_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used])
+
+        chunks = list(iter_pdf_chunks(pdf_file, chunk_size=1024))
+
+        assert len(chunks) > 1
+        assert b"".join(chunks).startswith(b"%PDF")
+        assert b"".join(chunks).rstrip().endswith(b"%%EOF")
+        assert pdf_file.closed
+
+    def test_output_path_still_written(self, tmp_path):
+        """Test that output_path saves the same bytes that are returned."""
+        output_path = tmp_path / "pattern.pdf"
+
+        pdf = generate_pattern_pdf(self.pattern_data, [dict(c) for c in self.colors_used], output_path=str(output_path))
+
+        assert output_path.read_bytes() == pdf
@@ -0,0 +1,95 @@
+"""
+Unit tests for product API endpoints.
+
+Tests that a failed Sanity product creation does not keep the SKU claimed.
+"""
+
+import asyncio
+import base64
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.api import products
+from app.schemas.product import ProductCreateFromPatternData
+
+
+class _FakeQuery:
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return None
+
+
+class _FakeSession:
+    """Minimal stand-in for a Session that records the SKU at every commit."""
+
+    def __init__(self):
+        self.pattern = None
+        self.committed_skus = []
+
+    def query(self, *args):
+        return _FakeQuery()
+
+    def add(self, instance):
+        self.pattern = instance
+
+    def flush(self):
+        self.pattern.id = 1
+
+    def commit(self):
+        self.committed_skus.append(self.pattern.sanity_product_sku)
+
+    def rollback(self):
+        pass
+
+
+class _FailingSanityService:
+    """Uploads succeed, creating the product document fails."""
+
+    async def upload_image_from_bytes(self, image_bytes, filename):
+        return {"asset_id": "image-asset", "url": "https://cdn.example/image.png"}
+
+    async def create_product_document(self, **kwargs):
+        raise RuntimeError("Sanity unavailable")
+
+
+class _NoRoomTemplates:
+    async def get_room_template_for_dimensions(self, boards_width, boards_height):
+        return None
+
+
+def _product_data() -> ProductCreateFromPatternData:
+    """Build a minimal product request with a tiny pattern image."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), (255, 255, 255)).save(buffer, format="PNG")
+    return ProductCreateFromPatternData(
+        sku="KIT-001",
+        name="Katt",
+        slug="katt",
+        pattern_image_base64=base64.b64encode(buffer.getvalue()).decode("ascii"),
+        pattern_data={"grid": [["01"]], "width": 1, "height": 1, "storage_version": 2},
+        colors_used=[{"code": "01", "count": 1}],
+        price=199,
+        original_price=None,
+    )
+
+
+class TestCreateProductFromPatternData:
+    """Test suite for create_product_from_pattern_data."""
+
+    def test_sanity_failure_releases_sku(self, monkeypatch):
+        """Test that the SKU is cleared when the Sanity product could not be created."""
+        monkeypatch.setattr(products, "SanityService", _FailingSanityService)
+        monkeypatch.setattr(products, "RoomTemplateService", _NoRoomTemplates)
+        db = _FakeSession()
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(products.create_product_from_pattern_data(_product_data(), db=db, admin=None))
+
+        assert exc_info.value.status_code == 500
+        assert db.pattern.sanity_product_sku is None
+        assert db.committed_skus == [None]
@@ -0,0 +1,202 @@
+"""
+Unit tests for render_cache.py and the conditional-GET pattern image endpoints.
+
+Tests the byte-bounded LRU with per-pattern invalidation, key construction,
+If-None-Match matching and the 304 / invalidation behavior of the API.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.models.pattern import Pattern
+from app.services import render_cache
+from app.services.grid_storage import compress_pattern_data
+from app.services.render_cache import (
+    RenderedImageCache,
+    compute_grid_digest,
+    make_render_key,
+    etag_matches,
+)
+
+
+class TestRenderedImageCache:
+    """Test suite for the LRU cache itself."""
+
+    def test_round_trip_and_counters(self):
+        """Test that stored bytes come back and counters are updated."""
+        cache = RenderedImageCache(max_bytes=1_000)
+
+        assert cache.get("a") is None
+        cache.put("p1", "a", b"x" * 10)
+        assert cache.get("a") == b"x" * 10
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 10)
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        """Test that the least recently used entry is evicted when over budget."""
+        cache = RenderedImageCache(max_bytes=250)
+        cache.put("p1", "a", b"x" * 100)
+        cache.put("p1", "b", b"x" * 100)
+        cache.get("a")
+        cache.put("p2", "c", b"x" * 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] == 200
+
+    def test_skips_entries_larger_than_budget(self):
+        """Test that an entry larger than the whole budget is not stored."""
+        cache = RenderedImageCache(max_bytes=10)
+        cache.put("p1", "a", b"x" * 11)
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_invalidate_pattern_only_drops_that_pattern(self):
+        """Test that invalidation removes every entry of one pattern and nothing else."""
+        cache = RenderedImageCache(max_bytes=1_000)
+        cache.put("p1", "a", b"1")
+        cache.put("p1", "b", b"22")
+        cache.put("p2", "c", b"333")
+
+        assert cache.invalidate_pattern("p1") == 2
+        assert cache.get("a") is None and cache.get("b") is None
+        assert cache.get("c") == b"333"
+        assert cache.stats()["bytes"] == 3
+        assert cache.invalidate_pattern("p1") == 0
+
+
+class TestRenderKeys:
+    """Test suite for key construction and ETag matching."""
+
+    def test_key_changes_with_grid_and_options(self):
+        """Test that the key depends on pattern, grid content and every option."""
+        grid = [["01", "02"], ["02", "01"]]
+        digest = compute_grid_digest(grid, 2)
+        options = {"bead_size": 10, "grid_lines": False, "board_lines": False, "format": "png"}
+        key = make_render_key("p1", digest, options)
+
+        assert key == make_render_key("p1", compute_grid_digest([["01", "02"], ["02", "01"]], 2), dict(options))
+        assert key != make_render_key("p2", digest, options)
+        assert key != make_render_key("p1", compute_grid_digest([["01", "02"], ["02", "02"]], 2), options)
+        assert key != make_render_key("p1", digest, {**options, "bead_size": 20})
+        assert key != make_render_key("p1", digest, {**options, "format": "webp"})
+
+    def test_etag_matches(self):
+        """Test If-None-Match parsing: lists, wildcard and weak validators."""
+        etag = '"abc"'
+
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"xyz", "abc"', etag)
+        assert etag_matches('W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"xyz"', etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches("", etag)
+
+
+class _FakeQuery:
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.pattern
+
+
+class _FakeSession:
+    """Minimal stand-in for a Session that always returns one pattern."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def query(self, model):
+        return _FakeQuery(self.pattern)
+
+    def commit(self):
+        pass
+
+    def refresh(self, instance):
+        pass
+
+
+class TestConditionalPatternImage:
+    """Test suite for ETag / 304 handling on the pattern image endpoints."""
+
+    def setup_method(self):
+        render_cache.RENDER_CACHE.clear()
+        self.pattern = Pattern(
+            id="p-render-cache",
+            pattern_data=compress_pattern_data({"grid": [["01", "02"], ["02", "01"]], "storage_version": 2}),
+            colors_used=[]
+        )
+        app.dependency_overrides[get_db] = lambda: _FakeSession(self.pattern)
+        self.client = TestClient(app)
+        self.render_calls = 0
+
+        original_put = render_cache.RENDER_CACHE.put
+
+        def counting_put(*args):
+            self.render_calls += 1
+            original_put(*args)
+
+        render_cache.RENDER_CACHE.put = counting_put
+
+    def teardown_method(self):
+        app.dependency_overrides.pop(get_db, None)
+        del render_cache.RENDER_CACHE.put
+        render_cache.RENDER_CACHE.clear()
+
+    def test_image_revalidates_with_304(self):
+        """Test that a matching If-None-Match gets 304 and no rendering happens."""
+        response = self.client.get("/api/patterns/p-render-cache/image")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        cached = self.client.get("/api/patterns/p-render-cache/image")
+        assert cached.content == response.content
+        assert self.render_calls == 1
+
+        not_modified = self.client.get("/api/patterns/p-render-cache/image", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert self.render_calls == 1
+
+        webp = self.client.get("/api/patterns/p-render-cache/image?format=webp", headers={"If-None-Match": etag})
+        assert webp.status_code == 200
+        assert webp.headers["etag"] != etag
+
+    def test_render_grid_revalidates_with_304(self):
+        """Test that render-grid sends an ETag and honors If-None-Match."""
+        response = self.client.get("/api/patterns/p-render-cache/render-grid?bead_size=5")
+        assert response.status_code == 200
+        assert response.json()["pattern_image_base64"].startswith("data:image/png;base64,")
+
+        not_modified = self.client.get(
+            "/api/patterns/p-render-cache/render-grid?bead_size=5",
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
+
+    def test_grid_update_invalidates_cached_images(self):
+        """Test that PATCH /grid drops cached images and changes the ETag."""
+        etag = self.client.get("/api/patterns/p-render-cache/image").headers["etag"]
+        assert render_cache.RENDER_CACHE.stats()["entries"] == 1
+
+        response = self.client.patch(
+            "/api/patterns/p-render-cache/grid",
+            json={"grid": [["01", "01"], ["01", "01"]]}
+        )
+        assert response.status_code == 200
+        assert render_cache.RENDER_CACHE.stats()["entries"] == 0
+
+        updated = self.client.get("/api/patterns/p-render-cache/image", headers={"If-None-Match": etag})
+        assert updated.status_code == 200
+        assert updated.headers["etag"] != etag